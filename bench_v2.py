@@ -0,0 +1,230 @@
+"""
+Project Swan's Eye v2.8.19 - Engine Benchmark (단계별 시간 / 최대 메모리, 회귀 비교)
+- v2.8.19: 'synthetic_catalog_v2'로 만든 카탈로그에서 엔진 단계를 크기별로 측정.
+    - 단계: CSV 로드 -> 스캔 -> 전처리 -> MarketScore / Score A / B / C -> 필터 인덱스 / A/B 필터 -> 전체 분석
+      (앱과 같은 경로: 'load_csv_v2_8', 'scan_catalog_v2_8', 컴팩트 전처리, 'FilterIndex')
+    - 시간 = repeat회 중 최솟값 (perf_counter), 최대 메모리 = 별도 1회 tracemalloc 피크
+      (tracemalloc은 느려지므로 시간 측정과 분리)
+    - 결과 JSON 저장 / '--compare 이전결과.json'으로 느려진 단계 표시 (허용 비율 초과 시 종료 코드 1)
+
+사용 예)
+    python bench_v2.py --rows 1000 100000 1000000 --output bench.json
+    python bench_v2.py --rows 100000 --encoding cp949 --compare bench.json --tolerance 0.2
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import core_engine_v2 as core_engine
+import filter_index_v2
+import synthetic_catalog_v2
+
+DEFAULT_ROWS = (1_000, 100_000, 1_000_000)
+
+
+def _stage_list(csv_path):
+    """
+    [(단계 이름, 함수(state) -> 결과, 결과를 state에 저장할 키)] (순서대로 실행, 앞 단계 결과를 뒤 단계가 사용)
+    """
+    def scan(state):
+        return core_engine.scan_catalog_v2_8(state['raw_df'])
+
+    def rulebook(state):
+        return core_engine.build_default_rulebook(state['scan'].discovered)
+
+    def preprocess(state):
+        return core_engine.run_preprocess_v2_6(
+            state['raw_df'], state['rules'], compact=True, component_tokens=state['scan'].component_tokens
+        )
+
+    def market_score(state):
+        base_df, _ = state['compact']
+        return core_engine.calculate_market_score_v2(base_df, state['rules']['market_score_weights'])
+
+    def score_a(state):
+        base_df, store = state['compact']
+        return core_engine.calculate_score_a(base_df, state['rules']['score_a_main_components'], store)
+
+    def score_b(state):
+        base_df, _ = state['compact']
+        return core_engine.calculate_score_b(base_df, state['rules']['score_b_price'])
+
+    def score_c(state):
+        base_df, store = state['compact']
+        rules = state['rules']
+        return core_engine.calculate_score_c(
+            base_df, rules['score_c_sub_components'], rules['score_c_tags'], None, store
+        )
+
+    def filter_index(state):
+        base_df, store = state['compact']
+        discovered = state['scan'].discovered
+        return filter_index_v2.FilterIndex(
+            base_df, store, core_engine.TagIncidence(base_df['tags_raw']),
+            tag_names=tuple(discovered['tags']), text_columns=tuple(discovered['text_cols'])
+        )
+
+    def apply_filters(state):
+        return state['filter_index'].mask(state['filters'])
+
+    def full_analysis(state):
+        return core_engine.run_full_analysis_v2_6(state['raw_df'], state['rules'])
+
+    return [
+        ('load_csv', lambda state: core_engine.load_csv_v2_8(csv_path), 'raw_df'),
+        ('scan', scan, 'scan'),
+        ('default_rulebook', rulebook, 'rules'),
+        ('preprocess', preprocess, 'compact'),
+        ('market_score', market_score, None),
+        ('score_a', score_a, None),
+        ('score_b', score_b, None),
+        ('score_c', score_c, None),
+        ('filter_index', filter_index, 'filter_index'),
+        ('apply_filters', apply_filters, None),
+        ('full_analysis', full_analysis, None),
+    ]
+
+
+def sample_filters(state):
+    """ 앱 'create_filter_box'와 같은 모양의 대표 필터 (인기 성분 2개 포함 + 범위, 태그 1개, 브랜드 절반) """
+    base_df, store = state['compact']
+    discovered = state['scan'].discovered
+    filters = {}
+    for comp_name in [name for name in discovered['main_comps'] if name in store][:2]:
+        min_val, max_val = store.value_range(comp_name)
+        filters[comp_name] = {
+            'type': "반드시 포함",
+            'slider': None if math.isnan(min_val) else (min_val, (min_val + max_val) / 2)
+        }
+    if discovered['tags']:
+        filters[discovered['tags'][0]] = "배제"
+    brands = discovered['text_cols'].get('브랜드')
+    if brands:
+        filters['브랜드'] = brands[:len(brands) // 2]
+    return filters
+
+
+def run_stages(csv_path, repeat=3, measure_memory=True):
+    """
+    CSV 하나의 단계별 측정.
+    :return: { 단계 이름: {'seconds': 최솟값, 'peak_mb': tracemalloc 피크 또는 None} }
+    """
+    stages = _stage_list(csv_path)
+    report = {}
+    state = {}
+    for name, stage, state_key in stages:
+        if name == 'apply_filters':
+            state['filters'] = sample_filters(state)
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = stage(state)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        peak_mb = None
+        if measure_memory:
+            tracemalloc.start()
+            stage(state)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            peak_mb = peak / (1024 * 1024)
+        if state_key is not None:
+            state[state_key] = result
+        report[name] = {'seconds': best, 'peak_mb': peak_mb}
+    report['_catalog'] = {
+        'rows': len(state['raw_df']),
+        'products': len(state['compact'][0]),
+        'components': len(state['compact'][1].names),
+    }
+    return report
+
+
+def run_benchmark(rows_list, encoding='utf-8-sig', repeat=3, measure_memory=True, seed=0, workdir=None):
+    """ { 행 수(문자열): run_stages 결과 } (카탈로그는 workdir에 생성, 없으면 임시 폴더) """
+    results = {}
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp_dir:
+        for n_rows in rows_list:
+            csv_path = os.path.join(tmp_dir, f'catalog_{n_rows}.csv')
+            catalog = synthetic_catalog_v2.generate_catalog(n_rows, seed=seed)
+            synthetic_catalog_v2.write_catalog(catalog, csv_path, encoding)
+            del catalog
+            results[str(n_rows)] = run_stages(csv_path, repeat=repeat, measure_memory=measure_memory)
+    return results
+
+
+def compare_results(results, baseline, tolerance=0.2, min_seconds=0.01):
+    """
+    이전 결과 대비 느려진 단계 [(행 수, 단계, 이전 초, 현재 초)].
+    (min_seconds보다 짧은 단계는 측정 잡음이 커서 제외)
+    """
+    regressions = []
+    for rows, stages in results.items():
+        for name, current in stages.items():
+            previous = baseline.get(rows, {}).get(name)
+            if name.startswith('_') or previous is None:
+                continue
+            if max(previous['seconds'], current['seconds']) < min_seconds:
+                continue
+            if current['seconds'] > previous['seconds'] * (1 + tolerance):
+                regressions.append((rows, name, previous['seconds'], current['seconds']))
+    return regressions
+
+
+def format_report(results):
+    lines = []
+    for rows, stages in results.items():
+        catalog = stages['_catalog']
+        lines.append(
+            f"[{int(rows):,}행] 제품 {catalog['products']:,}개, 성분 {catalog['components']}종"
+        )
+        for name, stage in stages.items():
+            if name.startswith('_'):
+                continue
+            peak = '' if stage['peak_mb'] is None else f"{stage['peak_mb']:10.1f} MB"
+            lines.append(f"    {name:<18}{stage['seconds']:10.4f} s{peak}")
+    return '\n'.join(lines)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Swan's Eye 엔진 벤치마크 (단계별 시간 / 최대 메모리)")
+    parser.add_argument('--rows', type=int, nargs='+', default=list(DEFAULT_ROWS), help="카탈로그 행 수 (여러 개 가능)")
+    parser.add_argument('--encoding', choices=synthetic_catalog_v2.ENCODINGS, default='utf-8-sig')
+    parser.add_argument('--repeat', type=int, default=3, help="단계별 반복 횟수 (최솟값 기록)")
+    parser.add_argument('--no-memory', action='store_true', help="tracemalloc 피크 측정 생략")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workdir', help="카탈로그 CSV를 만들 폴더 (기본: 시스템 임시 폴더)")
+    parser.add_argument('--output', help="결과 JSON 저장 경로")
+    parser.add_argument('--compare', metavar='JSON', help="이전 결과 JSON (느려진 단계 표시)")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="허용 비율 (0.2 = 20%% 느려짐까지 허용)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    results = run_benchmark(
+        args.rows, encoding=args.encoding, repeat=args.repeat,
+        measure_memory=not args.no_memory, seed=args.seed, workdir=args.workdir
+    )
+    print(format_report(results))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline, args.tolerance)
+        for rows, name, previous, current in regressions:
+            print(f"느려짐: [{int(rows):,}행] {name} {previous:.4f}s -> {current:.4f}s", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""
+Project Swan's Eye v2.8.18 - A/B Chart Data (대용량 분포 차트용 데이터 준비)
+- v2.8.18: 델타 분석기(앱 Tab 2) 가격 / MarketScore 분포 차트의 데이터 준비 (plotly 없이 numpy만).
+    - 그룹당 제품이 'CHART_POINT_LIMIT'개 이하면 정확한 점 전체, 넘으면 '결정적' 표본
+      (제품명 해시가 작은 순 -> 같은 필터면 항상 같은 표본, 필터를 바꿔도 남아 있는 제품은 계속 표본에 남음)
+    - 분포 요약(분위수 박스)은 표본이 아닌 그룹 '전체' 값으로 계산
+    - 두 그룹을 하나의 DataFrame으로 합치지 않고 그룹별 배열로 처리
+"""
+
+import numpy as np
+import pandas as pd
+
+# 그룹당 정확한 점으로 그리는 최대 제품 수 (넘으면 표본)
+CHART_POINT_LIMIT = 4000
+
+# 분포 요약 분위수 (하단 수염, Q1, 중앙값, Q3, 상단 수염)
+SUMMARY_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+# 점 가로 흩뿌림(jitter) 폭 (그룹 간격 1 기준)
+JITTER_WIDTH = 0.6
+
+
+def sample_keys(product_names):
+    """ 제품명 -> 표본 / jitter용 64비트 해시 (같은 제품명은 항상 같은 값) """
+    return pd.util.hash_pandas_object(
+        pd.Series(product_names, copy=False), index=False
+    ).to_numpy()
+
+
+def point_rows(values, keys, limit=CHART_POINT_LIMIT, value_range=None):
+    """
+    그룹 하나에서 점으로 그릴 행 위치.
+    - NaN 제외, value_range=(lo, hi)면 그 범위 안쪽만 (확대)
+    - limit개를 넘으면 해시가 작은 limit개 (행 순서 유지)
+    :return: (행 위치 배열, 조건에 맞는 전체 개수)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    keep = ~np.isnan(values)
+    if value_range is not None:
+        keep &= (values >= value_range[0]) & (values <= value_range[1])
+    rows = np.flatnonzero(keep)
+    n_total = len(rows)
+    if n_total > limit:
+        chosen = np.argpartition(keys[rows], limit - 1)[:limit]
+        rows = np.sort(rows[chosen])
+    return rows, n_total
+
+
+def jitter(keys, width=JITTER_WIDTH):
+    """ 제품별 고정 가로 위치 (-width/2 ~ +width/2, rerun마다 점이 움직이지 않음) """
+    return ((keys % 10007) / 10006.0 - 0.5) * width
+
+
+def quantile_summary(values):
+    """
+    그룹 전체 값의 분포 요약 (NaN 제외).
+    :return: { 'count', 'mean', 'lower', 'q1', 'median', 'q3', 'upper' } (값이 없으면 None)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return None
+    lower, q1, median, q3, upper = np.quantile(values, SUMMARY_QUANTILES)
+    return {
+        'count': len(values), 'mean': float(values.mean()),
+        'lower': float(lower), 'q1': float(q1), 'median': float(median),
+        'q3': float(q3), 'upper': float(upper),
+    }
+
+
+def value_bounds(*value_arrays):
+    """ 여러 그룹 값 전체의 (최소, 최대), 값이 없으면 None (확대 슬라이더 범위용) """
+    lows, highs = [], []
+    for values in value_arrays:
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values):
+            lows.append(values.min())
+            highs.append(values.max())
+    if not lows:
+        return None
+    return float(min(lows)), float(max(highs))
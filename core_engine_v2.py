@@ -1,5 +1,67 @@
 """
-Project Swan's Eye v2.7.1 (v4.9.3) - Core Engine
+Project Swan's Eye v2.8.23 (v4.9.3) - Core Engine
+- v2.8.23: 증분 일일 스코어링 ('run_incremental_analysis_v2_8', 'preprocess_incremental_v2_8').
+    - 제품 행 묶음 지문('product_fingerprints')이 어제 상태('IncrementalState')와 같은 제품은 어제 집계 재사용,
+      바뀐 / 새 제품의 행만 전처리 -> 합친 집계로 Z-Score / 최종 합산 등 전역 단계만 전체 재계산 (결과 동일)
+- v2.8.22: 룰북 스냅샷 ('rulebook_v2.RulebookSnapshot') 지원.
+    - 성분 파라미터 배열 / 태그 점수 벡터는 'component_params' / 'tag_score_vector'
+      (스냅샷이면 섹션당 1회 컴파일한 배열을 재사용, 일반 dict는 기존처럼 매번 계산 - 결과 동일)
+    - 배치 평가의 태그 서명도 같은 벡터 사용 ('make_rulebook_grid'로 만든 룰북끼리 공유된 태그 섹션은 1회)
+- v2.8.21: 메모리 절약 모드 ('lean=True': 전처리 / 스코어링 / 'run_full_analysis_v2_6', 'load_csv_v2_8').
+    - 로더: 반복이 많은 텍스트 컬럼 범주형 (고유값 비율 50% 이하)
+    - '브랜드' / 'tags_raw' 범주형, 함량 / 점수 / 성분 점수 float32 (계산은 float64, 저장만 float32)
+    - 전처리 시작 시 원본 전체 'df.copy()' 대신 쓰는 컬럼만 (모드와 무관, 결과 동일)
+    - 단계별 리포트에 출력 메모리('output_mb') 추가.
+- v2.8.20: 단계별 성능 기록 ('run_full_analysis_v2_6(..., report=PipelineReport())').
+    - 전처리 / MarketScore / Score A / B / C / 최종 합산 / 결과 묶기 / 순위 / 넓은 표 펼치기 단계마다
+      시간, 입력 / 출력 행 수, 최대 메모리 (+ 선택 시 cProfile 파일) -> 'final_df.attrs["pipeline_report"]'
+- v2.8.17: 상위 K개 순위 ('top_k_positions': 부분 선택 + 안정 정렬 동점 처리).
+    - 'AnalysisResult'는 순위를 필요한 만큼만 계산 ('top_positions' / 'page'), 전체 정렬은 'order' 조회 때만.
+    - 'run_full_analysis_v2_6(..., top_k=K)': 상위 K개만 펼치고 전체 제품 수는 'attrs["total_products"]'.
+    - 동점 순서를 원래 행 순서로 고정 (기존 'sort_values' quicksort는 동점 순서가 보장되지 않음).
+- v2.8.15: 델타 분석기(앱 Tab 2) 캐시 키 'delta_cache_key' (전처리 키 + 'market_score_weights').
+- v2.8.14: 스캐너 1-pass 벡터화 'scan_catalog_v2_8' -> 'CatalogScan'.
+    - 셀마다 '첫' 성분만 보던 v4.5 스캐너와 달리 셀 안의 '모든' 성분을 발견.
+    - 성분 토큰('tokenize_component_column')을 전처리가 그대로 재사용 (같은 문자열을 두 번 토크나이즈하지 않음).
+    - 태그는 split/explode 한 번, 텍스트 컬럼은 앞부분 샘플로 고유값 100개 이상이면 조기 제외.
+- v2.8.12: 빠른 CSV 로더 ('load_csv_v2_8' 개편).
+    - 인코딩을 파일 앞부분 샘플로 판별 ('sniff_encoding') -> 한 번만 파싱 (cp949 파일을 두 번 읽지 않음).
+    - 룰북을 주면 룰북 / 스캐너가 쓰는 컬럼만 읽음 ('loader_columns'), 텍스트 컬럼은 문자열 dtype 지정.
+    - pyarrow가 설치돼 있으면 'pyarrow' 파서 엔진 사용 (없으면 기본 'c' 엔진).
+- v2.8.11: 멀티코어 전처리 'preprocess_parallel_v2_8' (opt-in, 'run_preprocess_v2_6(..., workers=N)').
+    - ffill 후 제품명 정렬 순서로 '연속 구간' 샤드를 나눠 프로세스 풀에서 부분 집계, 샤드 순서대로 이어 붙임.
+    - 한 제품의 행은 한 샤드에만 (원본 순서 유지) -> 결과는 직렬 경로와 동일.
+- v2.8.10: Z-Score 2단계 API ('running_stats_v2.RunningStats', 병합 가능한 count/mean/M2).
+    - 'collect_score_stats'(파티션별) -> 'merge_score_stats' -> 'score_compact_v2_8(..., score_stats=)'.
+    - 'calculate_z_scores'의 '표준편차 0' 판정을 '유효값이 전부 같음'으로 (반올림 오차로 std가 1e-17 등이 되어
+      Z가 NaN/±1로 튀던 문제 수정, 파티션 경로와 결과 일치).
+- v2.8.9: 대용량 CSV '스트리밍 전처리' 'preprocess_csv_streaming_v2_8' (청크 단위 읽기).
+    - 제품명 ffill과 '열린' 제품 그룹을 청크 경계 너머로 이어 붙이고, 청크마다 제품별 부분 집계만 보관.
+    - 최대 메모리가 파일 크기가 아니라 '청크 크기 + 제품 수'에 비례. 결과는 'preprocess_compact_v2_8'과 동일.
+- v2.8.8: CSV 로더 / 스캐너 / 기본 룰북을 앱에서 엔진으로 이동 (Streamlit 없이 사용 가능).
+    - 'load_csv_v2_8', 'scan_csv_for_rules', 'build_default_rulebook' (앱과 'swan_cli_v2' CLI가 공용).
+- v2.8.7: 룰북 N개 일괄 평가 'run_batch_analysis_v2_8' + 그리드 생성 'make_rulebook_grid'.
+    - 전처리 1회, 가격 Z 1회, 성분 S-Curve는 (고유 파라미터 x 제품)으로 한 번에 브로드캐스팅.
+    - 룰북 축 (N x 제품) 배열로 최종 합산 후 순위(Top-K)까지 반환 ('BatchResult').
+- v2.8.6: 성분 함량 전용 저장소 'ingredient_store_v2.IngredientStore' 도입 (컴팩트 파이프라인).
+    - 'preprocess_compact_v2_8' -> (base_df, store), 'score_compact_v2_8' -> 'AnalysisResult'.
+    - 성분별 float64 컬럼 / 'A_*', 'C1_*' 상세 컬럼을 넓은 DataFrame으로 여러 벌 들고 있지 않음.
+      ('AnalysisResult.to_frame()'으로 필요한 행만 v2.6 형식으로 펼침)
+- v2.8.5: [Score C-2] 태그별 정규식 루프 -> 'tag_index_v2.TagIncidence' (제품 x 태그) 희소 행렬 @ 점수 벡터.
+- v2.8.4: 스코어링 단계를 재사용 가능한 조각으로 분리 ('scoring_graph_v2' 증분 엔진용).
+    - 'calculate_score_c2', 'combine_score_c', 'combine_market_score', 'combine_final_score',
+      'assemble_final_df', 'sum_component_scores', 'score_from_price_z'
+    - 시그모이드(Score B / MarketScore)를 'apply(lambda)' 대신 벡터 연산으로 (결과 동일).
+- v2.8.3: 파이프라인을 '전처리'와 '스코어링' 두 단계로 분리.
+    - 'run_preprocess_v2_6' / 'run_scoring_v2_6' + 전처리 캐시 키 'preprocess_cache_key'.
+    - (가중치/S-Curve 파라미터만 바뀌면 캐시된 전처리 결과로 스코어링만 다시 실행)
+- v2.8.2: 'preprocess_data_v2_6'의 제품별 Python 루프 제거.
+    - 가격/리뷰/별점 숫자 정리를 컬럼 전체에 1회 적용 후, groupby 'first'(첫 유효값) 집계 1회.
+- v2.8.1: 성분 텍스트 '1회 토크나이즈' 파서 추가.
+    - 'parse_component_pairs'가 행마다 '성분 : X, 함유량 : N' 쌍을 한 번에 뽑아 long-format 표로 만들고,
+      'pivot_component_doses'가 룰북 성분 기준으로 피벗 (성분 수 x 행 수 만큼의 정규식 검색 제거).
+- v2.8.0: S-Curve 벡터화 커널('calculate_s_curve_scores') 추가.
+    - Score A / C-1이 성분별 'apply(lambda)' 대신 (제품 x 성분) 행렬을 NumPy 한 번에 계산.
 - v4.9.3 (사장님 요청): '최종 순위' 표시에 '누락'된 '브랜드'와 'MarketScore'를 '엔진'단에서 '추가'.
     - (1) 'preprocess_data_v2_6'에 '브랜드' (텍스트) 추출 로직 '추가'.
     - (2) 'run_full_analysis_v2_6'에 'MARKET_SCORE'를 'final_df'에 '합류'시키는 로직 '추가'.
@@ -10,19 +72,44 @@ Project Swan's Eye v2.7.1 (v4.9.3) - Core Engine
 import pandas as pd
 import numpy as np
 import re
+import itertools
+import json
+import hashlib
+import codecs
+import os
+from concurrent.futures import ProcessPoolExecutor
 from scipy.stats import zscore
+import dataset_cache_v2
+from tag_index_v2 import TagIncidence
+from ingredient_store_v2 import IngredientStore
+from running_stats_v2 import RunningStats
+from rulebook_v2 import COMPONENT_PARAM_KEYS, RulebookSnapshot, component_params, tag_score_vector # noqa: F401 (재노출)
+from pipeline_report_v2 import PipelineReport, report_stage, report_run, memory_mb # noqa: F401 (PipelineReport 재노출)
+
+try:
+    import pyarrow # noqa: F401 (있으면 read_csv를 pyarrow 엔진으로)
+    CSV_ENGINE = 'pyarrow'
+except ImportError:
+    CSV_ENGINE = 'c'
 
 # ---
 # [v2.0] S-Curve 및 Z-Score 유틸리티 (v1.4/v2.0)
 # ---
 
-def calculate_z_scores(series, direction='higher_is_better'):
-    """ v1.4와 동일 (인덱스 꼬임 버그 수정 버전) """
+def calculate_z_scores(series, direction='higher_is_better', stats=None):
+    """
+    v1.4와 동일 (인덱스 꼬임 버그 수정 버전)
+    [v2.8] stats('RunningStats', 전체 데이터 통계)를 주면 그 평균/표준편차로 계산 (파티션 점수화용)
+    """
+    if stats is not None:
+        return stats.z_scores(series, direction=direction)
+
     z_scores_full = pd.Series(np.nan, index=series.index, dtype=float)
     valid_series = series.dropna()
     
     if not valid_series.empty:
-        if valid_series.std() == 0:
+        # [v2.8] 'std() == 0' 대신 '전부 같은 값' (상수 컬럼의 std가 반올림 오차로 0이 아닌 경우 방지)
+        if valid_series.min() == valid_series.max():
             z_scores_valid = pd.Series(0.0, index=valid_series.index)
         else:
             valid_z = zscore(valid_series)
@@ -68,6 +155,43 @@ def calculate_custom_s_curve_score(
         score = rec_score + additional_score
         return min(score, MAX_SCORE)
 
+def calculate_s_curve_scores(doses, min_dose, rec_dose, rec_score, saturation_factor):
+    """
+    [v2.8] 'calculate_custom_s_curve_score'의 배열 버전 (결과 100% 동일).
+    - doses: (제품,) 1차원 또는 (제품 x 성분) 2차원 배열
+    - 파라미터: 스칼라 또는 (성분,) 배열 (마지막 축으로 브로드캐스팅)
+    """
+    LOW_SCORE_FLOOR = 5.0
+    MAX_SCORE = 100.0
+
+    doses = np.asarray(doses, dtype=float)
+    min_dose = np.asarray(min_dose, dtype=float)
+    rec_score = np.asarray(rec_score, dtype=float)
+    saturation_factor = np.asarray(saturation_factor, dtype=float)
+
+    # 방어 코드 (스칼라 버전과 동일한 순서로 적용)
+    rec_dose = np.asarray(rec_dose, dtype=float)
+    rec_dose = np.where(rec_dose == min_dose, rec_dose + 1e-6, rec_dose)
+    rec_dose = np.where(rec_dose == 0, 1e-6, rec_dose)
+
+    with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+        # (1) min <= dose < rec : 5점 바닥 ~ 권장점수까지 tanh 곡선
+        x_norm = (doses - min_dose) / (rec_dose - min_dose)
+        z = 5.0 * (x_norm - 0.5)
+        sigmoid_norm = 0.5 * (1.0 + np.tanh(z))
+        rising = (sigmoid_norm * (rec_score - LOW_SCORE_FLOOR)) + LOW_SCORE_FLOOR
+
+        # (2) dose >= rec : 권장점수 ~ 100점 포화 곡선
+        k = saturation_factor / rec_dose
+        additional_score = (MAX_SCORE - rec_score) * (1.0 - np.exp(-k * (doses - rec_dose)))
+        saturating = np.minimum(rec_score + additional_score, MAX_SCORE)
+
+    # NaN 비교는 항상 False -> NaN / dose < min 은 0점 (min > rec 인 룰 포함)
+    above_min = doses >= min_dose
+    scores = np.where(above_min & (doses >= rec_dose), saturating, 0.0)
+    scores = np.where(above_min & (doses < rec_dose), rising, scores)
+    return scores
+
 # ---
 # [v2.6] 데이터 전처리 (v1.4 그룹핑 + v2.6 동적 추출)
 # ---
@@ -93,185 +217,541 @@ def extract_component_value(series, comp_name):
                 continue
     return np.nan
 
+# [v2.8] '성분 : X, 함유량 : N' 쌍을 한 번에 찾는 정규식 (성분명 자리에 아무 이름이나 허용)
+COMPONENT_PAIR_PATTERN = re.compile(
+    r"성분\s*:\s*([^,]*),\s*함유량\s*:\s*([\d\.]+)",
+    re.IGNORECASE
+)
+
+# [v2.8] 스캐너 + 전처리 공용 토큰 정규식: '성분 : X' (+ 뒤에 ', 함유량 : N'이 있으면 함께)
+# (함유량이 붙은 토큰 = 'COMPONENT_PAIR_PATTERN'의 매치와 정확히 같음)
+COMPONENT_TOKEN_PATTERN = re.compile(
+    r"성분\s*:\s*([^,]*)(?:,\s*함유량\s*:\s*([\d\.]+))?",
+    re.IGNORECASE
+)
+
+def _to_float_or_nan(text):
+    """ float() 변환 실패 시 NaN (v2.6 'extract_component_value'의 try/except와 동일) """
+    try:
+        return float(text)
+    except (ValueError, TypeError):
+        return np.nan
+
+def tokenize_component_column(series):
+    """
+    [v2.8] 성분 텍스트 컬럼의 '모든' 성분 토큰.
+    - 옵션 행마다 같은 텍스트가 반복되므로 '고유 텍스트'만 정규식으로 토크나이즈하고 행으로 펼침
+    :return: DataFrame ['row', 'match', 'component', 'dose', 'paired']
+             (row = 행 위치, paired = 뒤에 '함유량'이 붙은 토큰, dose = 없거나 숫자 변환 실패 시 NaN)
+    """
+    texts = pd.Series(np.asarray(series, dtype=object), index=np.arange(len(series))).dropna()
+    clean_texts = texts.astype(str).str.replace(" ", "", regex=False) # 공백 제거
+    text_codes, unique_texts = pd.factorize(clean_texts)
+
+    # 1. 고유 텍스트별 토큰 (findall: 함유량이 없으면 '')
+    found = [COMPONENT_TOKEN_PATTERN.findall(text) for text in unique_texts]
+    counts = np.array([len(tokens) for tokens in found], dtype=np.int64)
+    starts = np.cumsum(counts) - counts
+    flat = list(itertools.chain.from_iterable(found))
+    components = np.array([token[0] for token in flat], dtype=object)
+    dose_codes, dose_texts = pd.factorize(np.array([token[1] for token in flat], dtype=object))
+    dose_values = np.array([_to_float_or_nan(text) if text else np.nan for text in dose_texts] + [np.nan])
+    doses = dose_values[dose_codes]
+    paired = np.array([token[1] != '' for token in flat], dtype=bool)
+
+    # 2. 행으로 펼치기 (행마다 그 텍스트의 토큰 0..n-1)
+    row_counts = counts[text_codes]
+    rows = np.repeat(clean_texts.index.to_numpy(dtype=np.int64), row_counts)
+    match = np.arange(int(row_counts.sum())) - np.repeat(np.cumsum(row_counts) - row_counts, row_counts)
+    token_ids = np.repeat(starts[text_codes], row_counts) + match
+
+    return pd.DataFrame({
+        'row': rows,
+        'match': match.astype(np.int64),
+        'component': components[token_ids],
+        'dose': doses[token_ids],
+        'paired': paired[token_ids],
+    })
+
+def keep_token_rows(tokens, keep):
+    """ [v2.8] 행 필터(keep: 원본 길이 bool) 후의 위치로 토큰 'row'를 다시 매김 (버려진 행의 토큰 제거) """
+    new_positions = np.full(len(keep), -1, dtype=np.int64)
+    new_positions[keep] = np.arange(int(keep.sum()))
+    rows = new_positions[tokens['row'].to_numpy()]
+    kept = tokens[rows >= 0].copy()
+    kept['row'] = rows[rows >= 0]
+    return kept
+
+def parse_component_pairs(series, products, tokens=None):
+    """
+    [v2.8] 성분 컬럼을 행마다 '한 번만' 토크나이즈하여 long-format 표를 반환.
+    :param series: '핵심성분명태그' 등 성분 텍스트 컬럼 (행 순서 = 원본 순서)
+    :param products: 같은 길이의 제품명 (ffill 완료)
+    :param tokens: 스캐너가 이미 만든 'tokenize_component_column' 결과 (같은 행 위치 기준, 없으면 여기서 토크나이즈)
+    :return: DataFrame ['product_name', 'row', 'match', 'component', 'dose']
+             (row = 원본 행 위치, match = 행 안에서 몇 번째 쌍인지, dose = 숫자 변환 실패 시 NaN)
+    """
+    if tokens is None:
+        tokens = tokenize_component_column(series)
+    pairs = tokens[tokens['paired'].to_numpy(dtype=bool)]
+    rows = pairs['row'].to_numpy(dtype=np.int64)
+
+    return pd.DataFrame({
+        'product_name': np.asarray(products, dtype=object)[rows],
+        'row': rows,
+        'match': pairs['match'].to_numpy(dtype=np.int64),
+        'component': pairs['component'].to_numpy(dtype=object),
+        'dose': pairs['dose'].to_numpy(dtype=float),
+    })
+
+def resolve_component_doses(pairs_df, comp_names):
+    """
+    [v2.8] long-format 쌍 표에서 (제품, 룰북 성분)별 '첫 유효 함량'만 남긴 long 표를 반환.
+    v2.6 'extract_component_value'의 의미를 그대로 유지:
+    - 성분명은 '앞부분 일치' (대소문자 무시) ('EPA' 룰은 'EPA+DHA' 쌍에도 걸림)
+    - 행마다 '처음' 걸린 쌍만 보고, 그 함량이 숫자가 아니면 다음 행으로 넘어감
+    - 제품별로 '처음' 유효한 함량을 사용
+    :return: DataFrame ['product_name', 'rule_component', 'dose']
+    """
+    comp_names = list(comp_names)
+    empty = pd.DataFrame({
+        'product_name': pd.Series([], dtype=object),
+        'rule_component': pd.Series([], dtype=object),
+        'dose': pd.Series([], dtype=float),
+    })
+    if pairs_df.empty or not comp_names:
+        return empty
+
+    # 1. 고유 성분 토큰 x 룰북 성분 매칭 (토큰 수가 행 수보다 훨씬 적음)
+    tokens = pd.unique(pairs_df['component'])
+    lowered_names = [(comp_name, str(comp_name).lower()) for comp_name in comp_names]
+    token_map = [
+        (token, comp_name)
+        for token in tokens
+        for comp_name, lowered in lowered_names
+        if str(token).lower().startswith(lowered)
+    ]
+    if not token_map:
+        return empty
+    token_map_df = pd.DataFrame(token_map, columns=['component', 'rule_component'])
+
+    # 2. 행별 '첫 매칭 쌍' -> 유효 함량만 -> 제품별 '첫 행'
+    matched = pairs_df.merge(token_map_df, on='component', how='inner')
+    matched = matched.sort_values(['row', 'match'], kind='stable')
+    matched = matched.drop_duplicates(subset=['row', 'rule_component'], keep='first')
+    matched = matched.dropna(subset=['dose'])
+    matched = matched.drop_duplicates(subset=['product_name', 'rule_component'], keep='first')
+    return matched[['product_name', 'rule_component', 'dose']].reset_index(drop=True)
+
+def pivot_component_doses(pairs_df, comp_names, product_index):
+    """ [v2.8] long-format 쌍 표를 (제품 x 룰북 성분) 함량 표로 피벗 """
+    comp_names = list(comp_names)
+    matched = resolve_component_doses(pairs_df, comp_names)
+    wide = matched.pivot(index='product_name', columns='rule_component', values='dose')
+    return wide.reindex(index=product_index, columns=comp_names).astype(float)
+
+def _first_numeric_column(df, col):
+    """
+    [v2.8] v1.4 '숫자 추출 로직'(숫자/점 외 문자 제거 -> to_numeric)을 컬럼 전체에 한 번에 적용.
+    (컬럼이 없으면 전부 NaN)
+    """
+    if col not in df.columns:
+        return pd.Series(np.nan, index=df.index, dtype=float)
+    series = df[col].dropna()
+    cleaned = pd.to_numeric(
+        series.astype(str).str.replace(r'[^\d\.]', '', regex=True).replace('', np.nan),
+        errors='coerce'
+    )
+    return cleaned.reindex(df.index).astype(float)
+
+def _first_text_column(df, col):
+    """ [v2.8] 텍스트 컬럼 그대로 (컬럼이 없으면 전부 NaN) """
+    if col not in df.columns:
+        return pd.Series(np.nan, index=df.index, dtype=object)
+    return df[col]
+
+def ingredient_names(rules):
+    """ [v2.8] 함량 저장소의 성분 순서: '핵심' 전체 + '핵심'에 없는 '보조' """
+    main_names = list(rules['score_a_main_components']['rules'].keys())
+    sub_names = list(rules['score_c_sub_components']['rules'].keys())
+    return main_names + [comp_name for comp_name in sub_names if comp_name not in main_names]
+
+def resolve_ingredient_doses(df, rules, col_product, component_tokens=None):
+    """
+    [v2.8] 핵심/보조 성분의 (제품, 성분)별 첫 유효 함량 long 표 ['product_name', 'rule_component', 'dose'].
+    [v3.1] 델타 분석기와의 호환성을 위해, '활성화(enabled)' 여부와 관계없이
+         룰북에 '발견된' 모든 성분의 함량을 우선 추출한다. (컬럼이 없으면 NaN)
+    (핵심/보조에 같은 이름이 있으면 v2.6처럼 '보조' 값이 덮어씀)
+    :param component_tokens: { 성분 컬럼명: 'tokenize_component_column' 결과 } (df 행 위치 기준, 스캐너 재사용)
+    """
+    component_tokens = component_tokens or {}
+    main_names = list(rules['score_a_main_components']['rules'].keys())
+    sub_names = list(rules['score_c_sub_components']['rules'].keys())
+
+    resolved = []
+    for section, owned_names in (
+        ('score_a_main_components', [n for n in main_names if n not in set(sub_names)]),
+        ('score_c_sub_components', sub_names),
+    ):
+        col_comp = rules[section]['csv_column']
+        if col_comp not in df.columns or not owned_names:
+            continue
+        pairs_df = parse_component_pairs(df[col_comp], df[col_product], component_tokens.get(col_comp))
+        resolved.append(resolve_component_doses(pairs_df, owned_names))
+
+    if resolved:
+        return pd.concat(resolved, ignore_index=True)
+    return resolve_component_doses(pd.DataFrame(), [])
+
+def store_from_doses(doses, names, product_index):
+    """ [v2.8] long 함량 표 -> 'IngredientStore' (product_index 순서) """
+    positions = {comp_name: i for i, comp_name in enumerate(names)}
+    return IngredientStore.from_triples(
+        product_index, names,
+        product_index.get_indexer(doses['product_name']),
+        doses['rule_component'].map(positions).to_numpy(dtype=np.int64),
+        doses['dose'].to_numpy(dtype=float)
+    )
+
+def build_ingredient_store(df, rules, col_product, product_index, component_tokens=None):
+    """
+    [v2.8] 핵심/보조 성분 함량을 'IngredientStore' 하나로 추출 (넓은 DataFrame을 만들지 않음).
+    (순서는 'ingredient_names', 값은 'resolve_ingredient_doses')
+    """
+    doses = resolve_ingredient_doses(df, rules, col_product, component_tokens)
+    return store_from_doses(doses, ingredient_names(rules), product_index)
+
+def first_valid_columns(df, rules, col_product):
+    """
+    [v2.8] [Score B] 가격, [Market] 리뷰, '브랜드', [Score C-2] 특수태그 원문을
+    제품별 '첫 유효값'으로 집계 (v1.4 groupby 로직과 동일). 인덱스 = 제품명 (정렬)
+    (룰북에 'brand' 키가 없으면 '브랜드'로 '하드코딩')
+    """
+    col_brand = rules['columns'].get('brand', '브랜드')
+    columns_df = pd.DataFrame({
+        'price': _first_numeric_column(df, rules['columns']['price']),
+        'review_count': _first_numeric_column(df, rules['columns']['review_count']),
+        'rating': _first_numeric_column(df, rules['columns']['rating']),
+        '브랜드': _first_text_column(df, col_brand),
+        'tags_raw': _first_text_column(df, rules['score_c_tags']['csv_column']),
+    }, index=df.index)
+    return columns_df.groupby(df[col_product].to_numpy(), sort=True).first()
+
+def preprocess_compact_v2_8(df, rules, component_tokens=None):
+    """
+    [v2.8] 컴팩트 전처리: (base_df, IngredientStore)
+    - base_df: 제품별 'product_name', 가격/리뷰/별점, '브랜드', 'tags_raw'
+    - store: (제품 x 성분) 함량 (base_df와 같은 행 순서)
+    :param component_tokens: 'CatalogScan.component_tokens' (같은 df를 스캔한 결과면 성분 텍스트를 다시 토크나이즈하지 않음)
+    """
+    
+    # 1. v1.4의 ffill 로직 (제품명 채우기)
+    col_product = rules['columns']['product_name']
+    df[col_product] = df[col_product].ffill()
+    keep = df[col_product].notna().to_numpy()
+    df = df[keep]
+    if component_tokens:
+        component_tokens = {
+            col_comp: keep_token_rows(tokens, keep) for col_comp, tokens in component_tokens.items()
+        }
+    
+    # 2. [Score B] 가격, [Market] 리뷰, '브랜드', [Score C-2] 특수태그 원문 (제품별 첫 유효값)
+    base_df = first_valid_columns(df, rules, col_product)
+    base_df = base_df.rename_axis('product_name').reset_index()
+
+    # 3. [Score A / C-1] 성분 함량 추출 (v2.8: 행당 1회 토크나이즈 -> IngredientStore)
+    store = build_ingredient_store(
+        df, rules, col_product, pd.Index(base_df['product_name']), component_tokens
+    )
+    return base_df, store
+
+def expand_compact_aggregate(base_df, store):
+    """ [v2.8] (base_df, store) -> v2.6 형식의 넓은 agg_df (성분별 컬럼) """
+    return pd.concat(
+        [
+            base_df.drop(columns=['tags_raw']),
+            store.to_frame(index=base_df.index),
+            base_df[['tags_raw']],
+        ],
+        axis=1
+    )
+
 def preprocess_data_v2_6(df, rules):
     """
     [v4.9.3] v1.4의 ffill/groupby 로직과 v2.6의 동적 성분 추출을 결합.
     '제품이름을 주인으로' 설정 + '브랜드' '누락' 복구.
+    [v2.8] 제품별 Python 루프 제거.
+    - 가격/리뷰/별점은 컬럼 전체를 한 번에 숫자 정리 -> groupby 'first'(첫 유효값) 한 번.
+    - 성분 함량은 'parse_component_pairs' -> 'resolve_component_doses'로 한 번에 추출.
+    - (컴팩트 버전 'preprocess_compact_v2_8' 결과를 v2.6 넓은 형식으로 펼친 것)
     """
-    
-    # 1. v1.4의 ffill 로직 (제품명 채우기)
+    base_df, store = preprocess_compact_v2_8(df, rules)
+    return expand_compact_aggregate(base_df, store)
+
+# ---
+# [v2.8] 멀티코어 전처리 (제품 구간 샤드 -> 프로세스 풀)
+# ---
+
+# 이보다 행이 적으면 프로세스를 띄우는 비용이 더 크므로 직렬 처리
+PARALLEL_MIN_ROWS = 50_000
+# 워커당 샤드 수 (샤드 크기 편차로 한 워커만 늦게 끝나는 것을 완화)
+SHARDS_PER_WORKER = 4
+
+def _preprocess_shard(shard_df, rules):
+    """ [v2.8] (워커 프로세스) 샤드 하나의 부분 집계: (제품명 인덱스 base 조각, long 함량 표) """
+    col_product = rules['columns']['product_name']
+    return (
+        first_valid_columns(shard_df, rules, col_product),
+        resolve_ingredient_doses(shard_df, rules, col_product)
+    )
+
+def _used_columns(rules):
+    """ 전처리에 실제로 쓰이는 원본 컬럼 (샤드 전송량을 줄이기 위해) """
+    return list(dict.fromkeys([
+        rules['columns']['product_name'],
+        rules['columns']['price'],
+        rules['columns']['review_count'],
+        rules['columns']['rating'],
+        rules['columns'].get('brand', '브랜드'),
+        rules['score_a_main_components']['csv_column'],
+        rules['score_c_sub_components']['csv_column'],
+        rules['score_c_tags']['csv_column'],
+    ]))
+
+def shard_by_product(df, col_product, n_shards):
+    """
+    [v2.8] 제품명 '정렬 순서'의 연속 구간으로 n_shards개 샤드 (행 수 기준 균등 분할).
+    - 한 제품의 행은 모두 같은 샤드 (원본 행 순서 유지)
+    - 샤드를 순서대로 이어 붙이면 제품명 정렬 순서 = groupby(sort=True) 결과 순서
+    :return: 행 위치 배열 목록 (빈 샤드 제외)
+    """
+    codes, _ = pd.factorize(df[col_product], sort=True)
+    rows_per_product = np.bincount(codes)
+    cumulative_rows = np.cumsum(rows_per_product)
+    targets = len(codes) * np.arange(1, n_shards) / n_shards
+    boundaries = np.searchsorted(cumulative_rows, targets, side='left') + 1 # 제품 코드 경계
+
+    shard_of_code = np.searchsorted(boundaries, np.arange(len(rows_per_product)), side='right')
+    shard_of_row = shard_of_code[codes]
+    order = np.argsort(shard_of_row, kind='stable')
+    splits = np.cumsum(np.bincount(shard_of_row, minlength=n_shards))[:-1]
+    return [rows for rows in np.split(order, splits) if len(rows)]
+
+def preprocess_parallel_v2_8(df, rules, workers=None):
+    """
+    [v2.8] 'preprocess_compact_v2_8'의 멀티코어 버전 -> (base_df, IngredientStore). 결과 동일.
+    :param workers: 프로세스 수 (None이면 CPU 코어 수). 1 이하이거나 행이 적으면 직렬 처리
+    """
+    workers = workers or os.cpu_count() or 1
     col_product = rules['columns']['product_name']
+    if workers <= 1 or len(df) < PARALLEL_MIN_ROWS:
+        return preprocess_compact_v2_8(df, rules)
+
+    # 1. v1.4의 ffill 로직 (샤드로 나누기 '전'에 전체에서)
     df[col_product] = df[col_product].ffill()
     df = df.dropna(subset=[col_product])
-    
-    processed_data = []
-    grouped = df.groupby(col_product)
-    
-    # 2. v1.4의 groupby 로직 (제품별 '주렁주렁' 그룹화)
-    for product_name, group in grouped:
-        product_row = {'product_name': product_name}
-        
-        # 3. [Score B] 가격, [Market] 리뷰 등 공통 컬럼 추출 (v1.4 방식)
-        def safe_get_first(series_str):
-            # [v4.9.3] 컬럼이 없는 경우를 대비한 방어 코드
-            if series_str not in group.columns:
-                return np.nan
-            series = group[series_str].dropna()
-            if not series.empty:
-                # 숫자 추출 로직 (v1.4)
-                cleaned = pd.to_numeric(
-                    series.astype(str).str.replace(r'[^\d\.]', '', regex=True).replace('', np.nan),
-                    errors='coerce'
-                ).dropna()
-                if not cleaned.empty:
-                    return cleaned.iloc[0]
-            return np.nan
-        
-        product_row['price'] = safe_get_first(rules['columns']['price'])
-        product_row['review_count'] = safe_get_first(rules['columns']['review_count'])
-        product_row['rating'] = safe_get_first(rules['columns']['rating'])
-        
-        # --- [v4.9.3] '브랜드' '누락' 복구 (텍스트용) ---
-        # (룰북에 'brand' 키가 없으면 '브랜드'로 '하드코딩')
-        col_brand = rules['columns'].get('brand', '브랜드') 
-        if col_brand in group.columns: # 컬럼이 있는지 확인
-            series_brand = group[col_brand].dropna()
-            if not series_brand.empty:
-                product_row['브랜드'] = series_brand.iloc[0] # 텍스트는 [0]번만 가져옴
-            else:
-                product_row['브랜드'] = np.nan
-        else:
-            # '브랜드' 컬럼이 룰북에도, CSV에도 없으면 NaN
-            product_row['브랜드'] = np.nan
-        # --- [v4.9.3 수정 완료] ---
-
-        # 4. [Score A] 핵심성분 동적 추출 (v2.6 핵심)
-        col_main_comp = rules['score_a_main_components']['csv_column']
-        if col_main_comp in group.columns:
-            series_main_comp = group[col_main_comp]
-            # [v3.1] 델타 분석기와의 호환성을 위해, '활성화(enabled)' 여부와 관계없이
-            #      룰북에 '발견된' 모든 성분의 함량을 우선 추출한다.
-            for comp_name in rules['score_a_main_components']['rules'].keys():
-                product_row[comp_name] = extract_component_value(series_main_comp, comp_name)
-        else:
-            # 컬럼이 없으면 모든 성분을 NaN으로 채움
-            for comp_name in rules['score_a_main_components']['rules'].keys():
-                product_row[comp_name] = np.nan
-
-        # 5. [Score C-1] 보조 성분 동적 추출 (v2.6)
-        col_sub_comp = rules['score_c_sub_components']['csv_column']
-        if col_sub_comp in group.columns:
-            series_sub_comp = group[col_sub_comp]
-            # [v3.1] 델타 분석기 호환성을 위해, 모든 보조성분 함량 추출
-            for comp_name in rules['score_c_sub_components']['rules'].keys():
-                 product_row[comp_name] = extract_component_value(series_sub_comp, comp_name)
-        else:
-            for comp_name in rules['score_c_sub_components']['rules'].keys():
-                product_row[comp_name] = np.nan
-        
-        # 6. [Score C-2] 특수 태그 텍스트 통째로 가져오기 (v2.6)
-        col_tags = rules['score_c_tags']['csv_column']
-        if col_tags in group.columns:
-            series_tags = group[col_tags].dropna()
-            if not series_tags.empty:
-                product_row['tags_raw'] = series_tags.iloc[0] # 첫번째 태그 줄만 사용
-            else:
-                product_row['tags_raw'] = np.nan
-        else:
-            product_row['tags_raw'] = np.nan
-            
-        processed_data.append(product_row)
+    df = df[[col for col in _used_columns(rules) if col in df.columns]]
+
+    # 2. 제품 구간 샤드 -> 프로세스 풀 (map은 입력 순서대로 결과 반환)
+    shards = [df.iloc[rows] for rows in shard_by_product(df, col_product, workers * SHARDS_PER_WORKER)]
+    if not shards:
+        return preprocess_compact_v2_8(df, rules)
+    with ProcessPoolExecutor(max_workers=min(workers, len(shards))) as executor:
+        partials = list(executor.map(_preprocess_shard, shards, itertools.repeat(rules)))
 
-    return pd.DataFrame(processed_data)
+    # 3. 샤드끼리 제품이 겹치지 않으므로 순서대로 이어 붙이기만 하면 됨
+    base_df = pd.concat([base for base, _ in partials]).rename_axis('product_name').reset_index()
+    doses = pd.concat([dose for _, dose in partials], ignore_index=True)
+    store = store_from_doses(doses, ingredient_names(rules), pd.Index(base_df['product_name']))
+    return base_df, store
 
 # ---
-# [v2.6] 스코어링 함수 (v2.0 합산 모델)
+# [v2.8] 스트리밍 전처리 (수 GB 옵션 행 덤프를 청크 단위로)
 # ---
 
-def calculate_score_a(df, rules_dict):
-    """ [Score A] 핵심성분 점수 (4-파라미터 S-Curve) """
-    component_scores_df = pd.DataFrame(index=df.index)
-    total_weight = 0.0
-    
-    for comp_name, rule in rules_dict['rules'].items():
-        if not rule.get('enabled', False): # 'enabled'가 True인 것만 계산
+# 부분 집계가 이 개수만큼 쌓이면 한 번 합쳐서 (제품 수 만큼으로) 줄임
+STREAM_MERGE_EVERY = 32
+
+def iter_product_groups(chunks, col_product):
+    """
+    [v2.8] CSV 청크 -> '닫힌' 제품 그룹만 담은 DataFrame 스트림 (제품명 ffill 완료).
+    - 청크 첫 행들의 빈 제품명은 '이전 청크의 마지막 제품명'으로 채움 (v1.4 ffill과 동일)
+    - 청크 끝에서 아직 '열린' 제품의 행은 다음 청크 앞에 붙여서 넘김 (한 제품이 청크 경계로 쪼개지지 않음)
+    - 파일 첫 부분의 제품명 없는 행은 v1.4처럼 버림
+    """
+    last_name = np.nan
+    open_rows = None
+    for chunk in chunks:
+        products = chunk[col_product].ffill().fillna(last_name)
+        if len(products) and pd.notna(products.iloc[-1]):
+            last_name = products.iloc[-1]
+        chunk[col_product] = products
+        chunk = chunk.dropna(subset=[col_product])
+        if open_rows is not None:
+            chunk = pd.concat([open_rows, chunk])
+        if chunk.empty:
             continue
-            
-        weight = rule['weight']
-        total_weight += weight
-        
-        # 전처리된 df에서 함량(dose) 데이터 (이미 추출됨)
-        doses = df[comp_name] 
-        
-        comp_score = doses.apply(
-            lambda d: calculate_custom_s_curve_score(
-                d, rule['min_dose'], rule['rec_dose'], rule['rec_score'], rule['saturation_factor']
-            )
-        )
-        component_scores_df[f'A_{comp_name}'] = comp_score * weight
 
+        # 마지막 제품의 '연속된' 꼬리 행 -> 다음 청크로
+        names = chunk[col_product].to_numpy()
+        other_rows = np.flatnonzero(names != names[-1])
+        if len(other_rows) == 0:
+            open_rows = chunk
+            continue
+        tail_start = other_rows[-1] + 1
+        open_rows = chunk.iloc[tail_start:]
+        yield chunk.iloc[:tail_start]
+
+    if open_rows is not None and not open_rows.empty:
+        yield open_rows
+
+def _merge_first_valid(partials):
+    """ 제품명 인덱스 부분 집계들 -> 제품별 '첫 유효값' (앞선 청크 우선) """
+    return pd.concat(partials).groupby(level=0, sort=True).first()
+
+def _merge_doses(partials):
+    """ long 함량 표들 -> (제품, 성분)별 '첫 유효 함량' (앞선 청크 우선) """
+    doses = pd.concat(partials, ignore_index=True)
+    return doses.drop_duplicates(subset=['product_name', 'rule_component'], keep='first')
+
+def aggregate_product_groups(groups, rules):
+    """
+    [v2.8] 제품 그룹 DataFrame 스트림 -> (base_df, IngredientStore).
+    그룹마다 'first_valid_columns' / 'resolve_ingredient_doses' 부분 집계만 보관하고 원본 행은 버림.
+    (같은 제품이 떨어진 위치에 다시 나와도 앞쪽 값 우선으로 합쳐지므로 'preprocess_compact_v2_8'과 동일)
+    """
+    col_product = rules['columns']['product_name']
+    bases, doses = [], []
+    for group_df in groups:
+        bases.append(first_valid_columns(group_df, rules, col_product))
+        doses.append(resolve_ingredient_doses(group_df, rules, col_product))
+        if len(bases) >= STREAM_MERGE_EVERY:
+            bases = [_merge_first_valid(bases)]
+            doses = [_merge_doses(doses)]
+
+    if not bases:
+        bases = [first_valid_columns(pd.DataFrame({col_product: []}), rules, col_product)]
+        doses = [resolve_component_doses(pd.DataFrame(), [])]
+    base_df = _merge_first_valid(bases).rename_axis('product_name').reset_index()
+    store = store_from_doses(
+        _merge_doses(doses), ingredient_names(rules), pd.Index(base_df['product_name'])
+    )
+    return base_df, store
+
+def preprocess_csv_streaming_v2_8(source, rules, chunksize=100_000):
+    """
+    [v2.8] CSV를 chunksize 행씩 읽으며 컴팩트 전처리 -> (base_df, IngredientStore).
+    (원본 전체를 DataFrame으로 올리지 않음. 인코딩 / 컬럼 / dtype은 'load_csv_v2_8'과 같은 'csv_read_options')
+    - 제품명 / 성분 / 태그 / 브랜드 컬럼은 문자열로 읽음 (청크마다 타입 추론이 달라지지 않도록)
+    :param source: 파일 경로 또는 파일 객체
+    """
+    col_product = rules['columns']['product_name']
+    try:
+        options = csv_read_options(source, rules)
+    except Exception as e:
+        raise ValueError(f"파일 로드 오류: {e}") from e
+    try:
+        # (청크 읽기는 기본 'c' 엔진만 지원)
+        with pd.read_csv(source, chunksize=chunksize, **options) as chunks:
+            return aggregate_product_groups(iter_product_groups(chunks, col_product), rules)
+    except KeyError as e:
+        raise ValueError(f"CSV 컬럼 매핑 오류: {e} 컬럼을 CSV에서 찾을 수 없습니다. (룰북의 '공통 컬럼' 설정 확인)") from e
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError(f"데이터 전처리 중 오류: {e}") from e
+
+# ---
+# [v2.6] 스코어링 함수 (v2.0 합산 모델)
+# ---
+
+# S-Curve 성분 룰의 파라미터 순서 'COMPONENT_PARAM_KEYS'는 [v2.8] 'rulebook_v2'에 정의 (증분/배치 엔진의 캐시 키로도 사용)
+
+def calculate_component_scores(df, rules_dict, prefix, store=None):
+    """
+    [v2.8] '활성화(enabled)'된 성분 전체를 (제품 x 성분) 행렬로 모아 S-Curve를 한 번에 계산.
+    [v2.8] 파라미터 배열은 'component_params' (룰북 스냅샷이면 섹션당 1회 컴파일한 배열 재사용)
+    :param store: 'IngredientStore' (있으면 함량을 df 컬럼 대신 여기서 읽음)
+    :return: (가중 점수 DataFrame ['{prefix}_성분명' 컬럼], 가중치 합계)
+    """
+    compiled = component_params(rules_dict) # 'enabled'가 True인 것만
+    if not compiled.names:
+        return pd.DataFrame(index=df.index), 0.0
+
+    names = list(compiled.names)
+    params = compiled.params
+
+    # 전처리된 df(또는 store)에서 함량(dose) 데이터 (이미 추출됨)
+    if store is not None:
+        doses = store.columns(names)
+    else:
+        doses = df[names].to_numpy(dtype=float)
+    scores = calculate_s_curve_scores(
+        doses, params['min_dose'], params['rec_dose'], params['rec_score'], params['saturation_factor']
+    )
+
+    total_weight = sum(params['weight'].tolist(), 0.0) # (v2.6과 동일한 순차 합산)
+
+    component_scores_df = pd.DataFrame(
+        scores * params['weight'],
+        index=df.index,
+        columns=[f'{prefix}_{comp_name}' for comp_name in names]
+    )
+    return component_scores_df, total_weight
+
+def sum_component_scores(component_scores_df, total_weight):
+    """ [v2.8] 가중 성분 점수 합계 / 가중치 합계 (가중치 합이 0이면 0점) """
     if total_weight == 0:
-        return pd.Series(0.0, index=df.index), component_scores_df
+        return pd.Series(0.0, index=component_scores_df.index)
+    return component_scores_df.sum(axis=1) / total_weight
 
-    final_score_a = component_scores_df.sum(axis=1) / total_weight
+def calculate_score_a(df, rules_dict, store=None):
+    """ [Score A] 핵심성분 점수 (4-파라미터 S-Curve) """
+    component_scores_df, total_weight = calculate_component_scores(df, rules_dict, 'A', store)
+    final_score_a = sum_component_scores(component_scores_df, total_weight)
     return final_score_a, component_scores_df
 
-def calculate_score_b(df, rules_dict):
+def score_from_price_z(price_z, rules_dict):
+    """ [v2.8] 가격 Z-Score -> Score B (시그모이드, 벡터 연산) """
+    return apply_sigmoid(price_z, k=rules_dict['k_value'])
+
+def calculate_score_b(df, rules_dict, stats=None):
     """ [Score B] 가격 점수 (Z-Score) """
-    price_z = calculate_z_scores(df['price'], direction='lower_is_better')
-    price_score = price_z.apply(lambda z: apply_sigmoid(z, k=rules_dict['k_value']))
+    price_z = calculate_z_scores(df['price'], direction='lower_is_better', stats=stats)
+    price_score = score_from_price_z(price_z, rules_dict)
     return price_score
 
-def calculate_score_c(df, rules_dict_sub, rules_dict_tags):
-    """ [Score C] 보조성분(S-Curve) + 태그(합산) """
-    
-    # C-1: 보조성분 (S-Curve, Score A와 로직 동일)
-    component_scores_df = pd.DataFrame(index=df.index)
-    total_weight = 0.0
-    
-    for comp_name, rule in rules_dict_sub['rules'].items():
-        if not rule.get('enabled', False): # 'enabled'가 True인 것만 계산
-            continue
-            
-        weight = rule['weight']
-        total_weight += weight
-        doses = df[comp_name]
-        
-        comp_score = doses.apply(
-            lambda d: calculate_custom_s_curve_score(
-                d, rule['min_dose'], rule['rec_dose'], rule['rec_score'], rule['saturation_factor']
-            )
-        )
-        component_scores_df[f'C1_{comp_name}'] = comp_score * weight
-    
-    if total_weight == 0:
-        score_c1 = pd.Series(0.0, index=df.index)
-    else:
-        score_c1 = component_scores_df.sum(axis=1) / total_weight
-
-    # C-2: 특수태그 (점수 합산)
-    tag_rules = rules_dict_tags['rules']
-    series_tags_raw = df['tags_raw']
-    score_c2 = pd.Series(0.0, index=df.index)
-    
-    for tag_name, tag_score in tag_rules.items():
-        if pd.isna(tag_name) or tag_score == 0: # 점수가 0이면 무시
-            continue
-        
-        # [v2.6.3] 수정된 정규식
-        has_tag = series_tags_raw.str.contains(
-            f"{re.escape(tag_name)}\s*\*", na=False, regex=True
-        )
-        
-        score_c2[has_tag] += tag_score
+def calculate_score_c2(df, rules_dict_tags, tag_incidence=None):
+    """
+    [Score C-2] 특수태그 (점수 합산)
+    [v2.8] (제품 x 태그) 포함 행렬 @ 태그 점수 벡터. 점수가 0인 태그는 무시.
+    (판정 규칙은 [v2.6.3] 정규식 '태그명 + 공백* + "*"'과 동일)
+    :param tag_incidence: 데이터셋당 한 번 만든 'TagIncidence' (없으면 여기서 생성)
+    """
+    if tag_incidence is None:
+        tag_incidence = TagIncidence(df['tags_raw'])
+    return tag_incidence.score(rules_dict_tags['rules'])
 
-    # C_final = C1점수 * C1비중 + C2점수 * C2비중
+def combine_score_c(score_c1, score_c2, rules_dict_sub, rules_dict_tags):
+    """ C_final = C1점수 * C1비중 + C2점수 * C2비중 """
     w_c1 = rules_dict_sub['final_weight']
     w_c2 = rules_dict_tags['final_weight']
     total_c_weight = w_c1 + w_c2
     if total_c_weight == 0: total_c_weight = 1.0
     
-    final_score_c = ((score_c1 * w_c1) + (score_c2 * w_c2)) / total_c_weight
+    return ((score_c1 * w_c1) + (score_c2 * w_c2)) / total_c_weight
+
+def calculate_score_c(df, rules_dict_sub, rules_dict_tags, tag_incidence=None, store=None):
+    """ [Score C] 보조성분(S-Curve) + 태그(합산) """
+    
+    # C-1: 보조성분 (S-Curve, Score A와 로직 동일)
+    component_scores_df, total_weight = calculate_component_scores(df, rules_dict_sub, 'C1', store)
+    score_c1 = sum_component_scores(component_scores_df, total_weight)
+
+    # C-2: 특수태그 (점수 합산)
+    score_c2 = calculate_score_c2(df, rules_dict_tags, tag_incidence)
+
+    final_score_c = combine_score_c(score_c1, score_c2, rules_dict_sub, rules_dict_tags)
     
     return final_score_c, score_c1, score_c2, component_scores_df
 
@@ -280,13 +760,8 @@ def calculate_score_c(df, rules_dict_sub, rules_dict_tags):
 # [v2.7 신규] 델타 분석기용 Market Score 계산기 (v1.4 부활)
 # ---
 
-def calculate_market_score_v2(agg_df, rules_dict):
-    """
-    델타 분석기 전용 Market Score를 계산합니다. (v1.4 로직 재활용)
-    :param agg_df: 전처리/그룹핑이 완료된 데이터프레임
-    :param rules_dict: 'market_score_weights' 룰북 딕셔너리
-    :return: (pd.Series) 0~100점의 Market Score
-    """
+def combine_market_score(review_z, rating_z, rules_dict):
+    """ [v2.8] 리뷰 수 / 별점 Z-Score -> Market Score (룰북 가중치 합산) """
     
     # 룰북에서 가중치와 k값(기울기) 추출
     k_review = rules_dict.get('k_review', 2.0)
@@ -294,34 +769,131 @@ def calculate_market_score_v2(agg_df, rules_dict):
     w_review = rules_dict.get('weight_review', 0.7)
     w_rating = rules_dict.get('weight_rating', 0.3)
     
-    # 리뷰 수 (v1.4 로직)
-    review_z = calculate_z_scores(agg_df['review_count'], direction='higher_is_better')
-    review_score = review_z.apply(lambda z: apply_sigmoid(z, k=k_review))
-    
-    # 별점 (v1.4 로직)
-    rating_z = calculate_z_scores(agg_df['rating'], direction='higher_is_better')
-    rating_score = rating_z.apply(lambda z: apply_sigmoid(z, k=k_rating))
+    review_score = apply_sigmoid(review_z, k=k_review)
+    rating_score = apply_sigmoid(rating_z, k=k_rating)
     
     # 합산
     total_weight = w_review + w_rating
     if total_weight == 0: total_weight = 1.0
     
-    market_score = ( (review_score * w_review) + (rating_score * w_rating) ) / total_weight
+    return ( (review_score * w_review) + (rating_score * w_rating) ) / total_weight
+
+def calculate_market_score_v2(agg_df, rules_dict, score_stats=None):
+    """
+    델타 분석기 전용 Market Score를 계산합니다. (v1.4 로직 재활용)
+    :param agg_df: 전처리/그룹핑이 완료된 데이터프레임
+    :param rules_dict: 'market_score_weights' 룰북 딕셔너리
+    :param score_stats: [v2.8] 'merge_score_stats' 전역 통계 (None이면 agg_df 자체로 계산)
+    :return: (pd.Series) 0~100점의 Market Score
+    """
+    score_stats = score_stats or {}
+    
+    # 리뷰 수 / 별점 (v1.4 로직)
+    review_z = calculate_z_scores(
+        agg_df['review_count'], direction='higher_is_better', stats=score_stats.get('review_count')
+    )
+    rating_z = calculate_z_scores(
+        agg_df['rating'], direction='higher_is_better', stats=score_stats.get('rating')
+    )
     
-    return market_score
+    return combine_market_score(review_z, rating_z, rules_dict)
+
+# ---
+# [v2.8] 파티션 점수화용 Z-Score 통계 (수집 -> 병합 -> 전역 통계로 점수화)
+# ---
+
+# Z-Score를 쓰는 컬럼 (Score B: 가격, MarketScore: 리뷰 수 / 별점)
+Z_SCORE_COLUMNS = ('price', 'review_count', 'rating')
+
+def collect_score_stats(base_df):
+    """ [v2.8] 1단계: 파티션(전처리된 base_df 조각) 하나의 { 컬럼: RunningStats } """
+    return {col: RunningStats.from_values(base_df[col]) for col in Z_SCORE_COLUMNS}
+
+def merge_score_stats(stats_list):
+    """ [v2.8] 2단계: 파티션 통계들을 합친 전역 { 컬럼: RunningStats } """
+    stats_list = list(stats_list)
+    return {
+        col: RunningStats.merge_all(stats[col] for stats in stats_list)
+        for col in Z_SCORE_COLUMNS
+    }
+
+# ---
+# [v2.8] 전처리 캐시 키 (전처리에 '실제로' 쓰이는 룰북 부분만)
+# ---
+
+def preprocess_cache_key(rules):
+    """
+    'preprocess_data_v2_6' 결과에 영향을 주는 룰북 필드만 모아 다이제스트를 만든다.
+    - 'columns' 매핑, 성분/태그의 'csv_column', 성분 '이름' 목록(순서 포함)
+    - 가중치, S-Curve 파라미터, 태그 점수, 'enabled' 여부는 포함하지 않음
+    """
+    payload = {
+        'columns': dict(rules['columns']),
+        'score_a_main_components': {
+            'csv_column': rules['score_a_main_components']['csv_column'],
+            'names': list(rules['score_a_main_components']['rules'].keys()),
+        },
+        'score_c_sub_components': {
+            'csv_column': rules['score_c_sub_components']['csv_column'],
+            'names': list(rules['score_c_sub_components']['rules'].keys()),
+        },
+        'score_c_tags': {
+            'csv_column': rules['score_c_tags']['csv_column'],
+        },
+    }
+    encoded = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+def delta_cache_key(rules):
+    """
+    [v2.8] 델타 분석기 데이터(전처리 + MarketScore)에 영향을 주는 룰북 필드의 다이제스트.
+    - 'preprocess_cache_key' + 'market_score_weights' (그 외 가중치 / S-Curve / 태그 점수는 제외)
+    """
+    payload = {
+        'preprocess': preprocess_cache_key(rules),
+        'market_score_weights': dict(rules['market_score_weights']),
+    }
+    encoded = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
 
 # ---
 # [v4.9.3] 메인 파이프라인 ('MarketScore' '누락' 복구)
+# [v2.8] '전처리' / '스코어링' 단계 분리 (전처리 결과는 앱에서 캐시)
 # ---
 
-def run_full_analysis_v2_6(df, dynamic_rulebook):
-    """ [v4.9.3] v2.6의 모든 분석 파이프라인 총괄 (MarketScore 포함) """
-    
-    rules = dynamic_rulebook
-    
-    # 1. 데이터 전처리 (v2.6)
+# [v2.8] 메모리 절약 모드: 함량 / 점수 저장 dtype, 범주형으로 보관할 텍스트 컬럼
+LEAN_FLOAT_DTYPE = np.float32
+LEAN_CATEGORY_COLUMNS = ('브랜드', 'tags_raw')
+
+def lean_base_frame(base_df):
+    """
+    [v2.8] 메모리 절약 모드: 반복이 많은 텍스트('브랜드', 'tags_raw')를 범주형으로 (나머지 컬럼은 공유).
+    (가격 / 리뷰 / 별점은 Z-Score 정밀도를 위해 float64 유지)
+    """
+    return base_df.assign(**{
+        col: base_df[col].astype('category') for col in LEAN_CATEGORY_COLUMNS if col in base_df.columns
+    })
+
+def run_preprocess_v2_6(df, rules, compact=False, workers=None, component_tokens=None, lean=False):
+    """
+    [v2.8] 파이프라인 1단계: 전처리 (원본 df는 수정하지 않음)
+    :param compact: True면 (base_df, IngredientStore), False면 v2.6 넓은 agg_df
+    :param workers: 2 이상이면 멀티코어 전처리 ('preprocess_parallel_v2_8', 결과 동일)
+    :param component_tokens: 같은 df의 'CatalogScan.component_tokens' (직렬 컴팩트 경로에서 재사용)
+    :param lean: 메모리 절약 모드 ('브랜드' / 'tags_raw' 범주형, 함량 float32 - 'lean_base_frame')
+    """
     try:
-        agg_df = preprocess_data_v2_6(df.copy(), rules) # (v4.9.3 '브랜드' 포함)
+        # [v2.8] 원본 전체를 복사하지 않고 전처리에 쓰는 컬럼만 (제품명 ffill은 이 프레임에만 적용)
+        df = df[[col for col in _used_columns(rules) if col in df.columns]].copy(deep=False)
+        if workers is not None and workers > 1:
+            base_df, store = preprocess_parallel_v2_8(df, rules, workers)
+        elif compact:
+            base_df, store = preprocess_compact_v2_8(df, rules, component_tokens)
+        else:
+            return preprocess_data_v2_6(df, rules) # (v4.9.3 '브랜드' 포함)
+        if lean:
+            base_df, store = lean_base_frame(base_df), store.astype(LEAN_FLOAT_DTYPE)
+        return (base_df, store) if compact else expand_compact_aggregate(base_df, store)
     except KeyError as e:
         # [v4.9.3] 룰북에 'brand'가 추가됐는지 확인하라는 '친절한' [cite: 2025-09-02] 오류 메시지
         if str(e) == "'브랜드'":
@@ -330,6 +902,12 @@ def run_full_analysis_v2_6(df, dynamic_rulebook):
     except Exception as e:
         raise ValueError(f"데이터 전처리 중 오류: {e}")
 
+def run_scoring_v2_6(agg_df, rules):
+    """
+    [v2.8] 파이프라인 2단계: 전처리된 agg_df로 A/B/C + MarketScore 스코어링.
+    (agg_df는 수정하지 않으므로 캐시된 결과를 그대로 넘겨도 됨)
+    """
+
     # --- [v4.9.3] 'MarketScore' '누락' 복구 (Tab 1 표시용) ---
     market_scores = calculate_market_score_v2(agg_df, rules['market_score_weights'])
     # --- [v4.9.3 수정 완료] ---
@@ -344,15 +922,27 @@ def run_full_analysis_v2_6(df, dynamic_rulebook):
     )
 
     # 3. 최종 점수 합산 (최종 가중치)
-    w_a = rules['final_weights']['weight_a']
-    w_b = rules['final_weights']['weight_b']
-    w_c = rules['final_weights']['weight_c']
+    final_score = combine_final_score(score_a, score_b, score_c, rules['final_weights'])
+
+    # 4. 최종 데이터프레임
+    return assemble_final_df(
+        agg_df, final_score, score_a, score_b, score_c, market_scores,
+        score_c1, score_c2, score_a_details, score_c_details
+    )
+
+def combine_final_score(score_a, score_b, score_c, final_weights):
+    """ [v2.8] 최종 점수 = A/B/C 가중 평균 (가중치 합이 0이면 1로 나눔) """
+    w_a = final_weights['weight_a']
+    w_b = final_weights['weight_b']
+    w_c = final_weights['weight_c']
     total_weight = w_a + w_b + w_c
     if total_weight == 0: total_weight = 1.0
     
-    final_score = ( (score_a * w_a) + (score_b * w_b) + (score_c * w_c) ) / total_weight
+    return ( (score_a * w_a) + (score_b * w_b) + (score_c * w_c) ) / total_weight
 
-    # 4. 최종 데이터프레임
+def assemble_final_df(agg_df, final_score, score_a, score_b, score_c, market_scores,
+                      score_c1, score_c2, score_a_details, score_c_details):
+    """ [v2.8] 최종 데이터프레임 조립 + 'SWAN_SCORE_V2' 내림차순 정렬 """
     final_df = agg_df.copy()
     final_df['SWAN_SCORE_V2'] = final_score
     final_df['SCORE_A (핵심성분)'] = score_a
@@ -366,4 +956,871 @@ def run_full_analysis_v2_6(df, dynamic_rulebook):
     
     final_df = pd.concat([final_df, score_a_details, score_c_details], axis=1)
 
-    return final_df.sort_values(by='SWAN_SCORE_V2', ascending=False)
\ No newline at end of file
+    return final_df.sort_values(by='SWAN_SCORE_V2', ascending=False)
+
+# ---
+# [v2.8] 컴팩트 결과 (성분 함량 / 성분 점수는 IngredientStore, 넓은 DataFrame은 필요할 때만)
+# ---
+
+SCORE_COLUMNS = [
+    'SWAN_SCORE_V2', 'SCORE_A (핵심성분)', 'SCORE_B (가격)', 'SCORE_C (보조/태그)',
+    'MARKET_SCORE', 'C1 (보조성분 점수)', 'C2 (태그 점수)'
+]
+
+def top_k_positions(scores, top_k=None):
+    """
+    [v2.8] 점수 내림차순 위치 (동점은 원래 위치 순 - 안정 정렬, NaN은 맨 뒤).
+    top_k면 전체 정렬 대신 부분 선택(argpartition) 후 K개만 정렬.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    n_products = len(scores)
+    if top_k is None or top_k >= n_products:
+        return np.argsort(-scores, kind='stable')
+    if top_k <= 0:
+        return np.empty(0, dtype=np.int64)
+    candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+    # 경계 동점 처리를 위해 top_k번째 점수 이상인 제품 전체에서 안정 정렬
+    threshold = scores[candidates].min()
+    if np.isnan(threshold):
+        tied = np.arange(n_products) # (NaN까지 들어가면 전체 정렬과 같음)
+    else:
+        tied = np.flatnonzero(scores >= threshold)
+    return tied[np.argsort(-scores[tied], kind='stable')][:top_k]
+
+class AnalysisResult:
+    """
+    [v2.8] 분석 결과 (컴팩트).
+    - table: 제품별 기본 컬럼 + 점수 컬럼 (전처리 순서 그대로, 정렬 전)
+    - store: (제품 x 성분) 함량 'IngredientStore'
+    - details: (제품 x 'A_*'/'C1_*') 가중 성분 점수 'IngredientStore' (없는 칸 = 0점)
+    - order: 'SWAN_SCORE_V2' 내림차순 행 위치 (동점은 원래 순서)
+    'to_frame()'은 v2.6 'run_full_analysis_v2_6'과 같은 넓은 DataFrame을 (필요한 행만) 만든다.
+    [v2.8] 순위는 필요한 만큼만 계산 (상위 K개 / 페이지 단위 조회 시 전체 정렬 생략).
+    """
+
+    def __init__(self, table, store, details):
+        self.table = table
+        self.store = store
+        self.details = details
+        self._scores = table['SWAN_SCORE_V2'].to_numpy(dtype=np.float64, na_value=np.nan)
+        self._ranked = np.empty(0, dtype=np.int64) # 지금까지 계산한 상위 순위 (행 위치)
+
+    def __len__(self):
+        return len(self.table)
+
+    @property
+    def nbytes(self):
+        """ 표(문자열 포함) + 함량 + 성분 점수 메모리 """
+        return int(self.table.memory_usage(deep=True).sum()) + self.store.nbytes + self.details.nbytes
+
+    def top_positions(self, n):
+        """ 상위 n위의 행 위치 (이미 계산한 범위면 재사용, 부족하면 2배씩 늘려 부분 선택) """
+        n = min(n, len(self))
+        if n > len(self._ranked):
+            n_rank = len(self) if n * 2 >= len(self) else max(n, 2 * len(self._ranked))
+            self._ranked = top_k_positions(self._scores, n_rank)
+        return self._ranked[:n]
+
+    @property
+    def order(self):
+        """ 전체 순위 (행 위치) """
+        return self.top_positions(len(self))
+
+    def n_pages(self, page_size):
+        return max(1, -(-len(self) // page_size))
+
+    def page(self, page_no, page_size):
+        """ page_no(0부터)번째 페이지 (순위 page_no*page_size ~ ) """
+        start = page_no * page_size
+        return self.to_frame(slice(start, start + page_size))
+
+    def to_frame(self, rows=None):
+        """
+        순위 기준 rows(슬라이스/위치 배열, None이면 전체)에 해당하는 행만 넓은 DataFrame으로.
+        (컬럼 순서: 기본 컬럼 + 성분 함량 + 'tags_raw' + 점수 + 'A_*' / 'C1_*')
+        (끝이 정해진 슬라이스면 그 순위까지만 계산)
+        """
+        if rows is None:
+            positions = self.order
+        elif isinstance(rows, slice) and rows.stop is not None and rows.stop >= 0 and (rows.step or 1) > 0:
+            positions = self.top_positions(rows.stop)[rows]
+        else:
+            positions = self.order[rows]
+        base = self.table.iloc[positions]
+        base_cols = [col for col in base.columns if col not in SCORE_COLUMNS and col != 'tags_raw']
+        return pd.concat(
+            [
+                base[base_cols],
+                self.store.to_frame(rows=positions, index=base.index),
+                base[['tags_raw'] + SCORE_COLUMNS],
+                self.details.to_frame(rows=positions, index=base.index),
+            ],
+            axis=1
+        )
+
+def build_analysis_result(base_df, store, final_score, score_a, score_b, score_c, market_scores,
+                          score_c1, score_c2, score_a_details, score_c_details, lean=False):
+    """
+    [v2.8] 점수들을 'AnalysisResult'로 묶음 (성분 점수는 IngredientStore로 압축)
+    [v2.8] lean: 점수 / 성분 점수를 float32로 보관 (계산은 float64로 끝난 뒤 저장만)
+    """
+    table = base_df.copy(deep=False)
+    for col, values in zip(SCORE_COLUMNS, (
+        final_score, score_a, score_b, score_c, market_scores, score_c1, score_c2
+    )):
+        table[col] = values.astype(LEAN_FLOAT_DTYPE) if lean else values
+
+    detail_names = list(score_a_details.columns) + list(score_c_details.columns)
+    detail_values = np.hstack([
+        score_a_details.to_numpy(dtype=float), score_c_details.to_numpy(dtype=float)
+    ])
+    details = IngredientStore.from_dense(detail_values, base_df.index, detail_names, fill_value=0.0)
+    if lean:
+        details = details.astype(LEAN_FLOAT_DTYPE)
+    return AnalysisResult(table, store, details)
+
+def score_compact_v2_8(base_df, store, rules, tag_incidence=None, score_stats=None, report=None, lean=False):
+    """
+    [v2.8] 컴팩트 스코어링: (base_df, store) -> 'AnalysisResult'
+    ('run_scoring_v2_6'과 같은 점수, 넓은 DataFrame은 만들지 않음)
+    :param score_stats: 'merge_score_stats' 전역 통계 (파티션 하나만 점수화할 때, None이면 base_df 자체 통계)
+    :param report: 'PipelineReport'면 단계별 시간 / 메모리 기록
+    :param lean: 메모리 절약 모드 (결과 점수를 float32로 보관)
+    """
+    score_stats = score_stats or {}
+    n_products = len(base_df)
+    with report_stage(report, 'market_score', n_products):
+        market_scores = calculate_market_score_v2(base_df, rules['market_score_weights'], score_stats)
+    with report_stage(report, 'score_a', n_products):
+        score_a, score_a_details = calculate_score_a(base_df, rules['score_a_main_components'], store)
+    with report_stage(report, 'score_b', n_products):
+        score_b = calculate_score_b(base_df, rules['score_b_price'], stats=score_stats.get('price'))
+    with report_stage(report, 'score_c', n_products):
+        score_c, score_c1, score_c2, score_c_details = calculate_score_c(
+            base_df,
+            rules['score_c_sub_components'],
+            rules['score_c_tags'],
+            tag_incidence,
+            store
+        )
+    with report_stage(report, 'final_score', n_products):
+        final_score = combine_final_score(score_a, score_b, score_c, rules['final_weights'])
+    with report_stage(report, 'build_result', n_products) as record:
+        result = build_analysis_result(
+            base_df, store, final_score, score_a, score_b, score_c, market_scores,
+            score_c1, score_c2, score_a_details, score_c_details, lean=lean
+        )
+        record['output_mb'] = memory_mb(result)
+    return result
+
+def run_full_analysis_v2_6(df, dynamic_rulebook, workers=None, top_k=None, report=None, lean=False):
+    """
+    [v4.9.3] v2.6의 모든 분석 파이프라인 총괄 (MarketScore 포함)
+    [v2.8] workers: 2 이상이면 멀티코어 전처리
+    [v2.8] top_k: 상위 K개만 반환 (전체 정렬 대신 부분 선택).
+        전체 제품 수는 'final_df.attrs["total_products"]'
+    [v2.8] report: 'PipelineReport'를 주면 단계별 시간 / 행 수 / 최대 메모리 (+ 선택 시 cProfile) 기록,
+        'final_df.attrs["pipeline_report"]'에도 dict로 첨부
+    [v2.8] lean: 메모리 절약 모드 (범주형 텍스트, float32 함량 / 점수 - 점수는 float32 반올림만큼 다를 수 있음)
+    """
+    
+    rules = dynamic_rulebook
+    
+    with report_run(report):
+        # 1. 데이터 전처리 (v2.8: 컴팩트 - 성분 함량은 IngredientStore)
+        with report_stage(report, 'preprocess', len(df)) as record:
+            base_df, store = run_preprocess_v2_6(df, rules, compact=True, workers=workers, lean=lean)
+            record['rows_out'] = len(base_df)
+            record['output_mb'] = memory_mb(base_df, store)
+
+        # 2~4. 스코어링 + 최종 데이터프레임 (v2.6과 같은 넓은 형식으로 펼쳐서 반환)
+        final_df = _score_to_frame(base_df, store, rules, top_k, report, lean)
+    if report is not None:
+        final_df.attrs['pipeline_report'] = report.to_dict()
+    return final_df
+
+def _score_to_frame(base_df, store, rules, top_k=None, report=None, lean=False):
+    """ [v2.8] 컴팩트 스코어링 -> 순위 -> 넓은 표 (전체 / 증분 분석 공용, 'total_products' 첨부) """
+    result = score_compact_v2_8(base_df, store, rules, report=report, lean=lean)
+    rows = None if top_k is None else slice(0, top_k)
+    with report_stage(report, 'rank', len(result)) as record:
+        record['rows_out'] = len(result.top_positions(len(result) if top_k is None else top_k))
+    with report_stage(report, 'to_frame', len(result)) as record:
+        final_df = result.to_frame(rows)
+        record['rows_out'] = len(final_df)
+        record['output_mb'] = memory_mb(final_df)
+    final_df.attrs['total_products'] = len(result)
+    return final_df
+
+# ---
+# [v2.8] 증분 일일 스코어링 (어제 집계 재사용, 바뀐 제품만 전처리)
+# ---
+
+# 상태 폴더에 지문을 함께 저장하는 base 표 컬럼
+FINGERPRINT_COLUMN = '_fingerprint'
+
+def product_fingerprints(df, col_product):
+    """
+    [v2.8] 제품별 64비트 지문 (제품명 정렬 순서 Series, 'groupby(sort=True)'와 같은 순서).
+    행 해시(전처리에 쓰는 컬럼 값)를 제품 안의 행 순번과 함께 다시 해시하여 제품별로 합산 (2^64 나머지)
+    -> 값 / 행 순서 / 행 수 중 하나라도 바뀌면 (사실상 항상) 다른 지문.
+    :param df: 제품명 ffill / 결측 제거가 끝난 원본 (전처리에 쓰는 컬럼만)
+    """
+    products = df[col_product].to_numpy()
+    codes, names = pd.factorize(products, sort=True)
+    row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    positions = pd.Series(codes).groupby(codes).cumcount().to_numpy()
+    keyed = pd.util.hash_pandas_object(
+        pd.DataFrame({'row': row_hashes, 'position': positions}), index=False
+    ).to_numpy()
+    sums = np.zeros(len(names), dtype=np.uint64)
+    np.add.at(sums, codes, keyed)
+    return pd.Series(sums, index=pd.Index(names, name='product_name'))
+
+class IncrementalState:
+    """
+    [v2.8] 증분 스코어링 상태 (어제 전처리 결과 + 제품 지문).
+    - fingerprints / base_df / store는 같은 행 순서 (제품명 정렬)
+    - preprocess_key가 오늘 룰북과 다르면 (컬럼 매핑 / 성분 목록 변경) 재사용하지 않음
+    - 'save' / 'load': 'dataset_cache_v2.write_compact' 형식 폴더 (base 표에 지문 컬럼 추가)
+      저장은 폴더째 교체, 읽을 때 meta(제품 수 / 성분 목록 / 지문 / 함량 다이제스트)와 파일들이 맞는지 확인
+    - base_df / store는 메모리 절약 변환 '전'(float64 함량) 집계, lean은 상태를 만든 실행의 모드
+      (모드가 다른 실행은 재사용하지 않음 - 원본 로더의 범주형 컬럼 등 dtype이 다름)
+    """
+
+    def __init__(self, preprocess_key, fingerprints, base_df, store, lean=False):
+        self.preprocess_key = preprocess_key
+        self.fingerprints = fingerprints
+        self.base_df = base_df
+        self.store = store
+        self.lean = lean
+
+    def __len__(self):
+        return len(self.fingerprints)
+
+    @staticmethod
+    def _fingerprint_digest(fingerprints):
+        return hashlib.sha256(np.ascontiguousarray(fingerprints, dtype=np.uint64).tobytes()).hexdigest()
+
+    @staticmethod
+    def _store_digest(store):
+        """ 함량 배열 다이제스트 (희소면 CSC 3배열, 밀집이면 값 - 저장 / 읽기 후 같은 값) """
+        digest = hashlib.sha256()
+        if store.is_sparse:
+            arrays = (store.matrix.data, store.matrix.indices, store.matrix.indptr)
+        else:
+            arrays = (store.matrix,)
+        for array in arrays:
+            digest.update(np.ascontiguousarray(array).tobytes())
+        return digest.hexdigest()
+
+    def save(self, directory):
+        """ 폴더째 교체 (중간에 끊기거나 동시에 저장해도 다른 날 / 다른 실행의 파일과 섞이지 않음) """
+        fingerprints = self.fingerprints.to_numpy()
+        dataset_cache_v2.write_compact(
+            directory, self.base_df.assign(**{FINGERPRINT_COLUMN: fingerprints}), self.store,
+            meta={
+                'preprocess_key': self.preprocess_key, 'products': len(self),
+                'components': list(self.store.names), 'fingerprints': self._fingerprint_digest(fingerprints),
+                'store': self._store_digest(self.store), 'lean': self.lean,
+            },
+            replace=True
+        )
+
+    @classmethod
+    def load(cls, directory):
+        """
+        저장된 상태, 없거나 읽을 수 없거나 파일끼리 맞지 않으면 None (다음 실행이 전체 전처리로 새 상태를 만듦).
+        (meta의 제품 수 = base 행 수 = store 행 수, 성분 목록, base 지문 컬럼 / 함량 배열의 다이제스트를 확인)
+        """
+        try:
+            compact = dataset_cache_v2.read_compact(directory)
+            if compact is None or compact[2] is None:
+                return None
+            base_df, store, meta = compact
+            fingerprints = base_df[FINGERPRINT_COLUMN].to_numpy(dtype=np.uint64)
+            consistent = (
+                meta.get('products') == len(base_df) == store.shape[0]
+                and meta.get('components') == list(store.names)
+                and meta.get('fingerprints') == cls._fingerprint_digest(fingerprints)
+                and meta.get('store') == cls._store_digest(store)
+            )
+        except Exception:
+            return None
+        if not consistent:
+            return None
+        fingerprints = pd.Series(fingerprints, index=pd.Index(base_df['product_name'], name='product_name'))
+        return cls(
+            meta['preprocess_key'], fingerprints, base_df.drop(columns=[FINGERPRINT_COLUMN]), store,
+            lean=meta.get('lean') # (모드가 기록되지 않은 예전 상태는 None -> 어느 모드에서도 재사용하지 않음)
+        )
+
+    def __repr__(self):
+        return (
+            f"IncrementalState(products={len(self)}, preprocess_key={self.preprocess_key[:12]!r}, lean={self.lean!r})"
+        )
+
+def preprocess_incremental_v2_8(df, rules, previous=None, component_tokens=None, lean=False):
+    """
+    [v2.8] 증분 컴팩트 전처리 -> (base_df, IngredientStore, 새 IncrementalState, 통계).
+    - 지문이 어제(previous)와 같은 제품: 어제 집계를 그대로 (원본 행을 파싱하지 않음)
+    - 바뀐 / 새 제품: 그 제품의 행만 'preprocess_compact_v2_8', 사라진 제품: 제외
+    - 결과는 'run_preprocess_v2_6(compact=True)'와 동일 (제품 집계는 제품 안의 행에만 의존)
+    :param previous: 어제 'IncrementalState' (None이거나 전처리 키 / 모드(lean)가 다르면 전체 전처리)
+    :param lean: 반환하는 base_df / store만 메모리 절약 변환 (새 상태는 변환 전 float64 집계로)
+    :param component_tokens: 같은 df의 'CatalogScan.component_tokens' (전체 전처리일 때만 사용)
+    :return: 통계 = {'products', 'reused', 'changed', 'new', 'removed', 'parsed_rows'}
+    """
+    col_product = rules['columns']['product_name']
+    preprocess_key = preprocess_cache_key(rules)
+    projected = df[[col for col in _used_columns(rules) if col in df.columns]].copy(deep=False)
+    projected[col_product] = projected[col_product].ffill()
+    rows_df = projected[projected[col_product].notna().to_numpy()]
+    fingerprints = product_fingerprints(rows_df, col_product)
+
+    if previous is None or previous.preprocess_key != preprocess_key or previous.lean != lean:
+        base_df, store = preprocess_compact_v2_8(projected, rules, component_tokens)
+        stats = {
+            'products': len(fingerprints), 'reused': 0, 'changed': 0, 'new': len(fingerprints),
+            'removed': 0 if previous is None else len(previous), 'parsed_rows': len(rows_df),
+        }
+    else:
+        previous_rows = previous.fingerprints.index.get_indexer(fingerprints.index)
+        known = previous_rows >= 0
+        unchanged = known & (previous.fingerprints.to_numpy()[previous_rows] == fingerprints.to_numpy())
+        parse_rows_df = rows_df[rows_df[col_product].isin(fingerprints.index[~unchanged])]
+        stats = {
+            'products': len(fingerprints), 'reused': int(unchanged.sum()),
+            'changed': int((known & ~unchanged).sum()), 'new': int((~known).sum()),
+            'removed': len(previous) - int(known.sum()), 'parsed_rows': len(parse_rows_df),
+        }
+
+        # 어제 집계(재사용 제품) + 오늘 집계(바뀐 / 새 제품) -> 제품명 정렬 순서로
+        reused_rows = previous_rows[unchanged]
+        base_parts = [previous.base_df.iloc[reused_rows]]
+        store_parts = [previous.store.take(reused_rows)]
+        if len(parse_rows_df):
+            parsed_base, parsed_store = preprocess_compact_v2_8(parse_rows_df, rules)
+            base_parts.append(parsed_base)
+            store_parts.append(parsed_store)
+        base_df = pd.concat(base_parts, ignore_index=True)
+        for col, dtype in previous.base_df.dtypes.items():
+            if base_df[col].dtype != dtype:
+                base_df[col] = base_df[col].astype(dtype) # (빈 텍스트 컬럼 등으로 바뀐 dtype 복원)
+        order = pd.Index(base_df['product_name']).get_indexer(fingerprints.index)
+        base_df = base_df.iloc[order].reset_index(drop=True)
+        store = IngredientStore.concat(store_parts).take(order)
+
+    state = IncrementalState(preprocess_key, fingerprints, base_df, store, lean=lean)
+    if lean:
+        base_df, store = lean_base_frame(base_df), store.astype(LEAN_FLOAT_DTYPE)
+    return base_df, store, state, stats
+
+def run_incremental_analysis_v2_8(df, dynamic_rulebook, previous=None, top_k=None, report=None, lean=False):
+    """
+    [v2.8] 일일 추출본 증분 분석: 'preprocess_incremental_v2_8' + 전체 스코어링 (Z-Score 등 전역 단계는 전체로)
+    -> (final_df, 새 IncrementalState). 결과는 'run_full_analysis_v2_6'과 동일.
+    (통계는 'final_df.attrs["incremental"]', 나머지 인자 / attrs는 'run_full_analysis_v2_6'과 같음)
+    """
+    rules = dynamic_rulebook
+    with report_run(report, 'incremental'):
+        with report_stage(report, 'preprocess (incremental)', len(df)) as record:
+            base_df, store, state, stats = preprocess_incremental_v2_8(df, rules, previous, lean=lean)
+            record['rows_out'] = len(base_df)
+            record['output_mb'] = memory_mb(base_df, store)
+        final_df = _score_to_frame(base_df, store, rules, top_k, report, lean)
+    final_df.attrs['incremental'] = stats
+    if report is not None:
+        final_df.attrs['pipeline_report'] = report.to_dict()
+    return final_df, state
+
+# ---
+# [v2.8] 배치 평가 (룰북 N개 / 가중치 그리드를 한 번에)
+# ---
+
+def _set_rule_path(rulebook, path, value):
+    """ path(튜플 또는 'a.b.c')의 값을 바꾼 '새' 룰북 (경로상의 dict만 복사, 나머지는 공유) """
+    if isinstance(path, str):
+        path = tuple(path.split('.'))
+    updated = dict(rulebook)
+    node = updated
+    for key in path[:-1]:
+        node[key] = dict(node[key])
+        node = node[key]
+    node[path[-1]] = value
+    return updated
+
+def make_rulebook_grid(base_rulebook, grid):
+    """
+    가중치 / 성분 파라미터 그리드 -> 룰북 목록 (데카르트 곱).
+    :param grid: { 경로: [값, ...] }
+        경로 예) ('final_weights', 'weight_a') 또는 'final_weights.weight_a',
+                 ('score_a_main_components', 'rules', 'EPA', 'rec_dose')
+                 (성분명에 '.'이 있으면 튜플 경로 사용)
+    :return: (룰북 목록, 각 룰북의 {경로: 값} 목록)
+    """
+    paths = list(grid.keys())
+    rulebooks, points = [], []
+    for values in itertools.product(*(grid[path] for path in paths)):
+        rulebook = base_rulebook
+        for path, value in zip(paths, values):
+            rulebook = _set_rule_path(rulebook, path, value)
+        rulebooks.append(rulebook)
+        points.append(dict(zip(paths, values)))
+    return rulebooks, points
+
+def _component_signature(rules_dict):
+    """ '활성화'된 성분 룰의 (이름, 파라미터) 튜플 - 같으면 점수도 같음 """
+    return component_params(rules_dict).signature
+
+def _tag_signature(tag_rules):
+    """ 점수가 있는 태그의 (이름, 점수) 튜플 (룰북 스냅샷이면 공유된 태그 섹션의 컴파일 결과 재사용) """
+    tag_names, scores = tag_score_vector(tag_rules)
+    return tuple(zip(tag_names, scores.tolist()))
+
+def _batch_component_sums(index, store, signatures, prefix):
+    """
+    서명별 (Score A 또는 C-1) 합계.
+    1. 성분마다 '고유 파라미터' 전체를 한 번에: (파라미터 수 x 제품) 브로드캐스팅
+    2. 서명마다 단일 실행과 같은 경로('sum_component_scores')로 합산 (결과 동일)
+    """
+    unique_params = {}
+    for signature in set(signatures):
+        for comp_name, params in signature:
+            unique_params.setdefault(comp_name, {})[params] = None
+
+    weighted = {}
+    for comp_name, param_map in unique_params.items():
+        param_rows = list(param_map.keys())
+        params = np.array(param_rows, dtype=float) # (U, 5)
+        scores = calculate_s_curve_scores(
+            store.column(comp_name)[np.newaxis, :],
+            params[:, [0]], params[:, [1]], params[:, [2]], params[:, [3]]
+        ) # (U, 제품)
+        for row_no, param_row in enumerate(param_rows):
+            weighted[(comp_name, param_row)] = scores[row_no] * param_row[4]
+
+    sums = {}
+    for signature in set(signatures):
+        if not signature:
+            sums[signature] = np.zeros(len(index))
+            continue
+        component_scores_df = pd.DataFrame(
+            np.column_stack([weighted[item] for item in signature]),
+            index=index,
+            columns=[f'{prefix}_{comp_name}' for comp_name, _ in signature]
+        )
+        total_weight = sum([params[4] for _, params in signature], 0.0)
+        sums[signature] = sum_component_scores(component_scores_df, total_weight).to_numpy()
+    return sums
+
+def _batch_tag_sums(tag_incidence, tag_signatures, n_rows):
+    """ 태그 서명별 C-2: 전체 태그 합집합 행렬을 한 번 만들고 서명마다 컬럼만 잘라 @ 점수 """
+    union_tags = list(dict.fromkeys(
+        tag_name for signature in tag_signatures for tag_name, _ in signature
+    ))
+    positions = {tag_name: i for i, tag_name in enumerate(union_tags)}
+    union_matrix = tag_incidence.matrix(union_tags) if union_tags else None
+
+    sums = {}
+    for signature in set(tag_signatures):
+        if not signature or n_rows == 0:
+            sums[signature] = np.zeros(n_rows)
+            continue
+        incidence = union_matrix[:, [positions[tag_name] for tag_name, _ in signature]]
+        scores = np.array([tag_score for _, tag_score in signature], dtype=float)
+        sums[signature] = incidence.astype(float) @ scores
+    return sums
+
+class BatchResult:
+    """
+    [v2.8] 배치 평가 결과.
+    - product_names: 제품명 (전처리 순서)
+    - scores: (룰북 수 x 제품 수) 'SWAN_SCORE_V2' (keep_scores=False면 None)
+    - rankings: (룰북 수 x K) 점수 내림차순 제품 위치 (동점이면 전처리 순서가 앞선 제품 먼저)
+    """
+
+    def __init__(self, product_names, scores, rankings):
+        self.product_names = product_names
+        self.scores = scores
+        self.rankings = rankings
+
+    def __len__(self):
+        return len(self.rankings)
+
+    def ranked_products(self, rulebook_no, n=None):
+        """ 룰북 하나의 상위 제품명 목록 """
+        ranking = self.rankings[rulebook_no] if n is None else self.rankings[rulebook_no][:n]
+        return [self.product_names[pos] for pos in ranking]
+
+    def top_k_overlap(self, k=10, reference=0):
+        """ 각 룰북의 Top-K가 기준 룰북 Top-K와 몇 % 겹치는지 (0~1, 룰북 수 길이) """
+        k = min(k, self.rankings.shape[1])
+        if k == 0:
+            return np.ones(len(self))
+        reference_top = set(self.rankings[reference][:k].tolist())
+        return np.array([
+            len(reference_top.intersection(ranking[:k].tolist())) / k
+            for ranking in self.rankings
+        ])
+
+def _rank_rows(scores, top_k):
+    """ 행마다 점수 내림차순 위치 (안정 정렬, top_k면 부분 선택 후 정렬) """
+    n_products = scores.shape[1]
+    if top_k is None or top_k >= n_products:
+        return np.argsort(-scores, axis=1, kind='stable')
+    if top_k <= 0:
+        return np.empty((scores.shape[0], 0), dtype=np.int64)
+    return np.vstack([top_k_positions(row_scores, top_k) for row_scores in scores])
+
+def run_batch_analysis_v2_8(df, rulebooks, top_k=None, keep_scores=True, chunk_size=256, compact=None):
+    """
+    [v2.8] 룰북 N개를 한 번에 평가 ('run_full_analysis_v2_6' 반복 호출 대체).
+    - 전처리는 1회 (모든 룰북의 'preprocess_cache_key'가 같아야 함: 컬럼 매핑/성분 이름 동일)
+    - 가격 Z-Score 1회, 성분 S-Curve는 고유 파라미터만 계산, 태그 행렬 1회
+    - 최종 합산/순위는 룰북 chunk_size개씩 (룰북 x 제품) 배열로
+    :param df: 원본 CSV DataFrame (compact를 주면 무시 가능)
+    :param top_k: 순위를 상위 K개만 (None이면 전체)
+    :param keep_scores: False면 점수 행렬을 버리고 순위만 보관 (메모리 절약)
+    :param compact: 이미 전처리된 (base_df, store)
+    :return: 'BatchResult' (각 룰북 점수는 'run_full_analysis_v2_6'의 'SWAN_SCORE_V2'와 같음)
+    """
+    rulebooks = list(rulebooks)
+    if not rulebooks:
+        raise ValueError("배치 평가할 룰북이 없습니다.")
+    preprocess_keys = {preprocess_cache_key(rules) for rules in rulebooks}
+    if len(preprocess_keys) > 1:
+        raise ValueError(
+            "전처리 관련 룰(컬럼 매핑 / csv_column / 성분 이름)이 다른 룰북은 한 배치로 평가할 수 없습니다."
+        )
+
+    # 1. 공통 단계 (1회)
+    if compact is None:
+        compact = run_preprocess_v2_6(df, rulebooks[0], compact=True)
+    base_df, store = compact
+    index = base_df.index
+    n_rows = len(base_df)
+    price_z = calculate_z_scores(base_df['price'], direction='lower_is_better').to_numpy()
+    tag_incidence = TagIncidence(base_df['tags_raw'])
+
+    # 2. 룰북별 '서명'을 뽑아 고유한 것만 계산
+    a_signatures = [_component_signature(rules['score_a_main_components']) for rules in rulebooks]
+    c1_signatures = [_component_signature(rules['score_c_sub_components']) for rules in rulebooks]
+    tag_signatures = [_tag_signature(rules['score_c_tags']['rules']) for rules in rulebooks]
+    a_sums = _batch_component_sums(index, store, a_signatures, 'A')
+    c1_sums = _batch_component_sums(index, store, c1_signatures, 'C1')
+    c2_sums = _batch_tag_sums(tag_incidence, tag_signatures, n_rows)
+
+    def weights(key_path):
+        return np.array([
+            float(rules[key_path[0]][key_path[1]]) for rules in rulebooks
+        ])[:, np.newaxis]
+
+    k_values = weights(('score_b_price', 'k_value'))
+    w_c1, w_c2 = weights(('score_c_sub_components', 'final_weight')), weights(('score_c_tags', 'final_weight'))
+    w_a, w_b, w_c = (weights(('final_weights', key)) for key in ('weight_a', 'weight_b', 'weight_c'))
+
+    # 3. (룰북 x 제품) 최종 합산 + 순위 (chunk_size개씩)
+    all_scores, all_rankings = [], []
+    for start in range(0, len(rulebooks), chunk_size):
+        rows = slice(start, start + chunk_size)
+        score_a = np.stack([a_sums[sig] for sig in a_signatures[rows]])
+        score_c1 = np.stack([c1_sums[sig] for sig in c1_signatures[rows]])
+        score_c2 = np.stack([c2_sums[sig] for sig in tag_signatures[rows]])
+        score_b = apply_sigmoid(price_z[np.newaxis, :], k=k_values[rows])
+
+        total_c_weight = w_c1[rows] + w_c2[rows]
+        total_c_weight = np.where(total_c_weight == 0, 1.0, total_c_weight)
+        score_c = ((score_c1 * w_c1[rows]) + (score_c2 * w_c2[rows])) / total_c_weight
+
+        total_weight = w_a[rows] + w_b[rows] + w_c[rows]
+        total_weight = np.where(total_weight == 0, 1.0, total_weight)
+        final_score = ((score_a * w_a[rows]) + (score_b * w_b[rows]) + (score_c * w_c[rows])) / total_weight
+
+        all_rankings.append(_rank_rows(final_score, top_k))
+        if keep_scores:
+            all_scores.append(final_score)
+
+    scores = np.concatenate(all_scores) if keep_scores else None
+    return BatchResult(
+        base_df['product_name'].tolist(),
+        scores,
+        np.concatenate(all_rankings)
+    )
+
+# ---
+# [v2.8] CSV 로더 / 스캐너 / 기본 룰북 (앱 v4.5 ~ v4.9.3에서 이동, Streamlit 없이 사용)
+# ---
+
+# 인코딩 판별 시 한 번에 읽는 바이트 수 (앞부분이 전부 ASCII면 한글이 나올 때까지 다음 블록)
+SNIFF_BLOCK_SIZE = 1 << 16
+
+# [v4.5] 스캐너가 (룰북과 관계없이) 읽는 원본 컬럼
+SCANNER_COLUMNS = ('제품명', '핵심성분명태그', '보조성분명태그', '특수태그')
+
+def sniff_encoding(source):
+    """
+    [v2.8] 'utf-8' 또는 'cp949' (v2.6.2 로더의 두 후보).
+    - 처음으로 ASCII가 아닌 바이트가 나온 블록을 UTF-8로 디코딩해 보고, 실패하면 cp949
+      (블록 경계에서 잘린 멀티바이트 문자는 증분 디코더가 처리)
+    - 파일 객체는 판별 후 처음 위치로 되돌림
+    """
+    handle = open(source, 'rb') if isinstance(source, (str, os.PathLike)) else source
+    start = handle.tell() if hasattr(handle, 'tell') else 0
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    try:
+        while True:
+            block = handle.read(SNIFF_BLOCK_SIZE)
+            if not block:
+                return 'utf-8'
+            if isinstance(block, str):
+                return 'utf-8' # 이미 텍스트 스트림
+            try:
+                text = decoder.decode(block, final=False)
+            except UnicodeDecodeError:
+                return 'cp949'
+            if not text.isascii():
+                return 'utf-8'
+    finally:
+        if handle is not source:
+            handle.close()
+        elif hasattr(handle, 'seek'):
+            handle.seek(start)
+
+def loader_columns(rules):
+    """ [v2.8] 룰북('columns' / 'csv_column')과 스캐너가 쓰는 원본 컬럼 목록 """
+    return list(dict.fromkeys(_used_columns(rules) + list(SCANNER_COLUMNS)))
+
+def loader_text_dtypes(rules=None):
+    """ [v2.8] 문자열로 읽을 컬럼 (제품명 / 성분 / 태그 / 브랜드). 가격/리뷰/별점은 기존 숫자 정리 로직이 처리 """
+    text_columns = list(SCANNER_COLUMNS)
+    if rules is not None:
+        text_columns += [
+            rules['columns']['product_name'],
+            rules['columns'].get('brand', '브랜드'),
+            rules['score_a_main_components']['csv_column'],
+            rules['score_c_sub_components']['csv_column'],
+            rules['score_c_tags']['csv_column'],
+        ]
+    return {col: str for col in dict.fromkeys(text_columns)}
+
+def _read_header(source, encoding):
+    """ 헤더(컬럼명)만 읽고 파일 객체는 처음 위치로 """
+    start = source.tell() if hasattr(source, 'tell') else None
+    header = pd.read_csv(source, encoding=encoding, nrows=0).columns
+    if start is not None:
+        source.seek(start)
+    return list(header)
+
+def csv_read_options(source, rules=None):
+    """
+    [v2.8] read_csv 공통 옵션 (인코딩 / 읽을 컬럼 / dtype). 스트리밍 로더와 공용.
+    :param rules: 주면 'loader_columns'만 읽음 (None이면 전체 컬럼 - 앱의 첫 업로드처럼 스캐너가 모든 텍스트 컬럼을 봐야 할 때)
+    """
+    encoding = sniff_encoding(source)
+    header = _read_header(source, encoding)
+    if rules is None:
+        usecols = None
+        dtypes = {col: dtype for col, dtype in loader_text_dtypes().items() if col in header}
+    else:
+        wanted = set(loader_columns(rules))
+        usecols = [col for col in header if col in wanted]
+        dtypes = {col: dtype for col, dtype in loader_text_dtypes(rules).items() if col in usecols}
+    return {'encoding': encoding, 'usecols': usecols, 'dtype': dtypes}
+
+# [v2.8] 메모리 절약 모드 로더: 고유값 비율이 이 값 이하인 텍스트 컬럼은 범주형 (브랜드, 별점 문자열 등)
+LEAN_CATEGORY_MAX_RATIO = 0.5
+
+def lean_text_columns(df):
+    """
+    [v2.8] 메모리 절약 모드: 반복이 많은 텍스트 컬럼을 범주형으로 (컬럼 단위 교체, 나머지는 공유).
+    (엔진의 문자열 처리는 범주형에서도 같은 결과)
+    """
+    converted = {}
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype) or pd.api.types.is_numeric_dtype(series.dtype):
+            continue
+        n_values = series.count()
+        if n_values and series.nunique() <= LEAN_CATEGORY_MAX_RATIO * n_values:
+            converted[col] = series.astype('category')
+    return df.assign(**converted) if converted else df
+
+def load_csv_v2_8(source, rules=None, lean=False):
+    """
+    [v2.6.2 로더] UTF-8 / cp949 CSV 로드.
+    [v2.8] 인코딩은 앞부분 샘플로 판별 후 '한 번만' 파싱, 룰북을 주면 필요한 컬럼만, pyarrow 엔진 우선.
+    :param source: 파일 경로 또는 파일 객체 (업로드 파일)
+    :param rules: 룰북 (None이면 전체 컬럼)
+    :param lean: 메모리 절약 모드 (반복이 많은 텍스트 컬럼은 범주형 - 'lean_text_columns')
+    :raises ValueError: 로드 실패 (메시지에 원인 포함)
+    """
+    try:
+        options = csv_read_options(source, rules)
+    except Exception as e:
+        raise ValueError(f"파일 로드 오류: {e}") from e
+
+    start = source.tell() if hasattr(source, 'tell') else None
+    try:
+        df = pd.read_csv(source, engine=CSV_ENGINE, **options)
+        return lean_text_columns(df) if lean else df
+    except Exception as e:
+        if CSV_ENGINE == 'c':
+            raise ValueError(f"파일 로드 오류 ({options['encoding']}): {e}") from e
+    # pyarrow 엔진이 못 읽는 파일 (따옴표 / 줄바꿈 형식 등)은 기본 엔진으로 재시도
+    try:
+        if start is not None:
+            source.seek(start)
+        df = pd.read_csv(source, engine='c', **options)
+    except Exception as e:
+        raise ValueError(f"파일 로드 오류 ({options['encoding']}): {e}") from e
+    return lean_text_columns(df) if lean else df
+
+# 텍스트 컬럼 필터 후보: 고유값 개수 범위 ([v4.9.3] '브랜드'가 50개 이상이어도 스캔되도록 50->100)
+TEXT_FILTER_MAX_VALUES = 100
+# 텍스트 컬럼 조기 제외용 앞부분 샘플 행 수 (여기서 이미 고유값이 너무 많으면 전체 unique 생략)
+TEXT_SCAN_SAMPLE_ROWS = 5_000
+
+class CatalogScan:
+    """
+    [v2.8] 스캐너 결과.
+    - discovered: v4.5 스캐너와 같은 구조 { 'main_comps', 'sub_comps', 'tags', 'text_cols' }
+    - component_tokens: { 성분 컬럼명: 'tokenize_component_column' 결과 } (원본 df 행 위치 기준)
+      -> 'run_preprocess_v2_6(..., component_tokens=)'로 넘기면 전처리가 다시 토크나이즈하지 않음
+    """
+
+    def __init__(self, discovered, component_tokens):
+        self.discovered = discovered
+        self.component_tokens = component_tokens
+
+def _scan_component_names(tokens):
+    """ 토큰의 성분명 (앞뒤 공백 제거, 빈 이름 제외) 집합 """
+    names = pd.Series(pd.unique(tokens['component']), dtype=object).astype(str).str.strip()
+    return set(names[names != ''])
+
+def _scan_tags(series):
+    """ [v2.7.2] '|'로 나누고 '*' 제거 (고유 셀만 합쳐서 한 번에 split) """
+    cells = pd.unique(series.dropna().astype(str).to_numpy(dtype=object))
+    parts = set('|'.join(cells).split('|'))
+    return {part.strip().replace('*', '').strip() for part in parts} - {''}
+
+def _scan_text_values(series):
+    """ 고유값이 2개 이상 TEXT_FILTER_MAX_VALUES개 미만이면 정렬된 목록, 아니면 None """
+    if series.iloc[:TEXT_SCAN_SAMPLE_ROWS].nunique() >= TEXT_FILTER_MAX_VALUES:
+        return None # 샘플만으로도 이미 너무 많음
+    unique_values = series.dropna().unique()
+    if 1 < len(unique_values) < TEXT_FILTER_MAX_VALUES:
+        return sorted(list(unique_values))
+    return None
+
+def scan_catalog_v2_8(df):
+    """
+    [v2.8] 1-pass 벡터화 스캐너 -> 'CatalogScan'.
+    - 성분: 셀마다 '모든' '성분 : X' (v4.5는 셀마다 첫 성분만), 토큰은 전처리용으로 보관
+    - 태그: '|' 분리 + '*' 제거
+    - '브랜드' 등 텍스트(Object) 컬럼: 고유값 목록 (핵심 로직 컬럼 제외)
+    """
+    if df is None:
+        return CatalogScan({'main_comps': [], 'sub_comps': [], 'tags': [], 'text_cols': {}}, {})
+
+    # 1. 성분 스캔 (핵심, 보조)
+    component_tokens = {}
+    found = {'핵심성분명태그': set(), '보조성분명태그': set()}
+    for col in found:
+        if col in df.columns:
+            component_tokens[col] = tokenize_component_column(df[col])
+            found[col] = _scan_component_names(component_tokens[col])
+
+    # 2. 태그 스캔
+    tags = _scan_tags(df['특수태그']) if '특수태그' in df.columns else set()
+
+    # 3. [v4.5 신규] '브랜드' 등 텍스트 컬럼 스캔
+    # (핵심 로직에서 이미 사용 중인 컬럼은 제외)
+    excluded_cols = [
+        '제품명', '핵심성분명태그', '보조성분명태그', '특수태그',
+        '1일 섭취량당 가격', '리뷰 개수', '리뷰 별점'
+    ]
+    text_cols = {}
+    for col in df.select_dtypes(include=['object', 'category']).columns:
+        if col not in excluded_cols:
+            values = _scan_text_values(df[col])
+            if values is not None:
+                text_cols[col] = values
+
+    discovered = {
+        'main_comps': sorted(found['핵심성분명태그']),
+        'sub_comps': sorted(found['보조성분명태그']),
+        'tags': sorted(tags),
+        'text_cols': text_cols # 딕셔너리 { '브랜드': ['A', 'B'], ... }
+    }
+    return CatalogScan(discovered, component_tokens)
+
+def scan_csv_for_rules(df):
+    """
+    [v4.5 스캐너] CSV를 스캔하여 '핵심/보조/태그' 뿐만 아니라,
+    '브랜드' 등 '텍스트(Object)' 컬럼의 고유값도 '싹 다' 스캔.
+    [v2.8] 'scan_catalog_v2_8'의 발견 목록만 반환 (셀 안의 모든 성분 발견)
+    """
+    return scan_catalog_v2_8(df).discovered
+
+def build_default_rulebook(discovered_rules):
+    """
+    [v4.9.3] '자동 발견된 목록'으로 v2.7 룰북의 기본 구조를 생성합니다.
+    (앱 세션 초기화 / CLI 기본 룰북 공용)
+    """
+    rb = {
+        'columns': { # v1.4의 공통 컬럼
+            'product_name': '제품명',
+            'price': '1일 섭취량당 가격',
+            'review_count': '리뷰 개수',
+            'rating': '리뷰 별점',
+            'brand': '브랜드' # --- [v4.9.3] '브랜드' '누락' 복구 ---
+        },
+        'final_weights': { 'weight_a': 0.5, 'weight_b': 0.3, 'weight_c': 0.2 },
+        'score_a_main_components': {
+            'csv_column': '핵심성분명태그',
+            'rules': {}
+        },
+        'score_b_price': { 'k_value': 1.0 },
+        'score_c_sub_components': {
+            'csv_column': '보조성분명태그',
+            'final_weight': 0.5,
+            'rules': {}
+        },
+        'score_c_tags': {
+            'csv_column': '특수태그',
+            'final_weight': 0.5,
+            'rules': {}
+        },
+        # [v2.7]  분석기용 룰
+        'market_score_weights': {
+            'k_review': 2.0, # v1.4 기본값
+            'k_rating': 1.0, # v1.4 기본값
+            'weight_review': 0.7, # v1.4 기본값
+            'weight_rating': 0.3  # v1.4 기본값
+        }
+    }
+
+    # 1. Score A 룰북 채우기 (v2.6.4: 'enabled': True)
+    for name in discovered_rules['main_comps']:
+        rb['score_a_main_components']['rules'][name] = {
+            'enabled': True,
+            'min_dose': 500.0, 'rec_dose': 1000.0,
+            'rec_score': 80.0, 'saturation_factor': 1.0,
+            'weight': 1.0
+        }
+
+    # 2. Score C-1 룰북 채우기 (v2.6.4: 'enabled': True)
+    for name in discovered_rules['sub_comps']:
+        rb['score_c_sub_components']['rules'][name] = {
+            'enabled': True,
+            'min_dose': 100.0, 'rec_dose': 200.0,
+            'rec_score': 70.0, 'saturation_factor': 0.5,
+            'weight': 1.0
+        }
+
+    # 3. Score C-2 룰북 채우기 (점수 0)
+    for name in discovered_rules['tags']:
+        rb['score_c_tags']['rules'][name] = 0.0
+
+    return rb
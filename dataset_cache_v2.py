@@ -0,0 +1,339 @@
+"""
+Project Swan's Eye v2.8.13 - Dataset Disk Cache (업로드 파일 지문 기준 디스크 캐시)
+- v2.8.13: 파싱된 원본 / 스캔 결과 / 전처리 결과를 로컬 디스크에 보관 (앱 재시작, 워커 추가 후에도 재사용).
+    - 키 = 업로드 바이트의 sha256 (+ 전처리는 'core_engine.preprocess_cache_key')
+    - 표는 컬럼형 바이너리: pyarrow가 있으면 Parquet, 없으면 pickle
+      성분 함량 'IngredientStore'는 배열 그대로 .npz (희소면 CSC 3배열)
+    - 전체 크기가 max_bytes를 넘으면 '가장 오래 안 쓴' 데이터셋부터 삭제 (LRU)
+    - 쓰기는 임시 파일 -> os.replace (여러 워커가 동시에 써도 깨진 파일을 읽지 않음)
+- v2.8.23: 컴팩트 전처리 결과 폴더 읽기 / 쓰기를 'read_compact' / 'write_compact'로 분리
+    (증분 스코어링 상태 'core_engine.IncrementalState'도 같은 형식으로 저장).
+    LRU 정리 / 'clear'는 데이터셋 키(sha256) 폴더만 대상 (같은 루트의 'incremental' / 'profiles' 폴더는 건드리지 않음).
+    'write_compact(replace=True)': 임시 폴더에 전부 쓴 뒤 폴더째 교체 (파일 묶음이 섞이지 않음 - 증분 상태용).
+
+디렉터리 구조)
+    <root>/<dataset_key>/
+        .last_used               (LRU용 접근 시각 - mtime)
+        raw.parquet | raw.pkl    (파싱된 원본)
+        scan.pkl                 (스캐너 결과)
+        pre_<preprocess_key>/
+            base.parquet | base.pkl
+            store.npz, store.json
+"""
+
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from ingredient_store_v2 import IngredientStore
+
+try:
+    import pyarrow # noqa: F401 (있으면 Parquet)
+    TABLE_FORMAT = 'parquet'
+except ImportError:
+    TABLE_FORMAT = 'pkl'
+
+# 기본 위치 / 크기 (환경 변수로 변경 가능)
+DEFAULT_CACHE_DIR = os.environ.get(
+    'SWAN_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'swans_eye')
+)
+DEFAULT_MAX_BYTES = int(float(os.environ.get('SWAN_CACHE_MAX_MB', '2048')) * 1024 * 1024)
+
+LAST_USED_FILE = '.last_used'
+
+
+def _is_dataset_key(name):
+    """ 데이터셋 폴더 이름(sha256 hex)인지 """
+    return len(name) == 64 and all(ch in '0123456789abcdef' for ch in name)
+
+
+def _atomic_write(path, write):
+    """ 같은 폴더의 임시 파일에 write(임시 경로) -> os.replace """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp_')
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _replace_dir(directory, write):
+    """
+    같은 부모 폴더의 임시 폴더에 write(임시 폴더) -> 기존 폴더와 폴더째 교체.
+    (읽는 쪽은 이전 폴더 전체 / 새 폴더 전체 / 폴더 없음 중 하나만 봄, 동시에 쓰면 한쪽 결과만 남음)
+    """
+    parent = os.path.dirname(os.path.abspath(directory))
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=parent, prefix='.tmp_')
+    old_dir = tempfile.mkdtemp(dir=parent, prefix='.old_')
+    try:
+        write(tmp_dir)
+        try:
+            os.replace(directory, os.path.join(old_dir, 'previous'))
+        except FileNotFoundError:
+            pass
+        try:
+            os.replace(tmp_dir, directory)
+        except OSError:
+            # 그 사이 다른 쪽이 새 폴더를 먼저 놓음 -> 그쪽 결과를 유지
+            if not os.path.isdir(directory):
+                raise
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def _dir_size(path):
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, filename))
+            except OSError:
+                pass # 다른 워커가 방금 지운 파일
+    return total
+
+
+class DatasetCache:
+    """
+    업로드 파일 지문(dataset_key) 단위 디스크 캐시.
+    - get_*: 없거나 읽기 실패하면 None (캐시는 '있으면 좋은 것'이므로 오류를 올리지 않음)
+    - put_*: 저장 후 크기 초과 시 LRU 정리 (방금 저장한 데이터셋은 제외)
+    """
+
+    def __init__(self, root=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(self.root, exist_ok=True)
+
+    # ---
+    # 경로 / 표 입출력
+    # ---
+    def _entry_dir(self, dataset_key):
+        return os.path.join(self.root, dataset_key)
+
+    def _touch(self, dataset_key):
+        marker = os.path.join(self._entry_dir(dataset_key), LAST_USED_FILE)
+        try:
+            with open(marker, 'a'):
+                pass
+            os.utime(marker, None)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _find_table(directory, name):
+        for ext in ('parquet', 'pkl'):
+            path = os.path.join(directory, f'{name}.{ext}')
+            if os.path.exists(path):
+                return path
+        return None
+
+    @staticmethod
+    def _read_table(path):
+        if path.endswith('.parquet'):
+            return pd.read_parquet(path)
+        return pd.read_pickle(path)
+
+    @staticmethod
+    def _write_table(directory, name, df):
+        """ Parquet 우선 (타입이 섞인 object 컬럼 등 Parquet이 못 쓰면 pickle) """
+        if TABLE_FORMAT == 'parquet':
+            try:
+                _atomic_write(os.path.join(directory, f'{name}.parquet'), lambda tmp: df.to_parquet(tmp))
+                return
+            except Exception:
+                pass
+        _atomic_write(os.path.join(directory, f'{name}.pkl'), lambda tmp: df.to_pickle(tmp))
+
+    # ---
+    # 원본 / 스캔 결과
+    # ---
+    def get_raw(self, dataset_key):
+        path = self._find_table(self._entry_dir(dataset_key), 'raw')
+        if path is None:
+            return None
+        try:
+            df = self._read_table(path)
+        except Exception:
+            return None
+        self._touch(dataset_key)
+        return df
+
+    def put_raw(self, dataset_key, raw_df):
+        self._write_table(self._entry_dir(dataset_key), 'raw', raw_df)
+        self._touch(dataset_key)
+        self.evict(keep=dataset_key)
+
+    def get_scan(self, dataset_key):
+        path = os.path.join(self._entry_dir(dataset_key), 'scan.pkl')
+        try:
+            with open(path, 'rb') as f:
+                scan = pickle.load(f)
+        except Exception:
+            return None
+        self._touch(dataset_key)
+        return scan
+
+    def put_scan(self, dataset_key, scan):
+        def write(tmp_path):
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(scan, f, protocol=pickle.HIGHEST_PROTOCOL)
+        _atomic_write(os.path.join(self._entry_dir(dataset_key), 'scan.pkl'), write)
+        self._touch(dataset_key)
+        self.evict(keep=dataset_key)
+
+    # ---
+    # 전처리 결과 (base_df, IngredientStore)
+    # ---
+    def _preprocess_dir(self, dataset_key, preprocess_key):
+        return os.path.join(self._entry_dir(dataset_key), f'pre_{preprocess_key}')
+
+    def get_preprocessed(self, dataset_key, preprocess_key):
+        try:
+            compact = read_compact(self._preprocess_dir(dataset_key, preprocess_key))
+        except Exception:
+            return None
+        if compact is None:
+            return None
+        self._touch(dataset_key)
+        return compact[:2]
+
+    def put_preprocessed(self, dataset_key, preprocess_key, base_df, store):
+        write_compact(self._preprocess_dir(dataset_key, preprocess_key), base_df, store)
+        self._touch(dataset_key)
+        self.evict(keep=dataset_key)
+
+    @staticmethod
+    def _write_store(directory, store):
+        if store.is_sparse:
+            arrays = {
+                'data': store.matrix.data, 'indices': store.matrix.indices, 'indptr': store.matrix.indptr
+            }
+        else:
+            arrays = {'dense': store.matrix}
+        meta = {
+            'names': store.names,
+            'shape': list(store.shape),
+            'sparse': store.is_sparse,
+            'fill_value': None if pd.isna(store.fill_value) else float(store.fill_value),
+        }
+
+        def write_arrays(tmp_path):
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, **arrays)
+
+        def write_meta(tmp_path):
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False)
+
+        _atomic_write(os.path.join(directory, 'store.npz'), write_arrays)
+        _atomic_write(os.path.join(directory, 'store.json'), write_meta)
+
+    @staticmethod
+    def _read_store(directory, base_df):
+        """ (행 순서 = base_df 'product_name') """
+        with open(os.path.join(directory, 'store.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        fill_value = np.nan if meta['fill_value'] is None else meta['fill_value']
+        with np.load(os.path.join(directory, 'store.npz')) as arrays:
+            if meta['sparse']:
+                matrix = sparse.csc_matrix(
+                    (arrays['data'], arrays['indices'], arrays['indptr']), shape=tuple(meta['shape'])
+                )
+            else:
+                matrix = np.asfortranarray(arrays['dense'])
+        return IngredientStore(pd.Index(base_df['product_name']), meta['names'], matrix, fill_value)
+
+    # ---
+    # LRU 정리
+    # ---
+    def entries(self):
+        """ [(마지막 사용 시각, 크기, dataset_key)] (오래된 순) """
+        result = []
+        for dataset_key in os.listdir(self.root):
+            entry_dir = self._entry_dir(dataset_key)
+            if not _is_dataset_key(dataset_key) or not os.path.isdir(entry_dir):
+                continue
+            marker = os.path.join(entry_dir, LAST_USED_FILE)
+            try:
+                last_used = os.path.getmtime(marker)
+            except OSError:
+                last_used = 0.0
+            result.append((last_used, _dir_size(entry_dir), dataset_key))
+        return sorted(result)
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, keep=None):
+        """
+        전체 크기가 max_bytes 이하가 될 때까지 오래 안 쓴 데이터셋부터 삭제.
+        (keep은 삭제하지 않음 - 그 데이터셋 하나가 max_bytes보다 크면 나머지를 모두 지워도 초과 상태로 남음)
+        :return: 삭제한 dataset_key 목록
+        """
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = []
+        for _, size, dataset_key in entries:
+            if total <= self.max_bytes:
+                break
+            if dataset_key == keep:
+                continue
+            shutil.rmtree(self._entry_dir(dataset_key), ignore_errors=True)
+            total -= size
+            removed.append(dataset_key)
+        return removed
+
+    def clear(self):
+        for dataset_key in filter(_is_dataset_key, os.listdir(self.root)):
+            shutil.rmtree(self._entry_dir(dataset_key), ignore_errors=True)
+
+    def __repr__(self):
+        return f"DatasetCache(root={self.root!r}, max_bytes={self.max_bytes})"
+
+
+# ---
+# 컴팩트 전처리 결과 폴더 (base 표 + store.npz / store.json + 선택적 meta.json)
+# ---
+
+def write_compact(directory, base_df, store, meta=None, replace=False):
+    """
+    store(+ meta)를 먼저, base를 마지막에 (base가 있으면 나머지도 있음).
+    :param replace: 임시 폴더에 쓴 뒤 폴더째 교체 (같은 폴더를 다른 내용으로 다시 쓸 때 - 파일끼리 섞이지 않음)
+    """
+    if replace:
+        _replace_dir(directory, lambda tmp_dir: write_compact(tmp_dir, base_df, store, meta))
+        return
+    DatasetCache._write_store(directory, store)
+    if meta is not None:
+        def write_meta(tmp_path):
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False)
+        _atomic_write(os.path.join(directory, 'meta.json'), write_meta)
+    DatasetCache._write_table(directory, 'base', base_df)
+
+
+def read_compact(directory):
+    """
+    'write_compact' 결과 -> (base_df, IngredientStore, meta 또는 None). 폴더 / base가 없으면 None.
+    (파일이 깨졌으면 예외 - 캐시에서는 호출하는 쪽이 None으로 처리)
+    """
+    base_path = DatasetCache._find_table(directory, 'base')
+    if base_path is None:
+        return None
+    base_df = DatasetCache._read_table(base_path)
+    store = DatasetCache._read_store(directory, base_df)
+    meta = None
+    meta_path = os.path.join(directory, 'meta.json')
+    if os.path.exists(meta_path):
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+    return base_df, store, meta
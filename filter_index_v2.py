@@ -0,0 +1,108 @@
+"""
+Project Swan's Eye v2.8.16 - Filter Index (A/B 그룹 필터용 사전 계산 인덱스)
+- v2.8.16: 데이터셋당 한 번 만드는 필터 인덱스.
+    - 성분: 포함 여부 비트맵 + 함량 '정렬 배열'(범위 조회 = searchsorted 두 번)
+    - 특수태그: 포함 여부 비트맵 ('TagIncidence' 컬럼)
+    - '브랜드' 등 텍스트 컬럼: 값 -> 행 위치 배열
+    - 'create_filter_box' 필터 묶음 하나를 bool 마스크 '하나'로 계산 (DataFrame 복사 / 단계별 재색인 없음)
+    - 판정 규칙은 앱 v4.8.1 'apply_filters'와 동일.
+"""
+
+import numpy as np
+import pandas as pd
+
+# 필터 룰 값 ('create_filter_box' 라디오 선택지)
+INCLUDE = "반드시 포함"
+EXCLUDE = "배제"
+
+
+class FilterIndex:
+    """
+    델타 분석기 데이터(base_df + IngredientStore) 하나에 대한 필터 인덱스 (행 위치 기준).
+    - components: { 성분명: (포함 비트맵, 정렬된 함량, 그 함량의 행 위치) }
+    - 태그 비트맵은 'TagIncidence'가 컬럼별로 보관 (tag_names는 생성 시 미리 계산)
+    - text_values: { 컬럼명: { 값: 행 위치 배열 } }
+    """
+
+    def __init__(self, base_df, store, tag_incidence, tag_names=(), text_columns=('브랜드',)):
+        self.n_rows = len(base_df)
+        self.tag_incidence = tag_incidence
+
+        self.components = {}
+        for comp_name in store.names:
+            values = store.column(comp_name)
+            presence = ~np.isnan(values) # (v4.13 'component_values(...).notna()'와 동일)
+            rows = np.flatnonzero(presence)
+            order = np.argsort(values[rows], kind='stable')
+            self.components[comp_name] = (presence, values[rows][order], rows[order])
+
+        for tag_name in tag_names:
+            tag_incidence.column(tag_name) # (미리 계산 - 'TagIncidence'가 컬럼을 보관)
+
+        self.text_values = {}
+        for col in text_columns:
+            if col not in base_df.columns:
+                continue
+            codes, uniques = pd.factorize(base_df[col]) # (NaN = -1, 어떤 값에도 속하지 않음)
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+            self.text_values[col] = {
+                value: order[bounds[i]:bounds[i + 1]] for i, value in enumerate(uniques)
+            }
+
+    # ---
+    # 조회 (모두 행 수 길이의 bool 배열)
+    # ---
+    def component_presence(self, comp_name):
+        return self.components[comp_name][0]
+
+    def component_range(self, comp_name, min_val, max_val):
+        """ min_val <= 함량 <= max_val (Series.between과 동일, 함량 없음은 False) """
+        _, sorted_values, sorted_rows = self.components[comp_name]
+        start = np.searchsorted(sorted_values, min_val, side='left')
+        end = np.searchsorted(sorted_values, max_val, side='right')
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[sorted_rows[start:end]] = True
+        return mask
+
+    def tag_presence(self, tag_name):
+        return self.tag_incidence.column(tag_name)
+
+    def text_in(self, col, values):
+        value_rows = self.text_values[col]
+        mask = np.zeros(self.n_rows, dtype=bool)
+        for value in values:
+            rows = value_rows.get(value)
+            if rows is not None:
+                mask[rows] = True
+        return mask
+
+    # ---
+    # 필터 묶음 -> 마스크
+    # ---
+    def mask(self, filters):
+        """
+        'create_filter_box' 결과 -> 모든 조건을 만족하는 행 (bool 배열).
+        - dict: 성분 ('type' 포함/배제 + 'slider' 함량 범위)
+        - "반드시 포함" / "배제": 특수태그
+        - list: 텍스트 컬럼 (선택한 값 중 하나)
+          (인덱스에 없는 텍스트 컬럼은 델타 데이터에 없는 컬럼이므로 건너뜀)
+        """
+        mask = np.ones(self.n_rows, dtype=bool)
+        for key, rule in filters.items():
+            if isinstance(rule, dict):
+                presence = self.component_presence(key)
+                if rule['type'] == INCLUDE:
+                    mask &= presence
+                elif rule['type'] == EXCLUDE:
+                    mask &= ~presence
+                if rule['slider'] is not None:
+                    min_val, max_val = rule['slider']
+                    mask &= self.component_range(key, min_val, max_val)
+            elif rule == INCLUDE:
+                mask &= self.tag_presence(key)
+            elif rule == EXCLUDE:
+                mask &= ~self.tag_presence(key)
+            elif isinstance(rule, list) and key in self.text_values:
+                mask &= self.text_in(key, rule)
+        return mask
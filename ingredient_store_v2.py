@@ -0,0 +1,214 @@
+"""
+Project Swan's Eye v2.8.6 - Ingredient Store
+- v2.8.6: (제품 x 성분) 함량 전용 저장소.
+    - 성분마다 float64 pandas 컬럼을 만드는 대신, 연속 배열(밀집) 또는 CSC 희소 행렬 하나 + 성분명 인덱스.
+    - 대부분의 제품은 성분이 몇 개뿐이므로 보통은 희소(CSC: 성분 '컬럼' 조회가 빠름)로 저장된다.
+    - 값이 float32로 '손실 없이' 표현되면 float32로, 아니면 float64로 저장 (점수 결과가 바뀌지 않도록).
+    - 스코어링 / 필터(min/max, 포함 여부) / 화면 표시는 필요한 성분, 필요한 행만 꺼내 쓴다.
+- v2.8.21: 'astype' (메모리 절약 모드에서 손실이 있어도 float32로 보관).
+- v2.8.23: 'take' (행 선택) / 'concat' (행 방향 이어 붙이기) - 증분 전처리에서 어제 결과와 새 결과를 합칠 때.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+def _storage_dtype(values):
+    """ float32로 왕복 변환해도 값이 그대로면 float32, 아니면 float64 """
+    values = np.asarray(values, dtype=np.float64)
+    as_float32 = values.astype(np.float32)
+    if np.array_equal(as_float32.astype(np.float64), values, equal_nan=True):
+        return np.float32
+    return np.float64
+
+
+class IngredientStore:
+    """
+    (제품 x 성분) 값 저장소.
+    - product_index: 제품 순서 (행)
+    - names: 성분명 목록 (열), '_positions'로 O(1) 조회
+    - matrix: 밀집 np.ndarray (열 우선 'F' 순서) 또는 scipy.sparse.csc_matrix
+    - fill_value: 값이 없는 칸 (함량은 NaN, 가중 점수는 0.0)
+      (희소 행렬에서는 '저장된 칸 = 값이 있는 칸'이므로 함량 0도 그대로 보존된다)
+    """
+
+    # 채워진 칸 비율이 이 값 이상이면 밀집 배열로 저장
+    DENSE_THRESHOLD = 0.5
+
+    def __init__(self, product_index, names, matrix, fill_value=np.nan):
+        self.product_index = pd.Index(product_index)
+        self.names = list(names)
+        self._positions = {name: i for i, name in enumerate(self.names)}
+        self.matrix = matrix
+        self.fill_value = fill_value
+
+    # ---
+    # 생성
+    # ---
+    @classmethod
+    def from_triples(cls, product_index, names, rows, cols, values, fill_value=np.nan):
+        """
+        (행 위치, 성분 위치, 값) 목록으로 생성. (행, 성분) 쌍은 중복 없어야 함.
+        """
+        product_index = pd.Index(product_index)
+        names = list(names)
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        shape = (len(product_index), len(names))
+        dtype = _storage_dtype(values)
+
+        n_cells = shape[0] * shape[1]
+        if n_cells and len(values) >= cls.DENSE_THRESHOLD * n_cells:
+            matrix = np.full(shape, fill_value, dtype=dtype, order='F')
+            matrix[rows, cols] = values
+        else:
+            matrix = sparse.csc_matrix((values.astype(dtype), (rows, cols)), shape=shape)
+        return cls(product_index, names, matrix, fill_value)
+
+    @classmethod
+    def from_dense(cls, values, product_index, names, fill_value=np.nan):
+        """ (제품 x 성분) 2차원 배열에서 생성 (fill_value 칸은 '없음'으로 취급) """
+        values = np.asarray(values, dtype=np.float64)
+        if pd.isna(fill_value):
+            present = ~np.isnan(values)
+        else:
+            present = values != fill_value
+        rows, cols = np.nonzero(present)
+        return cls.from_triples(product_index, names, rows, cols, values[rows, cols], fill_value)
+
+    # ---
+    # 조회
+    # ---
+    @property
+    def is_sparse(self):
+        return sparse.issparse(self.matrix)
+
+    @property
+    def shape(self):
+        return (len(self.product_index), len(self.names))
+
+    @property
+    def nbytes(self):
+        if self.is_sparse:
+            return self.matrix.data.nbytes + self.matrix.indices.nbytes + self.matrix.indptr.nbytes
+        return self.matrix.nbytes
+
+    def __contains__(self, name):
+        return name in self._positions
+
+    def column(self, name):
+        """ 성분 하나의 값 (제품 수 길이의 float64 배열, 없는 칸은 fill_value) """
+        col = self._positions[name]
+        if not self.is_sparse:
+            return self.matrix[:, col].astype(np.float64)
+        start, end = self.matrix.indptr[col], self.matrix.indptr[col + 1]
+        values = np.full(self.shape[0], self.fill_value, dtype=np.float64)
+        values[self.matrix.indices[start:end]] = self.matrix.data[start:end]
+        return values
+
+    def columns(self, names):
+        """ 여러 성분을 (제품 x 성분) float64 2차원 배열로 """
+        names = list(names)
+        if not names:
+            return np.empty((self.shape[0], 0), dtype=np.float64)
+        return np.column_stack([self.column(name) for name in names])
+
+    def presence(self, name):
+        """ 성분이 '있는' 제품 (bool 배열) """
+        col = self._positions[name]
+        if self.is_sparse:
+            present = np.zeros(self.shape[0], dtype=bool)
+            start, end = self.matrix.indptr[col], self.matrix.indptr[col + 1]
+            present[self.matrix.indices[start:end]] = True
+            return present
+        values = self.matrix[:, col]
+        if pd.isna(self.fill_value):
+            return ~np.isnan(values)
+        return values != self.fill_value
+
+    def value_range(self, name):
+        """ 값이 있는 칸의 (최소, 최대). 하나도 없으면 (NaN, NaN) - 'Series.min/max'와 동일 """
+        values = self.column(name)[self.presence(name)]
+        if pd.isna(self.fill_value):
+            values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return np.nan, np.nan
+        return float(values.min()), float(values.max())
+
+    def astype(self, dtype):
+        """ 값 dtype만 바꾼 새 저장소 (예: 메모리 절약 모드의 float32, 행 / 성분 구성은 공유) """
+        if self.is_sparse:
+            matrix = self.matrix.astype(dtype)
+        else:
+            matrix = np.asfortranarray(self.matrix, dtype=dtype)
+        return IngredientStore(self.product_index, self.names, matrix, self.fill_value)
+
+    def triples(self):
+        """ 값이 있는 칸의 (행 위치, 성분 위치, 값) - 'from_triples'의 역 """
+        if self.is_sparse:
+            coo = self.matrix.tocoo() # (저장된 칸 = 값이 있는 칸, 함량 0 포함)
+            return coo.row.astype(np.int64), coo.col.astype(np.int64), coo.data.astype(np.float64)
+        if pd.isna(self.fill_value):
+            present = ~np.isnan(self.matrix)
+        else:
+            present = self.matrix != self.fill_value
+        rows, cols = np.nonzero(present)
+        return rows.astype(np.int64), cols.astype(np.int64), self.matrix[rows, cols].astype(np.float64)
+
+    def take(self, rows):
+        """ 행 위치 배열의 제품만 그 순서대로 담은 새 저장소 (성분 구성은 그대로) """
+        rows = np.asarray(rows, dtype=np.int64)
+        new_position = np.full(self.shape[0], -1, dtype=np.int64)
+        new_position[rows] = np.arange(len(rows))
+        old_rows, cols, values = self.triples()
+        mapped = new_position[old_rows]
+        keep = mapped >= 0
+        return IngredientStore.from_triples(
+            self.product_index[rows], self.names, mapped[keep], cols[keep], values[keep], self.fill_value
+        )
+
+    @classmethod
+    def concat(cls, stores):
+        """
+        성분 구성(names, fill_value)이 같은 저장소들을 행 방향으로 이어 붙임 (제품 순서 = 입력 순서).
+        (밀집 / 희소, dtype은 합친 값으로 다시 결정)
+        :raises ValueError: 성분 구성이 다름
+        """
+        stores = list(stores)
+        first = stores[0]
+        for store in stores[1:]:
+            if store.names != first.names or not (
+                store.fill_value == first.fill_value or (pd.isna(store.fill_value) and pd.isna(first.fill_value))
+            ):
+                raise ValueError("성분 구성이 다른 IngredientStore는 이어 붙일 수 없습니다.")
+        all_rows, all_cols, all_values = [], [], []
+        offset = 0
+        for store in stores:
+            rows, cols, values = store.triples()
+            all_rows.append(rows + offset)
+            all_cols.append(cols)
+            all_values.append(values)
+            offset += store.shape[0]
+        product_index = first.product_index.append([store.product_index for store in stores[1:]])
+        return cls.from_triples(
+            product_index, first.names,
+            np.concatenate(all_rows), np.concatenate(all_cols), np.concatenate(all_values), first.fill_value
+        )
+
+    def to_frame(self, names=None, rows=None, index=None):
+        """
+        필요한 성분 / 필요한 행만 DataFrame으로 꺼냄 (화면 표시, 호환용).
+        :param rows: 행 위치 배열 (None이면 전체)
+        :param index: 결과 DataFrame의 인덱스 (None이면 0..n-1)
+        """
+        names = self.names if names is None else list(names)
+        data = {}
+        for name in names:
+            values = self.column(name)
+            data[name] = values if rows is None else values[rows]
+        n_rows = self.shape[0] if rows is None else len(rows)
+        if index is None:
+            index = pd.RangeIndex(n_rows)
+        return pd.DataFrame(data, index=index, columns=names)
@@ -1,5 +1,66 @@
 """
 Project Swan's Eye v4.5 - Main Dashboard (Control Panel + A/B Testing Studio)
+- v4.26: [Tab 1] 분석 결과를 점수 기록('score_history_v2')에 날짜별 스냅샷으로 저장 + 순위 변동 조회.
+    - '📚 순위 기록' 패널: 스냅샷 날짜 / 설명을 정해 저장 (룰북 digest 함께 기록),
+      기록된 두 스냅샷 사이 N위 이상 움직인 제품 표 (SQL 인덱스 조회 - 스냅샷 전체를 읽지 않음).
+- v4.25: 매일 새 추출본 업로드 시 증분 전처리 ('core_engine' v2.8.23 'preprocess_incremental_v2_8').
+    - 디스크 캐시에 없는 데이터셋이면, 마지막 전처리 상태(제품 지문 + 컴팩트 결과)와 비교하여
+      바뀐 / 새 제품만 전처리하고 나머지는 재사용 (결과는 전체 전처리와 동일).
+      상태는 모드 + 업로드 파일 이름별로 보관 (폴더째 교체 저장, 파일끼리 맞지 않으면 전체 전처리).
+- v4.24: [Tab 1] 실행마다 'copy.deepcopy(세션 룰북)' -> 불변 룰북 스냅샷 ('rulebook_v2.RulebookSnapshot').
+    - 직전 스냅샷과 같은 섹션 / 성분 룰은 객체를 공유, 검증 / 파라미터 배열 컴파일은 바뀐 섹션만.
+    - 스냅샷 digest가 직전 실행과 같으면 (실시간 분석 rerun 등) 스코어링 그래프가 직전 결과를 그대로 반환.
+- v4.23: 메모리 절약 모드 (환경 변수 'SWAN_LEAN_MEMORY=1').
+    - 원본: 반복이 많은 텍스트 컬럼 범주형, 전처리 / 점수: '브랜드' / 'tags_raw' 범주형 + 함량 / 점수 float32
+      ('core_engine' v2.8.21 'lean'), 디스크 캐시의 전처리 결과는 일반 모드와 따로 보관.
+    - 원본 / 전처리 / 델타 데이터 캐시를 'st.cache_data' -> 'st.cache_resource'
+      (세션마다 pickle 복사본을 만들지 않고 프로세스에서 한 벌만 공유, 모드와 무관 - 읽기 전용으로만 사용)
+    - 성능 리포트에 단계 출력 메모리('output_mb') 표시.
+- v4.22: [Tab 1] 단계별 성능 리포트 (opt-in).
+    - '⏱️ 단계별 성능 리포트'를 켜면 전처리(캐시) / 다시 계산된 스코어링 노드마다 시간, 행 수, 최대 메모리를 기록
+      ('core_engine.PipelineReport'), 룰북 JSON 옆 접이식 패널에 표시.
+    - 'cProfile 파일 저장'을 켜면 실행 전체 프로파일(.prof)을 저장하고 다운로드 버튼 제공.
+- v4.21: [Tab 2] 대용량 A/B 분포 차트.
+    - 'px.strip'(제품마다 SVG 점 하나) -> 그룹별 WebGL 점 ('go.Scattergl'), 두 그룹을 'concat'으로 합치지 않음.
+    - 그룹이 'chart_data_v2.CHART_POINT_LIMIT'개를 넘으면 결정적 표본 점(제품명 해시 순) + 그룹 전체의 분위수 박스.
+    - '분포 요약만' 모드 (분위수 박스만 전송), 'Y축 범위 (확대)' 슬라이더: 범위 안의 점은 한도 이내면 전부 표시.
+    - 차트용 '비교 그룹' 컬럼을 붙이던 그룹 복사 제거.
+- v4.20: [Tab 1] 최종 순위를 페이지 단위로 표시 (큰 카탈로그에서 Styler 렌더링 지연 제거).
+    - 분석 결과('AnalysisResult')를 세션에 보관하고, 현재 페이지의 행만 펼쳐서 표시 ('순위' 컬럼 추가).
+    - 순위는 엔진이 필요한 만큼만 부분 선택 ('AnalysisResult.top_positions', v2.8.17) - 상위 페이지는 전체 정렬 없음.
+    - 페이지를 넘겨도 스코어링을 다시 하지 않음 (버튼 모드에서도 마지막 결과 유지).
+- v4.19: [Tab 2] A/B 필터를 데이터셋당 한 번 만드는 필터 인덱스('filter_index_v2.FilterIndex')로 계산.
+    - 성분 포함 비트맵 + 함량 정렬 배열(범위 = 이진 탐색), 태그 비트맵, '브랜드' 값 -> 행 위치.
+    - 필터 묶음 -> 마스크 하나 (df 복사 / 필터마다 재색인 없음), 'B (그 외)'는 A 마스크의 반전.
+    - (델타 데이터에 없는 텍스트 컬럼 필터는 KeyError 대신 무시)
+- v4.18: [Tab 2] 델타 데이터 캐시 키 수정.
+    - '_raw_df', '_rules'만 받던 'prepare_delta_data'는 캐시 키가 '없어서' 룰북을 바꿔도 예전 결과가 나오던 버그 수정
+      (쓰이지 않던 'rulebook_str' 제거).
+    - 키 = 파일 지문(dataset_key) + 'core_engine.delta_cache_key'(전처리 + MarketScore 룰만), max_entries 제한.
+    - 전처리는 [Tab 1]과 같은 'get_preprocessed_data' 캐시를 공유.
+    - 파일 지문(sha256)은 업로드 파일이 바뀔 때만 한 번 계산해 세션에 보관 (매 rerun마다 해시하지 않음).
+- v4.17: 스캐너를 1-pass 벡터화 'core_engine.scan_catalog_v2_8'로 교체 (셀 안의 '모든' 성분 발견).
+    - 스캔 때 만든 성분 토큰을 [Tab 1] 전처리가 재사용 (성분 텍스트를 두 번 토크나이즈하지 않음).
+- v4.16: 디스크 캐시 ('dataset_cache_v2.DatasetCache') 추가.
+    - 업로드 파일 지문(sha256) 기준으로 파싱된 원본 / 스캔 결과 / 전처리 결과를 디스크에 저장,
+      앱 재시작이나 같은 파일 재업로드 시 CSV 파싱 / 정규식 단계를 건너뜀 (용량 초과 시 LRU 삭제).
+    - 파일 지문을 로드 '전'에 계산하고, 로더 / 스캐너 캐시 키로도 사용 (DataFrame 해시 생략).
+- v4.15: 업로드 CSV 인코딩을 앞부분 샘플로 판별 후 한 번만 파싱 ('core_engine.load_csv_v2_8' v2.8.12).
+    - (cp949 파일을 UTF-8로 끝까지 읽다 실패해서 처음부터 다시 읽던 지연 제거)
+- v4.14: CSV 로더 / 스캐너 / 기본 룰북 생성 로직을 'core_engine'으로 이동 ('swan_cli_v2' CLI와 공용).
+    - 앱에는 Streamlit 캐시 / 오류 표시 / 세션 저장만 남김.
+- v4.13: 성분 함량을 넓은 DataFrame 대신 'IngredientStore'(컴팩트 저장소)로 보관.
+    - [Tab 1] 전처리 캐시/증분 스코어링이 (base_df, store)로 동작, 표 표시 때만 넓게 펼침.
+    - [Tab 2] 성분 필터의 min/max, 포함/배제, 함량 범위를 store에서 직접 조회.
+      (목록에는 필터에 쓰인 성분 컬럼만 해당 행만큼 꺼내서 표시)
+- v4.12: [Tab 2] 특수태그 필터를 '태그 포함 행렬'(core_engine.TagIncidence) 컬럼 조회로 변경.
+    - 데이터셋당 한 번만 태그를 파싱하고, 필터마다 정규식을 다시 돌리지 않음.
+- v4.11: [Tab 1] '실시간 분석' 토글 추가.
+    - 'scoring_graph_v2.ScoringGraph'(노드 단위 메모이즈)를 세션에 보관하여,
+      슬라이더가 바뀔 때마다 '바뀐 룰의 하류'만 다시 계산 (버튼 없이도 결과 갱신).
+- v4.10: [Tab 1] '전처리'를 별도 캐시 단계로 분리.
+    - 업로드 파일 지문(sha256) + 'core_engine.preprocess_cache_key' 기준으로 전처리 결과를 캐시.
+    - 가중치/S-Curve/태그 점수만 바꾼 '분석 실행하기'는 CSV를 다시 파싱하지 않고 스코어링만 실행.
 - v4.9.3 (사장님 요청): [Tab 1] '최종 순위' 표시에 '누락'된 '브랜드'/'MarketScore'를 '표시'하고,
     - '컬럼 순서'를 ('브랜드', '제품명', '영양제점수', '가격', 'MarketScore', '그외')로 '재배치'.
     - `initialize_session_state`에 '브랜드' 컬럼('brand': '브랜드') '추가'.
@@ -12,10 +73,18 @@ Project Swan's Eye v4.5 - Main Dashboard (Control Panel + A/B Testing Studio)
 import streamlit as st
 import pandas as pd
 import numpy as np
-import re
 import core_engine_v2 as core_engine # v2.7.1 (v4.9.3) 엔진 임포트
-import copy
-import plotly.express as px
+import scoring_graph_v2 # v2.8.4 증분 스코어링 엔진
+import rulebook_v2 # v2.8.22 불변 룰북 스냅샷
+import dataset_cache_v2 # v2.8.13 디스크 캐시
+import filter_index_v2 # v2.8.16 A/B 필터 인덱스
+import chart_data_v2 # v2.8.18 A/B 분포 차트 데이터
+import score_history_v2 # v2.8.24 점수 기록
+import datetime
+import hashlib
+import os
+import sqlite3
+import plotly.graph_objects as go
 
 # ---
 # 페이지 기본 설정
@@ -25,76 +94,69 @@ st.set_page_config(
     layout="wide"
 )
 
+# [v4.20] [Tab 1] 최종 순위 표 페이지 크기 (첫 값이 기본)
+RESULT_PAGE_SIZES = [50, 100, 500]
+
+# [v4.21] [Tab 2] 분포 차트 모드
+CHART_MODES = ["자동", "분포 요약만"]
+
+# [v4.22] cProfile 결과 저장 폴더 (디스크 캐시 폴더 아래)
+PROFILE_DIR = os.path.join(dataset_cache_v2.DEFAULT_CACHE_DIR, 'profiles')
+
+# [v4.23] 메모리 절약 모드 (범주형 텍스트 + float32 함량 / 점수, 점수는 float32 반올림만큼 다를 수 있음)
+LEAN_MEMORY = os.environ.get('SWAN_LEAN_MEMORY', '0') == '1'
+
+# [v4.26] 점수 기록 파일 (환경 변수 'SWAN_HISTORY_PATH')
+HISTORY_PATH = score_history_v2.DEFAULT_HISTORY_PATH
+
+# [v4.25] 증분 전처리 상태 폴더 (디스크 캐시 폴더 아래, 모드별 - 컬럼 dtype이 다르므로)
+# (그 아래 업로드 파일 이름별 하위 폴더 - 'incremental_state_dir')
+INCREMENTAL_DIR = os.path.join(
+    dataset_cache_v2.DEFAULT_CACHE_DIR, 'incremental', 'lean' if LEAN_MEMORY else 'default'
+)
+
+# ---
+# [v4.16] 디스크 캐시 (프로세스 간 공유, 없거나 쓸 수 없으면 None)
+# ---
+@st.cache_resource(show_spinner=False)
+def get_dataset_cache():
+    try:
+        return dataset_cache_v2.DatasetCache()
+    except OSError:
+        return None
+
+# ---
+# [v4.17] 1-pass 스캐너 결과 (발견 목록 + 전처리용 성분 토큰)
+# ---
+@st.cache_resource(max_entries=2, show_spinner=False)
+def get_catalog_scan(_df, dataset_key):
+    """ 'core_engine.CatalogScan' (읽기 전용으로만 쓰므로 복사 없이 공유) """
+    return core_engine.scan_catalog_v2_8(_df)
+
 # ---
 # [v4.5] CSV 자동 스캐너 (v2.6 확장판)
 # ---
 @st.cache_data # CSV 스캔은 한번만
-def scan_csv_for_rules_v4_5(df):
+def scan_csv_for_rules_v4_5(_df, dataset_key):
     """
     CSV를 스캔하여 '핵심/보조/태그' 뿐만 아니라,
     '브랜드' 등 '텍스트(Object)' 컬럼의 고유값도 '싹 다' 스캔.
+    ([v4.14] 스캔 로직은 'core_engine.scan_csv_for_rules'로 이동, 여기서는 캐시만)
+    ([v4.16] 캐시 키는 파일 지문 dataset_key, 디스크 캐시에 있으면 재사용)
     """
     
     # [v2.6.1] None 방어 코드
-    if df is None:
+    if _df is None:
         st.warning("scan_csv_for_rules: CSV 데이터가 없어 스캔을 건너뜁니다.")
-        return {'main_comps': [], 'sub_comps': [], 'tags': [], 'text_cols': {}}
-    
-    discovered = {
-        'main_comps': set(),
-        'sub_comps': set(),
-        'tags': set(),
-        'text_cols': {} # [v4.5 신규] '브랜드' 등을 담을 곳
-    }
-    
-    # 1. 성분 스캔 (핵심, 보조)
-    comp_cols = ['핵심성분명태그', '보조성분명태그']
-    pattern = re.compile(r"성분\s*:\s*([^,]+)", re.IGNORECASE)
-    
-    for col in comp_cols:
-        if col in df.columns:
-            for text in df[col].dropna():
-                clean_text = str(text).replace(" ", "")
-                match = pattern.search(clean_text)
-                if match:
-                    comp_name = match.group(1).strip()
-                    if comp_name:
-                        if col == '핵심성분명태그':
-                            discovered['main_comps'].add(comp_name)
-                        else:
-                            discovered['sub_comps'].add(comp_name)
-
-    # 2. 태그 스캔
-    tag_col = '특수태그'
-    if tag_col in df.columns:
-        # [v2.7.2] 버그 수정된 로직
-        for text in df[tag_col].dropna(): 
-            tags_list = str(text).split('|')
-            for tag in tags_list:
-                clean_tag = tag.strip().replace('*', '').strip()
-                if clean_tag:
-                    discovered['tags'].add(clean_tag)
-
-    # 3. [v4.5 신규] '브랜드' 등 텍스트 컬럼 스캔
-    # (핵심 로직에서 이미 사용 중인 컬럼은 제외)
-    excluded_cols = [
-        '제품명', '핵심성분명태그', '보조성분명태그', '특수태그',
-        '1일 섭취량당 가격', '리뷰 개수', '리뷰 별점'
-    ]
-    
-    for col in df.select_dtypes(include=['object', 'category']).columns:
-        if col not in excluded_cols:
-            unique_values = df[col].dropna().unique()
-            # [v4.9.3] '브랜드' 컬럼이 50개 이상이어도 스캔되도록 50->100으로 확장
-            if 1 < len(unique_values) < 100: 
-                discovered['text_cols'][col] = sorted(list(unique_values))
-                    
-    return {
-        'main_comps': sorted(list(discovered['main_comps'])),
-        'sub_comps': sorted(list(discovered['sub_comps'])),
-        'tags': sorted(list(discovered['tags'])),
-        'text_cols': discovered['text_cols'] # 딕셔너리 { '브랜드': ['A', 'B'], ... }
-    }
+        return core_engine.scan_csv_for_rules(_df)
+
+    disk_cache = get_dataset_cache()
+    scan = disk_cache.get_scan(dataset_key) if disk_cache else None
+    if scan is None:
+        scan = get_catalog_scan(_df, dataset_key).discovered
+        if disk_cache:
+            disk_cache.put_scan(dataset_key, scan)
+    return scan
 
 # ---
 # [v4.9.3] 세션 상태 초기화 ('브랜드' '누락' 복구)
@@ -106,60 +168,8 @@ def initialize_session_state(discovered_rules):
     if 'v2_rulebook' in st.session_state:
         return # 이미 초기화됨
 
-    rb = {
-        'columns': { # v1.4의 공통 컬럼
-            'product_name': '제품명',
-            'price': '1일 섭취량당 가격',
-            'review_count': '리뷰 개수',
-            'rating': '리뷰 별점',
-            'brand': '브랜드' # --- [v4.9.3] '브랜드' '누락' 복구 ---
-        },
-        'final_weights': { 'weight_a': 0.5, 'weight_b': 0.3, 'weight_c': 0.2 },
-        'score_a_main_components': {
-            'csv_column': '핵심성분명태그',
-            'rules': {}
-        },
-        'score_b_price': { 'k_value': 1.0 },
-        'score_c_sub_components': {
-            'csv_column': '보조성분명태그',
-            'final_weight': 0.5,
-            'rules': {}
-        },
-        'score_c_tags': {
-            'csv_column': '특수태그',
-            'final_weight': 0.5,
-            'rules': {}
-        },
-        # [v2.7]  분석기용 룰
-        'market_score_weights': {
-            'k_review': 2.0, # v1.4 기본값
-            'k_rating': 1.0, # v1.4 기본값
-            'weight_review': 0.7, # v1.4 기본값
-            'weight_rating': 0.3  # v1.4 기본값
-        }
-    }
-
-    # 1. Score A 룰북 채우기 (v2.6.4: 'enabled': True)
-    for name in discovered_rules['main_comps']:
-        rb['score_a_main_components']['rules'][name] = {
-            'enabled': True,
-            'min_dose': 500.0, 'rec_dose': 1000.0,
-            'rec_score': 80.0, 'saturation_factor': 1.0,
-            'weight': 1.0
-        }
-        
-    # 2. Score C-1 룰북 채우기 (v2.6.4: 'enabled': True)
-    for name in discovered_rules['sub_comps']:
-        rb['score_c_sub_components']['rules'][name] = {
-            'enabled': True,
-            'min_dose': 100.0, 'rec_dose': 200.0,
-            'rec_score': 70.0, 'saturation_factor': 0.5,
-            'weight': 1.0
-        }
-
-    # 3. Score C-2 룰북 채우기 (점수 0)
-    for name in discovered_rules['tags']:
-        rb['score_c_tags']['rules'][name] = 0.0
+    # [v4.14] 기본 룰북 생성은 엔진으로 이동 (CLI와 공용)
+    rb = core_engine.build_default_rulebook(discovered_rules)
         
     st.session_state.v2_rulebook = rb
     
@@ -172,11 +182,12 @@ def initialize_session_state(discovered_rules):
 # ---
 # [v4.8] 헬퍼 함수 1: '다중 필터 박스' UI (v4.7 '쓸데없는말' 제거 + v4.8 '컨테이너' 적용)
 # ---
-def create_filter_box(box_id, discovered_rules, delta_df):
+def create_filter_box(box_id, discovered_rules, delta_df, store):
     """
     [v4.8] '하나로 통일'된 v4.5 '다중 필터 박스' UI를 생성합니다.
     "필터걸지말지" (Checkbox) + "추가 조정" (Radio/Slider/Multiselect) 로직 구현.
     '부수적인 버튼'을 'st.container(border=True)'로 "가시적"으로 "구분".
+    (v4.13) 성분 함량은 store(IngredientStore)에서 조회.
     """
     
     # 필터 상태 저장을 위해 세션 상태 사용
@@ -189,7 +200,7 @@ def create_filter_box(box_id, discovered_rules, delta_df):
     with st.expander("🔬 1. 성분 함량(스펙) 필터"):
         all_components = discovered_rules['main_comps'] + discovered_rules['sub_comps']
         for comp_name in all_components:
-            if comp_name not in delta_df.columns:
+            if comp_name not in store:
                 continue
             
             # (1) "필터걸지말지" Checkbox (v4.7 - "쓸데없는말" 제거)
@@ -214,7 +225,7 @@ def create_filter_box(box_id, discovered_rules, delta_df):
                     
                     if use_slider:
                         # (4) "추가로 조정" Slider
-                        min_val, max_val = float(delta_df[comp_name].min()), float(delta_df[comp_name].max())
+                        min_val, max_val = store.value_range(comp_name)
                         if pd.isna(min_val) or pd.isna(max_val):
                             st.caption(f"'{comp_name}' 데이터가 없어 함량 범위를 조정할 수 없습니다.")
                             filter_rule['slider'] = None
@@ -284,47 +295,215 @@ def create_filter_box(box_id, discovered_rules, delta_df):
 # ---
 # [v4.8.1] 헬퍼 함수 2: '다중 필터' 적용 (v4.6.1 'Blackbox' 버그 수정)
 # ---
-def apply_filters(df, filters):
+def apply_filters(df, filters, filter_index):
     """
     [v4.8.1] '다중 필터' 룰(v4.6 성분 룰)을 받아 '엑셀' '노가다'를 '자동화'합니다.
     (v4.8.1) "배제" -> "배제" 'Blackbox' 버그 '완벽' 수정.
+    (v4.19) 'filter_index_v2.FilterIndex'로 모든 조건을 마스크 하나로 계산
+        (df 복사 / 필터마다 재색인 없음). 반환 = (해당 행, 마스크)
     """
-    filtered_df = df.copy()
-    
-    for key, rule in filters.items():
+    mask = filter_index.mask(filters)
+    return df[mask], mask
+
+def with_component_columns(group_df, full_df, store, comp_names):
+    """
+    [v4.13] 목록 표시용: group_df(필터 결과)에 성분 함량 컬럼을 '그 행만큼만' store에서 꺼내 붙임.
+    (full_df = store와 같은 행 순서의 전체 delta_df)
+    """
+    comp_names = [comp_name for comp_name in comp_names if comp_name in store]
+    if not comp_names:
+        return group_df
+    positions = full_df.index.get_indexer(group_df.index)
+    comp_df = store.to_frame(names=comp_names, rows=positions, index=group_df.index)
+    return pd.concat([group_df, comp_df], axis=1)
+
+# ---
+# [v4.21] 헬퍼 함수: A/B 분포 차트 (그룹별 WebGL 점 + 분위수 박스)
+# ---
+def build_distribution_figure(groups, value_col, color_map, title, mode, value_range=None):
+    """
+    [v4.21] groups = [(라벨, 그룹 df, 표본 키)] -> 그룹별 트레이스 (두 그룹을 합치지 않음).
+    - "자동": 그룹당 'CHART_POINT_LIMIT'개 이하면 모든 점, 넘으면 결정적 표본 점 + 전체 분위수 박스
+    - "분포 요약만": 그룹 전체의 분위수 박스 (5% / 25% / 50% / 75% / 95%, 평균)만
+    - value_range(확대)면 그 범위 안의 점만 (범위 안이 한도 이내면 전부 정확히)
+    """
+    fig = go.Figure()
+    for x_pos, (label, group_df, keys) in enumerate(groups):
+        values = group_df[value_col].to_numpy(dtype=np.float64, na_value=np.nan)
+        color = color_map.get(label)
+        summary = chart_data_v2.quantile_summary(values)
+        sampled = False
         
-        # --- [v4.6] 성분 룰 (dict) 처리 ---
-        if isinstance(rule, dict):
-            # (1) "b1이 있는제품만" (포함/미포함) 필터
-            if rule['type'] == "반드시 포함":
-                filtered_df = filtered_df[filtered_df[key].notna()]
-            elif rule['type'] == "배제": # <-- [v4.8.1] "배제"에서 수정
-                filtered_df = filtered_df[filtered_df[key].isna()]
-            
-            # (2) "추가로 조정" Slider 필터 (선택 사항)
-            if rule['slider'] is not None:
-                min_val, max_val = rule['slider']
-                # (주의: 'notna'/'isna'로 이미 걸러졌으므로, 'isna()' OR 조건 제거)
-                filtered_df = filtered_df[
-                    (filtered_df[key].between(min_val, max_val))
-                ]
-        # --- [수정 완료] ---
-                
-        elif rule == "반드시 포함": # 특수태그 (v4.5와 동일)
-            mask = filtered_df['tags_raw'].str.contains(
-                f"{re.escape(key)}\s*\*", na=False, regex=True
-            )
-            filtered_df = filtered_df[mask]
-        elif rule == "배제": # 특수태그 <-- [v4.8.1] "배제"에서 수정
-            mask = filtered_df['tags_raw'].str.contains(
-                f"{re.escape(key)}\s*\*", na=False, regex=True
-            )
-            filtered_df = filtered_df[~mask]
-        elif isinstance(rule, list): # ['A', 'B'] -> 텍스트/브랜드 Multiselect (v4.5와 동일)
-            mask = filtered_df[key].isin(rule)
-            filtered_df = filtered_df[mask]
-            
-    return filtered_df
+        if mode == "자동":
+            rows, n_points = chart_data_v2.point_rows(values, keys, value_range=value_range)
+            sampled = len(rows) < n_points
+            point_name = f"{label} (표본 {len(rows):,}/{n_points:,})" if sampled else label
+            fig.add_trace(go.Scattergl(
+                x=x_pos + chart_data_v2.jitter(keys[rows]),
+                y=values[rows],
+                mode='markers',
+                name=point_name,
+                marker=dict(color=color, size=5, opacity=0.5 if sampled else 0.8),
+                text=group_df['product_name'].to_numpy()[rows],
+                hovertemplate="%{text}<br>%{y}<extra>" + label + "</extra>"
+            ))
+        
+        if summary is not None and (sampled or mode != "자동"):
+            fig.add_trace(go.Box(
+                x=[x_pos],
+                lowerfence=[summary['lower']], q1=[summary['q1']], median=[summary['median']],
+                q3=[summary['q3']], upperfence=[summary['upper']], mean=[summary['mean']],
+                name=f"{label} (n={summary['count']:,})",
+                marker_color=color, fillcolor='rgba(0,0,0,0)', width=0.7
+            ))
+    
+    fig.update_layout(
+        title=title,
+        xaxis=dict(
+            tickmode='array', tickvals=list(range(len(groups))),
+            ticktext=[label for label, _, _ in groups], range=[-0.5, len(groups) - 0.5]
+        ),
+        yaxis=dict(title=value_col, range=list(value_range) if value_range is not None else None),
+        legend=dict(orientation='h')
+    )
+    return fig
+
+# ---
+# [v4.22] 헬퍼 함수: 단계별 성능 리포트 표시
+# ---
+def show_pipeline_report(report):
+    """ [v4.22] 'PipelineReport' -> 접을 수 있는 패널 (단계 표 + cProfile 파일 다운로드) """
+    st.subheader("성능 리포트")
+    with st.expander(f"⏱️ 단계별 시간 / 메모리 (총 {report.total_seconds:.3f}초)", expanded=False):
+        st.caption("스코어링은 증분 그래프라서 이번 실행에서 '다시 계산된' 노드만 표시됩니다.")
+        st.dataframe(
+            report.to_frame().style.format(
+                {'seconds': '{:.4f}', 'peak_mb': '{:.1f}', 'output_mb': '{:.1f}', 'share': '{:.1%}'}, na_rep='-'
+            ),
+            hide_index=True
+        )
+        if report.profile_path:
+            with open(report.profile_path, 'rb') as f:
+                st.download_button(
+                    "cProfile 결과 (.prof) 다운로드", f.read(),
+                    file_name=os.path.basename(report.profile_path)
+                )
+
+def show_score_history(analysis_result, digest):
+    """
+    [v4.26] 점수 기록 패널: 현재 결과를 날짜별 스냅샷으로 저장 + 두 스냅샷 사이 순위 변동 조회.
+    (기록 파일을 열 수 없으면 경고만 표시)
+    """
+    with st.expander("📚 순위 기록 (날짜별 스냅샷 / 순위 변동)", expanded=False):
+        st.caption(f"기록 파일: {HISTORY_PATH}")
+        try:
+            with score_history_v2.ScoreHistory(HISTORY_PATH) as history:
+                save_cols = st.columns([1, 2, 1])
+                snapshot_date = save_cols[0].date_input("스냅샷 날짜", value=datetime.date.today(), key="history_date")
+                label = save_cols[1].text_input("설명 (선택)", key="history_label")
+                if save_cols[2].button("현재 결과 저장", key="history_save"):
+                    snapshot_id = history.append(
+                        analysis_result, snapshot_date, digest, label=label or None
+                    )
+                    st.success(f"스냅샷 {snapshot_id} 저장 ({len(analysis_result):,}개 제품)")
+
+                snapshots = history.snapshots()
+                if len(snapshots) < 2:
+                    st.info("순위 변동을 보려면 스냅샷이 2개 이상 필요합니다.")
+                    return
+                options = list(snapshots.index)
+                def describe(snapshot_id):
+                    row = snapshots.loc[snapshot_id]
+                    suffix = f" {row['label']}" if row['label'] else ''
+                    return f"#{snapshot_id} {row['snapshot_date']}{suffix} ({row['products']:,}개)"
+                move_cols = st.columns([2, 2, 1])
+                before = move_cols[0].selectbox(
+                    "이전", options, index=len(options) - 2, format_func=describe, key="history_before"
+                )
+                after = move_cols[1].selectbox(
+                    "이후", options, index=len(options) - 1, format_func=describe, key="history_after"
+                )
+                min_move = move_cols[2].number_input("최소 변동 (위)", min_value=1, value=10, step=1, key="history_min_move")
+                if snapshots.loc[before, 'rulebook_digest'] != snapshots.loc[after, 'rulebook_digest']:
+                    st.warning("두 스냅샷의 룰북이 다릅니다 (순위 변동에 룰북 변경 효과가 섞여 있음).")
+                movers = history.rank_movers(before, after, min_move)
+                st.caption(f"{min_move}위 이상 움직인 제품 {len(movers):,}개 (move > 0: 상승)")
+                st.dataframe(movers.style.format(precision=2), hide_index=True)
+        except (OSError, sqlite3.Error) as e:
+            st.warning(f"순위 기록을 열 수 없습니다: {e}")
+
+# ---
+# [v4.10] 헬퍼 함수 3: 전처리 캐시 (스코어링과 분리)
+# ---
+def incremental_state_dir(lineage):
+    """ [v4.25] 업로드 파일 이름 -> 증분 상태 폴더 (이름은 해시 - 파일 시스템에 쓸 수 없는 문자 방지) """
+    return os.path.join(INCREMENTAL_DIR, hashlib.sha256(lineage.encode('utf-8')).hexdigest()[:16])
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def get_preprocessed_data(_raw_df, dataset_key, preprocess_key, _rules, _lineage):
+    """
+    [v4.10] 전처리(agg_df)만 따로 캐시.
+    - 캐시 키: dataset_key(업로드 파일 지문) + preprocess_key(전처리에 쓰이는 룰북 부분의 다이제스트)
+    - '_raw_df', '_rules'는 해시하지 않음 (위 두 키가 대신함)
+    [v4.13] 컴팩트 결과 (base_df, IngredientStore)를 캐시.
+    [v4.16] 디스크 캐시에 있으면 재사용, 없으면 계산 후 저장.
+    [v4.17] 스캐너의 성분 토큰을 재사용.
+    [v4.23] cache_resource (세션 간 복사 없이 공유 - 읽기 전용), 메모리 절약 모드면 디스크 캐시 키를 따로.
+    [v4.25] 디스크 캐시에도 없으면 마지막 증분 상태 대비 바뀐 / 새 제품만 전처리 후 상태 갱신.
+        상태는 '_lineage'(업로드 파일 이름)별로 따로 (매일 같은 이름의 추출본끼리 비교, 다른 카탈로그와 섞지 않음),
+        저장은 폴더째 교체 + 읽을 때 파일끼리 맞는지 확인 (세션이 동시에 저장해도 섞인 상태를 쓰지 않음)
+    """
+    disk_key = f"{preprocess_key}_lean" if LEAN_MEMORY else preprocess_key
+    disk_cache = get_dataset_cache()
+    if disk_cache:
+        cached = disk_cache.get_preprocessed(dataset_key, disk_key)
+        if cached is not None:
+            return cached
+    component_tokens = get_catalog_scan(_raw_df, dataset_key).component_tokens
+    if not disk_cache:
+        return core_engine.run_preprocess_v2_6(
+            _raw_df, _rules, compact=True, component_tokens=component_tokens, lean=LEAN_MEMORY
+        )
+    state_dir = incremental_state_dir(_lineage)
+    base_df, store, state, _ = core_engine.preprocess_incremental_v2_8(
+        _raw_df, _rules, core_engine.IncrementalState.load(state_dir),
+        component_tokens=component_tokens, lean=LEAN_MEMORY
+    )
+    disk_cache.put_preprocessed(dataset_key, disk_key, base_df, store)
+    try:
+        state.save(state_dir)
+    except OSError:
+        pass
+    return base_df, store
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def get_filter_index(_delta_df, _store, dataset_key, preprocess_key, tag_names, text_columns):
+    """
+    [v4.12] (제품 x 태그) 포함 행렬. 데이터셋 + 전처리 키당 한 번만 파싱.
+    [v4.19] 성분 / 태그 / 텍스트 컬럼 전체의 필터 인덱스로 확장 ('filter_index_v2.FilterIndex').
+    (읽기 전용으로만 쓰므로 복사 없이 공유되는 cache_resource 사용)
+    """
+    tag_index = core_engine.TagIncidence(_delta_df['tags_raw'])
+    return filter_index_v2.FilterIndex(
+        _delta_df, _store, tag_index, tag_names=tag_names, text_columns=text_columns
+    )
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def get_chart_sample_keys(_product_names, dataset_key, preprocess_key):
+    """ [v4.21] 차트 표본 / jitter용 제품명 해시 (데이터셋 + 전처리 키당 1회) """
+    return chart_data_v2.sample_keys(_product_names)
+
+def get_scoring_graph(base_df, store, dataset_key, preprocess_key):
+    """
+    [v4.11] 세션별 증분 스코어링 엔진.
+    같은 (데이터셋, 전처리 키)면 기존 그래프(노드 캐시)를 재사용, 바뀌면 새로 만든다.
+    """
+    graph_key = (dataset_key, preprocess_key)
+    cached = st.session_state.get('v4_scoring_graph')
+    if cached is None or cached[0] != graph_key:
+        cached = (graph_key, scoring_graph_v2.ScoringGraph(base_df, store, lean=LEAN_MEMORY))
+        st.session_state.v4_scoring_graph = cached
+    return cached[1]
 
 # ---
 # [메인 프로그램]
@@ -339,27 +518,40 @@ if uploaded_file is None:
     st.info("⬆️ 분석할 CSV 파일을 업로드해 주세요.")
     st.stop()
 
+# [v4.10] 업로드 파일 지문 (전처리 캐시 키)
+# [v4.16] 로드 '전'에 계산 (로더 / 스캐너 / 디스크 캐시 키)
+# [v4.18] 같은 업로드 파일이면 세션에 보관한 지문 재사용 (rerun마다 전체 바이트를 해시하지 않음)
+upload_id = getattr(uploaded_file, 'file_id', None) or (uploaded_file.name, uploaded_file.size)
+cached_fingerprint = st.session_state.get('v4_dataset_fingerprint')
+if cached_fingerprint is None or cached_fingerprint[0] != upload_id:
+    cached_fingerprint = (upload_id, hashlib.sha256(uploaded_file.getvalue()).hexdigest())
+    st.session_state.v4_dataset_fingerprint = cached_fingerprint
+dataset_key = cached_fingerprint[1]
+# [v4.25] 증분 상태 계열 (같은 이름으로 매일 올리는 추출본끼리 비교)
+dataset_lineage = uploaded_file.name
+
 # [v2.6.2] 수정된 로더
-@st.cache_data
-def load_csv(file):
+@st.cache_resource(max_entries=2, show_spinner=False)
+def load_csv(_file, dataset_key):
+    # [v4.14] 로더 본체는 'core_engine.load_csv_v2_8' (v4.15: 인코딩 판별 후 1회 파싱)
+    # (스캐너가 '브랜드' 등 모든 텍스트 컬럼을 봐야 하므로 룰북 없이 전체 컬럼)
+    # [v4.16] 디스크 캐시에 파싱 결과가 있으면 CSV를 다시 파싱하지 않음
+    # [v4.23] cache_resource (세션 간 공유, 읽기 전용), 메모리 절약 모드면 범주형 텍스트
+    disk_cache = get_dataset_cache()
+    if disk_cache:
+        cached = disk_cache.get_raw(dataset_key)
+        if cached is not None:
+            return core_engine.lean_text_columns(cached) if LEAN_MEMORY else cached
     try:
-        # 1차: UTF-8 우선 시도
-        return pd.read_csv(file, encoding='utf-8')
-    except UnicodeDecodeError:
-        try:
-            # 2차: cp949 시도
-            file.seek(0) # 파일 포인터 리셋
-            return pd.read_csv(file, encoding='cp949') # 실패 시 cp949
-        except Exception as e:
-            # 2차 시도(cp949)도 실패
-            st.error(f"파일 로드 오류 (cp949 시도): {e}")
-            return None
-    except Exception as e:
-        # 1차 시도(utf-8)에서 UnicodeDecodeError 외의 오류 발생
-        st.error(f"파일 로드 오류 (utf-8 시도): {e}")
+        raw_df = core_engine.load_csv_v2_8(_file, lean=LEAN_MEMORY)
+    except ValueError as e:
+        st.error(str(e))
         return None
+    if disk_cache:
+        disk_cache.put_raw(dataset_key, raw_df)
+    return raw_df
 
-raw_df = load_csv(uploaded_file)
+raw_df = load_csv(uploaded_file, dataset_key)
 if raw_df is None:
     st.error("CSV 파일 로드에 최종 실패했습니다. 파일 인코딩(utf-8, cp949)이나 내용을 확인해 주세요.")
     st.stop() 
@@ -367,7 +559,7 @@ if raw_df is None:
 # [v4.5] 스캐너 실행 (v4.5) 및 세션 초기화 (v4.9.3)
 try:
     # _discovered_rules는 @st.cache_data로 캐시됨
-    _discovered_rules = scan_csv_for_rules_v4_5(raw_df)
+    _discovered_rules = scan_csv_for_rules_v4_5(raw_df, dataset_key)
     initialize_session_state(_discovered_rules)
 except KeyError as e:
     st.error(f"CSV 스캔 오류: '{e}' 컬럼이 없습니다.")
@@ -490,48 +682,99 @@ with tab1:
 
     # --- [v4.9.3] 6. 분석 실행 (컬럼 순서 재배치) ---
     st.header("📈 분석결과")
-    if st.button("▶️ 분석 실행하기", type="primary"):
-        dynamic_rulebook = copy.deepcopy(st.session_state.v2_rulebook)
+    # [v4.11] '실시간 분석': 켜져 있으면 위젯이 바뀔 때마다 (바뀐 부분만) 자동 재계산
+    live_mode = st.toggle("⚡ 실시간 분석 (설정 변경 시 자동 재계산)", key="live_mode")
+    # [v4.22] 단계별 성능 리포트 (opt-in, cProfile 파일 저장은 추가 선택)
+    perf_cols = st.columns(2)
+    perf_report = perf_cols[0].checkbox("⏱️ 단계별 성능 리포트", key="perf_report")
+    perf_profile = perf_cols[1].checkbox("cProfile 파일 저장", key="perf_profile", disabled=not perf_report)
+    run_clicked = st.button("▶️ 분석 실행하기", type="primary", disabled=live_mode)
+    if run_clicked or live_mode:
+        # [v4.24] 위젯이 수정하는 세션 룰북 -> 불변 스냅샷 (deepcopy 대신, 안 바뀐 부분은 직전 스냅샷과 공유)
+        dynamic_rulebook = rulebook_v2.RulebookSnapshot.from_dict(
+            st.session_state.v2_rulebook, previous=st.session_state.get('v4_rulebook_snapshot')
+        )
+        st.session_state.v4_rulebook_snapshot = dynamic_rulebook
         st.write("---")
-        st.subheader("적용된 최종 룰북 (JSON)")
-        st.json(dynamic_rulebook, expanded=False)
+        json_cols = st.columns(2)
+        with json_cols[0]:
+            st.subheader("적용된 최종 룰북 (JSON)")
+            st.json(dynamic_rulebook, expanded=False)
+        report = None
+        if perf_report:
+            report = core_engine.PipelineReport(profile_dir=PROFILE_DIR if perf_profile else None)
         try:
-            with st.spinner(""):
-                final_df = core_engine.run_full_analysis_v2_6(raw_df, dynamic_rulebook)
-            st.subheader("최종 순위 및 점수")
-            
-            # --- [v4.9.3 수정] ---
-            # (1) 'Blackbox' 없는 '이름 변경' (v4.9.2 확장)
-            final_df = final_df.rename(columns={
-                'SWAN_SCORE_V2': '영양제점수',
-                'product_name': '제품명',
-                'price': '가격',
-                'MARKET_SCORE': 'MarketScore'
-                # '브랜드'는 엔진(v4.9.3)에서 '브랜드'로 '추가'됨
-            })
-            
-            # (2) 사장님이 요청하신 "원하는 순서" ('그 외' 포함)
-            desired_order = [
-                '브랜드', 
-                '제품명', 
-                '영양제점수', 
-                '가격', 
-                'MarketScore'
-            ]
-            
-            # (3) '그 외' 컬럼 '자동' 추가 (순서 유지)
-            existing_cols = [col for col in desired_order if col in final_df.columns]
-            other_cols = [col for col in final_df.columns if col not in existing_cols]
-            final_display_cols = existing_cols + other_cols
-            # --- [v4.9.3 수정 완료] ---
-
-            st.dataframe(final_df[final_display_cols].style.format(precision=2))
-            
+            with st.spinner(""), core_engine.report_run(report, 'tab1_analysis'):
+                # [v4.10] 전처리는 캐시에서, 스코어링만 매번 실행
+                preprocess_key = core_engine.preprocess_cache_key(dynamic_rulebook)
+                with core_engine.report_stage(report, 'preprocess (캐시)', len(raw_df)) as record:
+                    base_df, store = get_preprocessed_data(
+                        raw_df, dataset_key, preprocess_key, dynamic_rulebook, dataset_lineage
+                    )
+                    record['rows_out'] = len(base_df)
+                # [v4.11] 스코어링은 증분 그래프로 (바뀐 룰의 하류 노드만 재계산)
+                graph = get_scoring_graph(base_df, store, dataset_key, preprocess_key)
+                # [v4.20] 결과(AnalysisResult)는 세션에 보관 -> 페이지 이동 시 다시 계산하지 않음
+                # [v4.26] 기록 저장용 룰북 digest도 함께
+                st.session_state.v4_analysis_result = (
+                    dataset_key, graph.run(dynamic_rulebook, report), dynamic_rulebook.digest
+                )
+            if report is not None:
+                with json_cols[1]:
+                    show_pipeline_report(report)
         except ValueError as e:
             st.error(f"엔진 실행 중 오류가 발생했습니다: {e}")
         except Exception as e:
             st.error(f"알 수 없는 심각한 오류: {e}")
 
+    # [v4.20] 마지막 분석 결과를 페이지 단위로 표시 (현재 페이지의 행만 펼쳐서 렌더링)
+    stored_result = st.session_state.get('v4_analysis_result')
+    if stored_result is not None and stored_result[0] == dataset_key:
+        analysis_result = stored_result[1]
+        st.subheader("최종 순위 및 점수")
+        page_cols = st.columns([1, 1, 2])
+        page_size = page_cols[0].selectbox("페이지당 제품 수", RESULT_PAGE_SIZES, key="result_page_size")
+        n_pages = analysis_result.n_pages(page_size)
+        page_no = page_cols[1].number_input(
+            "페이지", min_value=1, max_value=n_pages, value=1, step=1, key="result_page"
+        )
+        start_rank = (page_no - 1) * page_size + 1
+        end_rank = min(page_no * page_size, len(analysis_result))
+        page_cols[2].caption(f"전체 {len(analysis_result):,}개 제품 중 {start_rank:,} ~ {end_rank:,}위 ({page_no}/{n_pages} 페이지)")
+
+        # [v4.13] 표시할 때만 넓은 DataFrame으로 펼침 ([v4.20] 현재 페이지만)
+        final_df = analysis_result.page(page_no - 1, page_size)
+        final_df.insert(0, '순위', range(start_rank, start_rank + len(final_df)))
+        
+        # --- [v4.9.3 수정] ---
+        # (1) 'Blackbox' 없는 '이름 변경' (v4.9.2 확장)
+        final_df = final_df.rename(columns={
+            'SWAN_SCORE_V2': '영양제점수',
+            'product_name': '제품명',
+            'price': '가격',
+            'MARKET_SCORE': 'MarketScore'
+            # '브랜드'는 엔진(v4.9.3)에서 '브랜드'로 '추가'됨
+        })
+        
+        # (2) 사장님이 요청하신 "원하는 순서" ('그 외' 포함)
+        desired_order = [
+            '순위',
+            '브랜드', 
+            '제품명', 
+            '영양제점수', 
+            '가격', 
+            'MarketScore'
+        ]
+        
+        # (3) '그 외' 컬럼 '자동' 추가 (순서 유지)
+        existing_cols = [col for col in desired_order if col in final_df.columns]
+        other_cols = [col for col in final_df.columns if col not in existing_cols]
+        final_display_cols = existing_cols + other_cols
+        # --- [v4.9.3 수정 완료] ---
+
+        st.dataframe(final_df[final_display_cols].style.format(precision=2), hide_index=True)
+        show_score_history(analysis_result, stored_result[2])
+
 
 # ---
 # [TAB 2] v4.8 'A/B 테스팅' 델타 분석기 (v4.8.1 버그 수정)
@@ -543,26 +786,31 @@ with tab2:
     """)
 
     # --- [v2.7] 델타 분석기용 데이터 준비 ---
-    @st.cache_data
-    def prepare_delta_data(_raw_df, _rules):
+    @st.cache_resource(max_entries=4, show_spinner=False)
+    def prepare_delta_data(_raw_df, dataset_key, delta_key, _rules, _lineage):
         """
         전처리(agg_df) 및 Market Score 계산을 수행하여 델타 분석용 DF를 반환.
         [v3.1] 룰북의 모든 '발견된' 성분/함량 데이터를 agg_df에 포함 (엔진 수정됨)
+        [v4.13] (delta_df, IngredientStore) 반환 - 성분 함량은 store에 컴팩트하게 보관.
+        [v4.18] 캐시 키 = dataset_key + delta_key ('_raw_df', '_rules'는 해시하지 않음)
+        [v4.23] cache_resource (세션 간 복사 없이 공유 - 읽기 전용)
         """
         try:
-            # 1. 전처리 (v2.6) - [v3.1] 엔진(v4.9.3)이 모든 성분 함량+브랜드 추출
-            agg_df = core_engine.preprocess_data_v2_6(_raw_df.copy(), _rules)
+            # 1. 전처리 (v2.8 컴팩트) - [v3.1] 엔진이 모든 성분 함량+브랜드 추출 ([Tab 1]과 캐시 공유)
+            agg_df, store = get_preprocessed_data(
+                _raw_df, dataset_key, core_engine.preprocess_cache_key(_rules), _rules, _lineage
+            )
             # 2. 마켓 스코어 계산 (v2.7)
             market_scores = core_engine.calculate_market_score_v2(agg_df, _rules['market_score_weights'])
-            agg_df['MARKET_SCORE'] = market_scores
-            return agg_df
+            agg_df = agg_df.assign(MARKET_SCORE=market_scores)
+            return agg_df, store
         except Exception as e:
             st.error(f"델타 데이터 준비 중 오류: {e}")
-            return None
+            return None, None
 
-    # 룰북을 문자열로 변환하여 캐시 키로 사용 (룰북이 바뀌면 재실행됨)
-    rulebook_str = str(rb) 
-    delta_df = prepare_delta_data(raw_df, rb)
+    delta_df, delta_store = prepare_delta_data(
+        raw_df, dataset_key, core_engine.delta_cache_key(rb), rb, dataset_lineage
+    )
 
     # --- [v3.1.2] 오류 수정 로직 ---
     if delta_df is None:
@@ -579,7 +827,7 @@ with tab2:
         with cols[0]:
             st.markdown("#### [A 그룹] '비교' 그룹 ")
             with st.container(border=True):
-                filters_A = create_filter_box('v4_filters_A', _discovered_rules, delta_df)
+                filters_A = create_filter_box('v4_filters_A', _discovered_rules, delta_df, delta_store)
             
         with cols[1]:
             st.markdown("#### [B 그룹] '대조' 그룹 ")
@@ -592,7 +840,7 @@ with tab2:
                 )
                 
                 if b_choice == "A그룹 vs '다른 필터'":
-                    filters_B = create_filter_box('v4_filters_B', _discovered_rules, delta_df)
+                    filters_B = create_filter_box('v4_filters_B', _discovered_rules, delta_df, delta_store)
                 else:
                     filters_B = None # '그외 제품' 선택
 
@@ -600,25 +848,28 @@ with tab2:
         st.header(f"🔬 A/B 그룹 분석결과")
         
         # --- [v4.5] A/B 그룹 데이터 정의 ---
-        status_col_name = "비교 그룹"
+        # [v4.12] 특수태그 필터용 포함 행렬 (데이터셋당 1회)
+        # [v4.19] 성분 / 태그 / 텍스트 필터 인덱스 (데이터셋당 1회, 필터 변경 시에는 마스크 계산만)
+        filter_index = get_filter_index(
+            delta_df, delta_store, dataset_key, core_engine.preprocess_cache_key(rb),
+            tuple(_discovered_rules['tags']), tuple(_discovered_rules['text_cols'])
+        )
         
-        df_A = apply_filters(delta_df, filters_A)
-        df_A[status_col_name] = "그룹 A"
+        df_A, mask_A = apply_filters(delta_df, filters_A, filter_index)
         
         if filters_B is not None:
             # "A그룹 vs '다른 필터'"
-            df_B = apply_filters(delta_df, filters_B)
-            df_B[status_col_name] = "그룹 B"
+            label_B = "그룹 B"
+            df_B, mask_B = apply_filters(delta_df, filters_B, filter_index)
         else:
             # "A그룹 외 '그외 제품'"
-            # (A그룹의 인덱스를 '전체' delta_df에서 제외)
-            df_B = delta_df.drop(df_A.index) 
-            df_B[status_col_name] = "그룹 B (그 외)"
+            # (A그룹 마스크의 반전)
+            label_B = "그룹 B (그 외)"
+            mask_B = ~mask_A
+            df_B = delta_df[mask_B]
         
-        # '1축 2그림'을 위한 데이터 합치기
-        combined_df = pd.concat([df_A, df_B])
-
         # --- [v4.5 신규] C. '1축 2그림' (Strip Plot) ---
+        # [v4.21] 두 그룹을 합치지 않고 그룹별로 그림 (큰 그룹은 WebGL 표본 점 + 전체 분위수 박스)
         st.subheader("📈")
         
         # "보유(파랑)/미보유(빨강)" -> A(파랑)/B(빨강)
@@ -627,34 +878,40 @@ with tab2:
             "그룹 B": "red", 
             "그룹 B (그 외)": "red"
         }
+        chart_keys = get_chart_sample_keys(
+            delta_df['product_name'], dataset_key, core_engine.preprocess_cache_key(rb)
+        )
+        chart_groups = [
+            (label, group_df, chart_keys[group_mask])
+            for label, group_df, group_mask in (
+                ("그룹 A", df_A, mask_A), (label_B, df_B, mask_B)
+            )
+        ]
+        chart_mode = st.radio(
+            "차트 표시:", CHART_MODES, key="chart_mode", horizontal=True,
+            help=f"자동: 그룹당 {chart_data_v2.CHART_POINT_LIMIT:,}개 이하면 모든 점, 넘으면 표본 점 + 전체 분포 박스"
+        )
         
         chart_cols = st.columns(2)
         
-        with chart_cols[0]:
-            st.markdown("**그림 1: 💲 가격 분포**")
-            fig1 = px.strip( # 'Box' -> 'Strip' ("점만 찍기")
-                combined_df, 
-                x=status_col_name, 
-                y='price', 
-                color=status_col_name, # 색상 적용
-                color_discrete_map=color_map, # "파랑/빨강" 적용
-                title="가격(Y) vs A/B 그룹(X)",
-                hover_data=['product_name']
-            )
-            st.plotly_chart(fig1, use_container_width=True)
-
-        with chart_cols[1]:
-            st.markdown("**그림 2: 📈 시장 반응 분포**")
-            fig2 = px.strip( # 'Box' -> 'Strip' ("점만 찍기")
-                combined_df, 
-                x=status_col_name, 
-                y='MARKET_SCORE', 
-                color=status_col_name, # 색상 적용
-                color_discrete_map=color_map, # "파랑/빨강" 적용
-                title="시장반응(Y) vs A/B 그룹(X)",
-                hover_data=['product_name']
-            )
-            st.plotly_chart(fig2, use_container_width=True)
+        for chart_col, (value_col, figure_title, y_title) in zip(chart_cols, (
+            ('price', "**그림 1: 💲 가격 분포**", "가격(Y) vs A/B 그룹(X)"),
+            ('MARKET_SCORE', "**그림 2: 📈 시장 반응 분포**", "시장반응(Y) vs A/B 그룹(X)"),
+        )):
+            with chart_col:
+                st.markdown(figure_title)
+                bounds = chart_data_v2.value_bounds(*[group_df[value_col] for _, group_df, _ in chart_groups])
+                value_range = None
+                if bounds is not None and bounds[0] < bounds[1]:
+                    # (확대) 범위를 좁히면 그 안의 점은 (한도 이내일 때) 전부 정확히 표시
+                    value_range = st.slider(
+                        "Y축 범위 (확대)", min_value=bounds[0], max_value=bounds[1],
+                        value=bounds, key=f"chart_range_{value_col}"
+                    )
+                    if value_range == bounds:
+                        value_range = None
+                fig = build_distribution_figure(chart_groups, value_col, color_map, y_title, chart_mode, value_range)
+                st.plotly_chart(fig, use_container_width=True)
         
         # --- [v4.9.3] D. 원본 제품 목록 ('쭈르륵') (v4.9 '동적 컬럼' 적용) ---
         st.subheader("📋 목록")
@@ -689,12 +946,15 @@ with tab2:
             st.markdown(f"**[A] '비교' 그룹 제품 (n={len(df_A)})**")
             # [v4.9] 'display_cols' -> 'cols_A' (동적 컬럼)
             # (존재하지 않는 컬럼명 오류 방지를 위해, 실제 DF에 있는 컬럼만 필터링)
-            valid_cols_A = [col for col in cols_A if col in df_A.columns]
-            st.dataframe(df_A[valid_cols_A].sort_values(by='MARKET_SCORE', ascending=False).style.format(precision=1))
+            # [v4.13] 필터에 쓰인 성분 함량은 store에서 A그룹 행만큼만 꺼내 붙임
+            df_A_view = with_component_columns(df_A, delta_df, delta_store, cols_A)
+            valid_cols_A = [col for col in cols_A if col in df_A_view.columns]
+            st.dataframe(df_A_view[valid_cols_A].sort_values(by='MARKET_SCORE', ascending=False).style.format(precision=1))
             
         with list_cols[1]:
             st.markdown(f"**[B] '대조' 그룹 제품 (n={len(df_B)})**")
             # [v4.9] 'display_cols' -> 'cols_B' (동적 컬럼)
-            valid_cols_B = [col for col in cols_B if col in df_B.columns]
-            st.dataframe(df_B[valid_cols_B].sort_values(by='MARKET_SCORE', ascending=False).style.format(precision=1))
+            df_B_view = with_component_columns(df_B, delta_df, delta_store, cols_B)
+            valid_cols_B = [col for col in cols_B if col in df_B_view.columns]
+            st.dataframe(df_B_view[valid_cols_B].sort_values(by='MARKET_SCORE', ascending=False).style.format(precision=1))
     # --- [v3.1.2] 오류 수정 'else' 블록 끝 ---
\ No newline at end of file
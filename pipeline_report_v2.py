@@ -0,0 +1,145 @@
+"""
+Project Swan's Eye v2.8.20 - Pipeline Report (단계별 시간 / 행 수 / 최대 메모리 + 선택적 cProfile)
+- v2.8.20: 분석 파이프라인 단계별 성능 기록.
+    - 'stage(이름)' 구간마다: 경과 시간(perf_counter), 입력 / 출력 행 수, 구간 최대 메모리 (tracemalloc, 구간 시작 대비 증가분)
+    - 'run()' 구간 전체: 총 시간, (profile_dir를 주면) cProfile 결과를 .prof 파일로 저장
+      (snakeviz / 'python -m pstats'로 열기)
+    - 결과는 'to_dict()' (JSON 저장 / 앱 표시) 또는 'to_frame()'
+    - 'stage'는 중첩하지 않음 (tracemalloc 피크를 구간마다 초기화하므로)
+- v2.8.21: 단계 출력 메모리 'output_mb' ('memory_mb': DataFrame은 문자열 포함, 저장소는 nbytes).
+- v2.8.24: tracemalloc은 프로세스 전체에 하나뿐이므로 메모리 측정은 한 번에 한 리포트만.
+    - 'run()'이 모듈 잠금을 잡고 tracemalloc을 직접 시작한 경우에만 'peak_mb' 기록
+      (다른 리포트가 측정 중이거나 바깥에서 이미 켜 두었으면 이 리포트의 'peak_mb'는 None - 시간 / 행 수는 그대로)
+    - 한계: 측정 중에도 같은 프로세스의 다른 스레드(앱의 다른 세션) 할당이 피크에 섞일 수 있음
+"""
+
+import cProfile
+import contextlib
+import os
+import threading
+import time
+import tracemalloc
+import pandas as pd
+
+MB = 1024 * 1024
+
+# tracemalloc 소유권 (프로세스에서 한 번에 한 리포트만 시작 / 피크 초기화 / 종료)
+_TRACE_LOCK = threading.Lock()
+
+
+class PipelineReport:
+    """
+    분석 1회의 단계별 기록.
+    :param trace_memory: 구간 최대 메모리 측정 (tracemalloc - 켜면 파이썬 객체가 많은 단계가 느려짐,
+        다른 리포트가 측정 중이면 이번 실행은 측정하지 않음)
+    :param profile_dir: 지정하면 'run()' 구간 전체를 cProfile로 기록하여 이 폴더에 저장
+    """
+
+    def __init__(self, trace_memory=True, profile_dir=None):
+        self.trace_memory = trace_memory
+        self.profile_dir = profile_dir
+        self.stages = [] # [{'stage', 'seconds', 'rows_in', 'rows_out', 'peak_mb'}]
+        self.total_seconds = None
+        self.profile_path = None
+        self._tracing = False # 이 리포트가 tracemalloc을 시작했는지 ('run()' 구간 동안)
+
+    @contextlib.contextmanager
+    def run(self, label='analysis'):
+        """ 분석 1회 전체 구간 (tracemalloc / cProfile 시작 - 종료) """
+        locked = self.trace_memory and _TRACE_LOCK.acquire(blocking=False)
+        if locked and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+        profiler = None
+        if self.profile_dir:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.total_seconds = time.perf_counter() - start
+            if profiler is not None:
+                profiler.disable()
+                os.makedirs(self.profile_dir, exist_ok=True)
+                self.profile_path = os.path.join(
+                    self.profile_dir, f"{label}_{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}.prof"
+                )
+                profiler.dump_stats(self.profile_path)
+            if self._tracing:
+                tracemalloc.stop()
+                self._tracing = False
+            if locked:
+                _TRACE_LOCK.release()
+
+    @contextlib.contextmanager
+    def stage(self, name, rows_in=None):
+        """
+        단계 하나. 블록 안에서 돌려받은 dict에 'rows_out' / 'output_mb'('memory_mb')를 채우면 출력 행 수 / 크기로 기록.
+        (이 리포트가 tracemalloc을 시작하지 않았으면 - 'run()' 밖 / 다른 리포트가 측정 중 - 메모리는 None)
+        """
+        record = {
+            'stage': name, 'seconds': None, 'rows_in': rows_in, 'rows_out': None, 'peak_mb': None, 'output_mb': None
+        }
+        tracing = self._tracing
+        if tracing:
+            tracemalloc.reset_peak()
+            base_bytes, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['seconds'] = time.perf_counter() - start
+            if tracing:
+                _, peak_bytes = tracemalloc.get_traced_memory()
+                record['peak_mb'] = max(peak_bytes - base_bytes, 0) / MB
+            self.stages.append(record)
+
+    def to_dict(self):
+        return {
+            'total_seconds': self.total_seconds,
+            'profile_path': self.profile_path,
+            'stages': [dict(record) for record in self.stages],
+        }
+
+    def to_frame(self):
+        """ 단계별 표 (+ 전체 시간 대비 비율) """
+        frame = pd.DataFrame(
+            self.stages, columns=['stage', 'seconds', 'rows_in', 'rows_out', 'peak_mb', 'output_mb']
+        )
+        if self.total_seconds:
+            frame['share'] = frame['seconds'] / self.total_seconds
+        return frame
+
+    def __repr__(self):
+        return f"PipelineReport(stages={len(self.stages)}, total_seconds={self.total_seconds!r})"
+
+
+def memory_mb(*objects):
+    """
+    결과 객체들의 메모리 (MB): DataFrame / Series는 문자열까지 포함(deep), 그 외는 'nbytes'
+    (IngredientStore, AnalysisResult, numpy 배열), tuple / list는 항목 합계.
+    """
+    total = 0
+    for obj in objects:
+        if isinstance(obj, (pd.DataFrame, pd.Series)):
+            usage = obj.memory_usage(deep=True)
+            total += int(usage.sum()) if isinstance(obj, pd.DataFrame) else int(usage)
+        elif isinstance(obj, (tuple, list)):
+            total += memory_mb(*obj) * MB
+        else:
+            total += getattr(obj, 'nbytes', 0)
+    return total / MB
+
+
+def report_stage(report, name, rows_in=None):
+    """ report가 None이면 아무것도 기록하지 않는 구간 (파이프라인 함수에서 'with report_stage(...)'로 사용) """
+    if report is None:
+        return contextlib.nullcontext({})
+    return report.stage(name, rows_in)
+
+
+def report_run(report, label='analysis'):
+    if report is None:
+        return contextlib.nullcontext(None)
+    return report.run(label)
@@ -0,0 +1,259 @@
+"""
+Project Swan's Eye v2.8.22 - Rulebook Snapshot (불변 룰북 스냅샷 + 내용 다이제스트 + 파라미터 배열)
+- v2.8.22: 앱 [Tab 1]이 실행마다 'copy.deepcopy(세션 룰북)' 하던 것을 대체.
+    - 'RulebookSnapshot.from_dict(룰북, previous)': 중첩 dict -> 수정 불가 'FrozenDict' (list는 tuple)
+      이전 스냅샷과 내용이 같은 부분은 이전 객체를 그대로 재사용 (구조 공유 - 바뀐 경로만 새로 만듦)
+    - 'digest': 내용 다이제스트 (sha256). 하위 다이제스트를 재사용하므로 바뀐 경로만 다시 해시 -> 점수 캐시 키
+    - 검증 / 컴파일은 새로 만든 섹션만 1회:
+        성분 룰 -> 활성화 마스크 + 파라미터 배열 ('component_params')
+        태그 룰 -> 점수 벡터 ('tag_score_vector')
+    - FrozenDict는 dict 하위 클래스 (엔진 / json.dumps / st.json에 그대로 전달 가능)
+"""
+
+import hashlib
+import json
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+
+# 룰북에 반드시 있어야 하는 최상위 키 (앱 기본 룰북 기준)
+REQUIRED_RULEBOOK_KEYS = (
+    'columns', 'final_weights', 'score_a_main_components', 'score_b_price',
+    'score_c_sub_components', 'score_c_tags', 'market_score_weights'
+)
+
+# S-Curve 성분 룰의 파라미터 (순서 고정: 증분/배치 엔진의 캐시 키로도 사용)
+COMPONENT_PARAM_KEYS = ('min_dose', 'rec_dose', 'rec_score', 'saturation_factor', 'weight')
+
+# S-Curve 성분 룰 섹션 (Score A / C-1)
+COMPONENT_SECTIONS = ('score_a_main_components', 'score_c_sub_components')
+
+_MISSING = object()
+
+
+def _sha256(payload):
+    encoded = json.dumps(payload, ensure_ascii=False, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def _token(value):
+    """ 다이제스트 입력: 하위 FrozenDict / tuple은 [그 다이제스트] (스칼라와 겹치지 않게 list로 감쌈), 스칼라는 그대로 """
+    if isinstance(value, FrozenDict):
+        return [value.digest]
+    if isinstance(value, tuple):
+        return [_sha256([_token(item) for item in value])]
+    return value
+
+
+class FrozenDict(dict):
+    """
+    수정할 수 없는 dict (해시 가능, 값도 모두 불변: FrozenDict / tuple / 스칼라).
+    - 'digest': 내용 다이제스트 (처음 조회할 때 계산 후 보관, 키 순서 포함 - 성분 순서가 결과 컬럼 순서)
+    - '_memo': 파생 값 (컴파일 결과) 보관 -> 구조 공유된 섹션은 다음 스냅샷에서도 재사용
+    """
+
+    __slots__ = ('_digest', '_memo')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._digest = None
+        self._memo = {}
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("룰북 스냅샷은 수정할 수 없습니다. ('RulebookSnapshot.from_dict'로 새 스냅샷 생성)")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    @property
+    def digest(self):
+        if self._digest is None:
+            self._digest = _sha256([[key, _token(value)] for key, value in self.items()])
+        return self._digest
+
+    def __hash__(self):
+        return hash(self.digest)
+
+    def __eq__(self, other):
+        if isinstance(other, FrozenDict):
+            return self is other or self.digest == other.digest
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    # 불변이므로 복사는 자기 자신, pickle은 dict 내용으로 다시 생성
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (type(self), (dict(self),))
+
+    def thaw(self):
+        """ 수정 가능한 일반 dict (중첩 포함) """
+        return {key: _thaw(value) for key, value in self.items()}
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict.__repr__(self)})"
+
+
+def _thaw(value):
+    if isinstance(value, FrozenDict):
+        return value.thaw()
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+def _same_key_order(frozen, value):
+    """ 키 순서까지 같은지 (dict 비교는 순서를 보지 않음, 하위 FrozenDict 키 목록은 1회 계산 후 보관) """
+    if list(frozen) != list(value):
+        return False
+    nested = _memoized(
+        frozen, 'nested_keys', lambda: tuple(key for key, child in frozen.items() if isinstance(child, FrozenDict))
+    )
+    return all(_same_key_order(frozen[key], value[key]) for key in nested)
+
+
+def freeze(value, previous=_MISSING):
+    """
+    중첩 dict / list -> FrozenDict / tuple.
+    previous(이전 스냅샷의 같은 위치)와 내용이 같으면(==, 키 순서 포함) previous 객체를 그대로 반환 (구조 공유).
+    """
+    if isinstance(value, FrozenDict):
+        return value
+    if isinstance(value, dict):
+        prev = previous if isinstance(previous, FrozenDict) else None
+        # 통째로 같으면 (값 비교는 C 수준 dict 비교 한 번) 하위를 순회하지 않고 공유
+        if prev is not None and dict.__eq__(prev, value) and _same_key_order(prev, value):
+            return prev
+        same = prev is not None and len(prev) == len(value)
+        prev_keys = iter(prev) if same else None
+        items = {}
+        for key, child in value.items():
+            prev_child = prev.get(key, _MISSING) if prev is not None else _MISSING
+            items[key] = frozen = freeze(child, prev_child)
+            # (같은 키 순서 + 모든 값이 이전 객체 그대로일 때만 공유)
+            same = same and frozen is prev_child and next(prev_keys) == key
+        return prev if same else FrozenDict(items)
+    if isinstance(value, (list, tuple)):
+        prev = previous if isinstance(previous, tuple) and len(previous) == len(value) else None
+        items = tuple(
+            freeze(item, _MISSING if prev is None else prev[i]) for i, item in enumerate(value)
+        )
+        if prev is not None and all(item is prev_item for item, prev_item in zip(items, prev)):
+            return prev
+        return items
+    if previous is not _MISSING and type(previous) is type(value) and previous == value:
+        return previous
+    return value
+
+
+# ---
+# 섹션 컴파일 (FrozenDict면 결과를 '_memo'에 보관, 일반 dict면 매번 계산)
+# ---
+
+ComponentParams = namedtuple('ComponentParams', ['names', 'enabled', 'params', 'signature'])
+ComponentParams.__doc__ = """
+성분 룰 섹션 컴파일 결과 (활성화된 성분만, 룰 순서).
+- names: 활성화된 성분명, enabled: 전체 성분 기준 활성화 마스크
+- params: { 파라미터 키: float 배열 } (읽기 전용)
+- signature: ((성분명, 파라미터 튜플), ...) - 같으면 점수도 같음 (증분 / 배치 엔진의 캐시 키)
+"""
+
+
+def _memoized(section, name, compute):
+    memo = getattr(section, '_memo', None)
+    if memo is None:
+        return compute()
+    if name not in memo:
+        memo[name] = compute()
+    return memo[name]
+
+
+def _readonly_array(values):
+    array = np.array(values, dtype=float)
+    array.flags.writeable = False
+    return array
+
+
+def component_params(rules_dict):
+    """ 성분 룰 섹션('score_a_main_components' 등) -> 'ComponentParams' """
+    def compute():
+        rules = rules_dict['rules']
+        enabled = np.array([bool(rule.get('enabled', False)) for rule in rules.values()], dtype=bool)
+        signature = tuple(
+            (comp_name, tuple(float(rule[key]) for key in COMPONENT_PARAM_KEYS))
+            for (comp_name, rule), is_enabled in zip(rules.items(), enabled) if is_enabled
+        )
+        params = {
+            key: _readonly_array([values[i] for _, values in signature])
+            for i, key in enumerate(COMPONENT_PARAM_KEYS)
+        }
+        enabled.flags.writeable = False
+        return ComponentParams(tuple(name for name, _ in signature), enabled, params, signature)
+
+    return _memoized(rules_dict, 'component_params', compute)
+
+
+def tag_score_vector(tag_rules):
+    """
+    태그 룰 ({ 태그명: 점수 }) -> (태그명 튜플, 점수 배열).
+    (태그명이 NaN이거나 점수가 0인 태그는 v2.6처럼 제외)
+    """
+    def compute():
+        scored = [
+            (tag_name, float(tag_score)) for tag_name, tag_score in tag_rules.items()
+            if not (pd.isna(tag_name) or tag_score == 0)
+        ]
+        return tuple(tag_name for tag_name, _ in scored), _readonly_array([score for _, score in scored])
+
+    return _memoized(tag_rules, 'tag_score_vector', compute)
+
+
+# ---
+# 룰북 스냅샷
+# ---
+
+class RulebookSnapshot(FrozenDict):
+    """
+    검증 / 컴파일이 끝난 불변 룰북 (엔진 함수에 dict 대신 그대로 전달).
+    'digest'가 같으면 점수도 같음 -> 점수 결과 캐시 키로 사용.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_dict(cls, rulebook, previous=None):
+        """
+        룰북 dict -> 스냅샷 (바뀐 곳이 없으면 previous 자체를 반환).
+        :param previous: 직전 스냅샷 (같은 섹션 / 성분 룰은 그 객체와 컴파일 결과를 재사용)
+        :raises ValueError: 필수 항목 누락, 성분 파라미터 / 태그 점수가 숫자가 아님
+        """
+        if isinstance(rulebook, cls):
+            return rulebook
+        frozen = freeze(rulebook, _MISSING if previous is None else previous)
+        if frozen is previous:
+            return previous
+        missing = [key for key in REQUIRED_RULEBOOK_KEYS if key not in frozen]
+        if missing:
+            raise ValueError(f"룰북에 필수 항목이 없습니다: {', '.join(missing)}")
+        snapshot = cls(frozen)
+        # 검증 = 컴파일 (공유된 섹션은 이전 결과 재사용 -> 새로 바뀐 섹션만 1회)
+        for section in COMPONENT_SECTIONS:
+            try:
+                component_params(snapshot[section])
+            except (KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"'{section}' 성분 룰 오류: {e!r}") from e
+        try:
+            tag_score_vector(snapshot['score_c_tags']['rules'])
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"'score_c_tags' 태그 룰 오류: {e!r}") from e
+        return snapshot
+
+    def to_dict(self):
+        """ 수정 / JSON 저장용 일반 dict """
+        return self.thaw()
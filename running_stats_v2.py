@@ -0,0 +1,102 @@
+"""
+Project Swan's Eye v2.8.10 - Running Statistics (병합 가능한 Z-Score 통계)
+- v2.8.10: 가격 / 리뷰 수 / 별점 Z-Score용 '병합 가능한' 누적 통계 (count / mean / M2, Welford-Chan 방식).
+    - 파티션(청크, 샤드, 프로세스)마다 통계를 모으고 -> 합치고 -> 전역 통계로 각 파티션을 점수화.
+    - 'core_engine.calculate_z_scores'(scipy zscore, 모표준편차 ddof=0)와 같은 값
+      (파티션 하나면 비트 단위로 동일, 여러 개면 부동소수 반올림 차이만).
+    - 유효값이 전부 같으면 (표준편차 0) Z = 0, NaN -> 0 처리도 동일.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class RunningStats:
+    """
+    한 컬럼의 누적 통계 (NaN 제외).
+    - count: 유효값 개수
+    - mean: 평균
+    - m2: 편차 제곱합 (분산 = m2 / count)
+    - min / max: 유효값이 '전부 같은지' 판정용 (반올림 오차로 m2가 0이 아니어도 정확히 판정)
+    """
+
+    def __init__(self, count=0, mean=0.0, m2=0.0, min_value=np.inf, max_value=-np.inf):
+        self.count = int(count)
+        self.mean = float(mean)
+        self.m2 = float(m2)
+        self.min = float(min_value)
+        self.max = float(max_value)
+
+    @classmethod
+    def from_values(cls, values):
+        """ 파티션 하나의 통계 (2-pass: scipy zscore와 같은 평균 / 편차 제곱합) """
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return cls()
+        mean = values.mean()
+        m2 = np.sum(np.abs(values - mean) ** 2)
+        return cls(len(values), mean, m2, values.min(), values.max())
+
+    def merge(self, other):
+        """ 두 파티션 통계를 합친 '새' 통계 (Chan et al. 병합 공식) """
+        if other.count == 0:
+            return RunningStats(self.count, self.mean, self.m2, self.min, self.max)
+        if self.count == 0:
+            return RunningStats(other.count, other.mean, other.m2, other.min, other.max)
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        mean = self.mean + delta * (other.count / count)
+        m2 = self.m2 + other.m2 + delta * delta * (self.count * other.count / count)
+        return RunningStats(count, mean, m2, min(self.min, other.min), max(self.max, other.max))
+
+    def update(self, values):
+        """ 값 묶음을 누적 (제자리 갱신, self 반환) """
+        merged = self.merge(RunningStats.from_values(values))
+        self.count, self.mean, self.m2 = merged.count, merged.mean, merged.m2
+        self.min, self.max = merged.min, merged.max
+        return self
+
+    @classmethod
+    def merge_all(cls, stats_list):
+        merged = cls()
+        for stats in stats_list:
+            merged = merged.merge(stats)
+        return merged
+
+    @property
+    def is_constant(self):
+        """ 유효값이 0~1개이거나 전부 같음 (v1.4 'std() == 0' 분기) """
+        return self.count <= 1 or self.min == self.max
+
+    @property
+    def std(self):
+        """ 모표준편차 (ddof=0, scipy zscore 기준) """
+        if self.count == 0:
+            return np.nan
+        return float(np.sqrt(self.m2 / self.count))
+
+    def z_scores(self, series, direction='higher_is_better'):
+        """
+        이 (전역) 통계로 파티션의 Z-Score ('calculate_z_scores'와 같은 규칙).
+        NaN -> 0, 표준편차 0 -> 0, 'lower_is_better'면 부호 반전.
+        """
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        if self.count == 0 or self.is_constant:
+            z = np.zeros(len(values))
+        else:
+            z = (values - self.mean) / self.std
+            z = np.where(np.isnan(values), 0.0, z)
+        if direction == 'lower_is_better':
+            z = -z
+        return pd.Series(z, index=series.index, dtype=float)
+
+    def to_dict(self):
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2, 'min': self.min, 'max': self.max}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['count'], data['mean'], data['m2'], data['min'], data['max'])
+
+    def __repr__(self):
+        return f"RunningStats(count={self.count}, mean={self.mean!r}, std={self.std!r})"
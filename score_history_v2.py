@@ -0,0 +1,317 @@
+"""
+Project Swan's Eye v2.8.24 - Score History (스코어링 결과 누적 기록 + 순위 변동 / 시계열 조회)
+- v2.8.24: 분석 결과(순위 / 점수)를 날짜별 스냅샷으로 로컬 SQLite 파일에 추가만 하는(append-only) 기록.
+    - 스냅샷 = (날짜, 룰북 digest, 설명) + 제품별 (순위, SWAN / A / B / C / Market 점수)
+      룰북 digest는 'rulebook_v2.RulebookSnapshot.digest' (같은 룰북끼리 비교했는지 확인용)
+    - 저장 / 조회 모두 SQL 인덱스로 필요한 행만 읽음 (스냅샷 전체를 메모리에 올리지 않음)
+        점수: (snapshot_id, product_id) 클러스터드 기본 키 -> 스냅샷 하나가 연속된 구간 (날짜 파티션 역할)
+        제품: 제품명 -> product_id (한 번만 저장), (product_id, snapshot_id) 인덱스 -> 제품 시계열
+    - 'rank_movers(이전, 이후, min_move)': 두 스냅샷 사이 순위가 min_move 이상 바뀐 제품
+    - 'time_series(제품명)': 한 제품의 스냅샷별 순위 / 점수
+    - 기록은 수정 / 삭제 불가 (트리거로 막음)
+    - 표준 라이브러리 sqlite3만 사용 (pyarrow 없이 동작, 파일 하나라 백업 / 복사가 쉬움)
+
+사용 예)
+    python swan_cli_v2.py export.csv --rulebook rulebook.json --output ranked.csv --history history.sqlite
+    python score_history_v2.py history.sqlite snapshots
+    python score_history_v2.py history.sqlite movers 2026-10-10 2026-10-17 --min-move 50
+    python score_history_v2.py history.sqlite series 제품0000123
+"""
+
+import argparse
+import datetime
+import os
+import sqlite3
+import sys
+import numpy as np
+import pandas as pd
+import rulebook_v2
+
+# 기록하는 점수 컬럼 (엔진 컬럼명 -> 기록 컬럼명)
+HISTORY_SCORE_COLUMNS = {
+    'SWAN_SCORE_V2': 'swan_score',
+    'SCORE_A (핵심성분)': 'score_a',
+    'SCORE_B (가격)': 'score_b',
+    'SCORE_C (보조/태그)': 'score_c',
+    'MARKET_SCORE': 'market_score',
+}
+
+# 기본 기록 파일 (환경 변수로 변경 가능, 디스크 캐시 폴더와 달리 자동 정리되지 않는 위치)
+DEFAULT_HISTORY_PATH = os.environ.get(
+    'SWAN_HISTORY_PATH',
+    os.path.join(os.path.expanduser('~'), '.local', 'share', 'swans_eye', 'score_history.sqlite')
+)
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS snapshots (
+    snapshot_id INTEGER PRIMARY KEY,
+    snapshot_date TEXT NOT NULL,
+    rulebook_digest TEXT,
+    label TEXT,
+    products INTEGER NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS snapshots_by_date ON snapshots (snapshot_date, snapshot_id);
+CREATE TABLE IF NOT EXISTS products (
+    product_id INTEGER PRIMARY KEY,
+    product_name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS scores (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots (snapshot_id),
+    product_id INTEGER NOT NULL REFERENCES products (product_id),
+    rank INTEGER NOT NULL,
+    {', '.join(f'{name} REAL' for name in HISTORY_SCORE_COLUMNS.values())},
+    PRIMARY KEY (snapshot_id, product_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS scores_by_product ON scores (product_id, snapshot_id);
+CREATE TRIGGER IF NOT EXISTS scores_append_only_update BEFORE UPDATE ON scores
+BEGIN SELECT RAISE(ABORT, 'score history is append-only'); END;
+CREATE TRIGGER IF NOT EXISTS scores_append_only_delete BEFORE DELETE ON scores
+BEGIN SELECT RAISE(ABORT, 'score history is append-only'); END;
+CREATE TRIGGER IF NOT EXISTS snapshots_append_only_update BEFORE UPDATE ON snapshots
+BEGIN SELECT RAISE(ABORT, 'score history is append-only'); END;
+CREATE TRIGGER IF NOT EXISTS snapshots_append_only_delete BEFORE DELETE ON snapshots
+BEGIN SELECT RAISE(ABORT, 'score history is append-only'); END;
+PRAGMA user_version = {SCHEMA_VERSION};
+"""
+
+
+def ranked_scores(result):
+    """
+    분석 결과 -> (제품명 배열, 순위 배열, { 기록 컬럼명: 점수 배열 }).
+    - 'core_engine.AnalysisResult': 'order' 기준 순위 (펼치지 않음)
+    - DataFrame ('run_full_analysis_v2_6' / CLI 결과): 'RANK' 컬럼이 있으면 그대로, 없으면 행 순서가 순위
+      (제품명은 'product_name' 컬럼, 없으면 인덱스)
+    """
+    if isinstance(result, pd.DataFrame):
+        table = result
+        ranks = (
+            table['RANK'].to_numpy(dtype=np.int64) if 'RANK' in table.columns
+            else np.arange(1, len(table) + 1, dtype=np.int64)
+        )
+    else:
+        table = result.table
+        ranks = np.empty(len(table), dtype=np.int64)
+        ranks[result.order] = np.arange(1, len(table) + 1)
+    names = table['product_name'] if 'product_name' in table.columns else table.index
+    scores = {
+        name: table[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        for col, name in HISTORY_SCORE_COLUMNS.items() if col in table.columns
+    }
+    return np.asarray(names, dtype=object), ranks, scores
+
+
+def rulebook_digest(rulebook):
+    """ 룰북 (dict / 스냅샷 / None) -> 내용 다이제스트 (문자열이면 이미 다이제스트로 보고 그대로) """
+    if rulebook is None or isinstance(rulebook, str):
+        return rulebook
+    return rulebook_v2.RulebookSnapshot.from_dict(rulebook).digest
+
+
+def _as_date(value):
+    """ 날짜 / datetime / 'YYYY-MM-DD' -> 'YYYY-MM-DD' (None이면 오늘) """
+    if value is None:
+        return datetime.date.today().isoformat()
+    if isinstance(value, datetime.datetime):
+        return value.date().isoformat()
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    try:
+        return datetime.date.fromisoformat(str(value)).isoformat()
+    except ValueError as e:
+        raise ValueError(f"날짜 형식이 아닙니다 (YYYY-MM-DD): {value!r}") from e
+
+
+class ScoreHistory:
+    """
+    SQLite 파일 하나의 점수 기록 (없으면 생성).
+    스냅샷 지정('resolve'): snapshot_id(int) 또는 날짜('YYYY-MM-DD' - 그 날짜의 마지막 스냅샷).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute('PRAGMA foreign_keys = ON')
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def append(self, result, snapshot_date=None, rulebook=None, label=None):
+        """
+        분석 결과 하나를 새 스냅샷으로 추가.
+        :param result: 'core_engine.AnalysisResult' 또는 결과 DataFrame ('ranked_scores' 참고)
+        :param rulebook: 결과를 만든 룰북 또는 그 digest (digest만 기록, None이면 비움)
+        :return: snapshot_id
+        """
+        names, ranks, scores = ranked_scores(result)
+        if len(pd.unique(names)) != len(names):
+            raise ValueError("결과에 중복된 제품명이 있어 기록할 수 없습니다.")
+        score_names = list(scores)
+        columns = ['rank'] + score_names
+        rows = zip(
+            names.tolist(), ranks.tolist(),
+            *[np.where(np.isnan(values), None, values).tolist() for values in scores.values()]
+        )
+        with self._conn:
+            cursor = self._conn.execute(
+                'INSERT INTO snapshots (snapshot_date, rulebook_digest, label, products, created_at)'
+                ' VALUES (?, ?, ?, ?, ?)',
+                (
+                    _as_date(snapshot_date), rulebook_digest(rulebook), label, len(names),
+                    datetime.datetime.now().isoformat(timespec='seconds')
+                )
+            )
+            snapshot_id = cursor.lastrowid
+            # 임시 표에 올린 뒤 제품명 -> product_id 조인 (기존 제품 목록을 파이썬으로 읽지 않음)
+            self._conn.execute(
+                f"CREATE TEMP TABLE incoming (product_name TEXT PRIMARY KEY, {', '.join(columns)})"
+            )
+            try:
+                self._conn.executemany(
+                    f"INSERT INTO incoming VALUES ({', '.join('?' * (len(columns) + 1))})", rows
+                )
+                self._conn.execute(
+                    'INSERT OR IGNORE INTO products (product_name) SELECT product_name FROM incoming'
+                )
+                self._conn.execute(
+                    f"INSERT INTO scores (snapshot_id, product_id, {', '.join(columns)})"
+                    f" SELECT ?, p.product_id, {', '.join('i.' + col for col in columns)}"
+                    ' FROM incoming i JOIN products p ON p.product_name = i.product_name',
+                    (snapshot_id,)
+                )
+            finally:
+                self._conn.execute('DROP TABLE temp.incoming')
+        return snapshot_id
+
+    def snapshots(self):
+        """ 스냅샷 목록 (날짜, id 순) """
+        return pd.read_sql_query(
+            'SELECT snapshot_id, snapshot_date, rulebook_digest, label, products, created_at'
+            ' FROM snapshots ORDER BY snapshot_date, snapshot_id',
+            self._conn, index_col='snapshot_id'
+        )
+
+    def resolve(self, snapshot):
+        """ snapshot_id(int) 또는 날짜 -> snapshot_id (없으면 KeyError) """
+        if isinstance(snapshot, (int, np.integer)) and not isinstance(snapshot, bool):
+            row = self._conn.execute(
+                'SELECT snapshot_id FROM snapshots WHERE snapshot_id = ?', (int(snapshot),)
+            ).fetchone()
+        else:
+            row = self._conn.execute(
+                'SELECT snapshot_id FROM snapshots WHERE snapshot_date = ?'
+                ' ORDER BY snapshot_id DESC LIMIT 1', (_as_date(snapshot),)
+            ).fetchone()
+        if row is None:
+            raise KeyError(f"스냅샷이 없습니다: {snapshot!r}")
+        return row[0]
+
+    def rank_movers(self, before, after, min_move=1, limit=None):
+        """
+        두 스냅샷 모두에 있는 제품 중 순위가 min_move 이상 바뀐 제품 (변동 폭이 큰 순, 같으면 이후 순위 순).
+        :return: DataFrame [product_name, rank_before, rank_after, move(+면 상승), swan_score_before, swan_score_after]
+        """
+        before_id, after_id = self.resolve(before), self.resolve(after)
+        query = (
+            'SELECT p.product_name, b.rank AS rank_before, a.rank AS rank_after,'
+            ' b.rank - a.rank AS move, b.swan_score AS swan_score_before, a.swan_score AS swan_score_after'
+            ' FROM scores a'
+            ' JOIN scores b ON b.snapshot_id = ? AND b.product_id = a.product_id'
+            ' JOIN products p ON p.product_id = a.product_id'
+            ' WHERE a.snapshot_id = ? AND abs(b.rank - a.rank) >= ?'
+            ' ORDER BY abs(b.rank - a.rank) DESC, a.rank'
+        )
+        params = [before_id, after_id, int(min_move)]
+        if limit is not None:
+            query += ' LIMIT ?'
+            params.append(int(limit))
+        return pd.read_sql_query(query, self._conn, params=params)
+
+    def time_series(self, product_name, start=None, end=None):
+        """
+        제품 하나의 스냅샷별 순위 / 점수 (날짜 순, start / end는 날짜 범위 - 양끝 포함).
+        :return: DataFrame [snapshot_id, snapshot_date, rulebook_digest, rank, 점수...] (기록이 없으면 빈 표)
+        """
+        query = (
+            'SELECT s.snapshot_id, s.snapshot_date, s.rulebook_digest, c.rank, '
+            + ', '.join(f'c.{name}' for name in HISTORY_SCORE_COLUMNS.values())
+            + ' FROM products p'
+            ' JOIN scores c ON c.product_id = p.product_id'
+            ' JOIN snapshots s ON s.snapshot_id = c.snapshot_id'
+            ' WHERE p.product_name = ?'
+        )
+        params = [product_name]
+        if start is not None:
+            query += ' AND s.snapshot_date >= ?'
+            params.append(_as_date(start))
+        if end is not None:
+            query += ' AND s.snapshot_date <= ?'
+            params.append(_as_date(end))
+        query += ' ORDER BY s.snapshot_date, s.snapshot_id'
+        return pd.read_sql_query(query, self._conn, params=params)
+
+    def __repr__(self):
+        return f"ScoreHistory({self.path!r})"
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Swan's Eye 점수 기록 조회 (스냅샷 / 순위 변동 / 제품 시계열)")
+    parser.add_argument('history', help="기록 파일 경로 (SQLite)")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--output', help="결과 CSV 저장 경로 (없으면 화면 출력)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('snapshots', parents=[common], help="스냅샷 목록")
+    movers = commands.add_parser('movers', parents=[common], help="두 스냅샷 사이 순위 변동")
+    movers.add_argument('before', help="이전 스냅샷 (snapshot_id 또는 YYYY-MM-DD)")
+    movers.add_argument('after', help="이후 스냅샷 (snapshot_id 또는 YYYY-MM-DD)")
+    movers.add_argument('--min-move', type=int, default=1, help="최소 순위 변동 폭")
+    movers.add_argument('--limit', type=int, default=None, help="상위 N개만")
+    series = commands.add_parser('series', parents=[common], help="제품 하나의 순위 / 점수 시계열")
+    series.add_argument('product', help="제품명")
+    series.add_argument('--start', help="시작 날짜 (YYYY-MM-DD)")
+    series.add_argument('--end', help="끝 날짜 (YYYY-MM-DD)")
+    return parser
+
+
+def _snapshot_arg(value):
+    return int(value) if value.isdigit() else value
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if not os.path.exists(args.history):
+        print(f"오류: 기록 파일이 없습니다: {args.history}", file=sys.stderr)
+        return 1
+    try:
+        with ScoreHistory(args.history) as history:
+            if args.command == 'snapshots':
+                frame = history.snapshots().reset_index()
+            elif args.command == 'movers':
+                frame = history.rank_movers(
+                    _snapshot_arg(args.before), _snapshot_arg(args.after), args.min_move, args.limit
+                )
+            else:
+                frame = history.time_series(args.product, args.start, args.end)
+    except (ValueError, KeyError, sqlite3.Error) as e:
+        print(f"오류: {e}", file=sys.stderr)
+        return 1
+    if args.output:
+        frame.to_csv(args.output, index=False, encoding='utf-8-sig')
+    else:
+        print(frame.to_string(index=False))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,214 @@
+"""
+Project Swan's Eye v2.8.4 - Incremental Scoring Graph
+- v2.8.4: '증분 재계산' 스코어링 엔진.
+    - 스코어링 파이프라인(고정 DAG)을 노드 단위로 메모이즈하고, 바뀐 룰의 '하류' 노드만 다시 계산.
+        성분별 S-Curve -> Score A / C-1 합계
+        태그 점수 합 -> C-2
+        가격 Z -> Score B, 리뷰/별점 Z -> MarketScore
+        -> Score C 결합 -> 최종 가중 합산
+    - 예) 성분 하나의 'saturation_factor' 변경: 그 성분 컬럼 + 그 성분이 속한 합계 + 최종 결합만 재계산.
+          'weight_c' 변경: 최종 결합만 재계산.
+    - 결과는 'core_engine.run_scoring_v2_6'과 동일.
+- v2.8.6: 넓은 agg_df 대신 컴팩트 전처리 결과(base_df + IngredientStore)로 동작,
+    결과는 'core_engine.AnalysisResult'로 반환.
+- v2.8.20: 'run(rules, report)' - 다시 계산한 노드마다 시간 / 메모리를 'PipelineReport'에 기록.
+- v2.8.21: 'ScoringGraph(..., lean=True)' - 결과 점수를 float32로 보관 (메모리 절약 모드).
+- v2.8.22: 룰북 스냅샷 ('rulebook_v2.RulebookSnapshot') 지원.
+    - 'digest'가 직전 실행과 같으면 노드를 돌지 않고 직전 결과를 그대로 반환
+    - 성분 / 태그 노드 키는 스냅샷의 컴파일 결과 ('component_params' / 'tag_score_vector') 재사용
+"""
+
+import numpy as np
+import pandas as pd
+import core_engine_v2 as core_engine
+import rulebook_v2
+
+# S-Curve 노드 키에 들어가는 룰 파라미터 (순서 고정)
+COMPONENT_PARAM_KEYS = core_engine.COMPONENT_PARAM_KEYS
+
+
+class ScoringGraph:
+    """
+    컴팩트 전처리 결과(base_df, store) 하나에 묶인 증분 스코어링 엔진.
+    - 노드 메모: { 슬롯: (입력 키, 결과) }
+      슬롯(예: ('component', 'A', 'EPA'))마다 '마지막' 입력 키의 결과만 보관하므로,
+      슬라이더를 계속 움직여도 메모리가 늘지 않는다.
+    - 입력 키가 같으면 캐시 결과를 그대로 쓰고, 다르면 그 노드만 다시 계산.
+    """
+
+    def __init__(self, base_df, store, lean=False):
+        self.base_df = base_df
+        self.store = store
+        self.lean = lean # 'core_engine.build_analysis_result(..., lean)'
+        self._memo = {}
+        self.recomputed_nodes = [] # 마지막 'run'에서 다시 계산된 노드 슬롯 목록
+        self._report = None # 'run(..., report)' 동안의 'PipelineReport'
+        self._last_run = None # (룰북 스냅샷 digest, 결과) - 같은 스냅샷이면 재사용
+        self._in_stage = False
+
+    # ---
+    # 메모이즈 헬퍼
+    # ---
+    def _node(self, slot, key, compute):
+        cached = self._memo.get(slot)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        if self._report is None or self._in_stage:
+            value = compute()
+        else:
+            # [v2.8.20] 다시 계산하는 노드마다 기록 (노드 안에서 계산되는 하위 노드는 그 노드에 포함)
+            self._in_stage = True
+            try:
+                with self._report.stage('/'.join(map(str, slot)), len(self.base_df)):
+                    value = compute()
+            finally:
+                self._in_stage = False
+        self._memo[slot] = (key, value)
+        self.recomputed_nodes.append(slot)
+        return value
+
+    # ---
+    # 리프 노드 (데이터에만 의존 -> 최초 1회)
+    # ---
+    def _doses(self, comp_name):
+        return self._node(
+            ('dose', comp_name), None,
+            lambda: self.store.column(comp_name)
+        )
+
+    def _tag_incidence(self):
+        return self._node(
+            ('tag_incidence',), None,
+            lambda: core_engine.TagIncidence(self.base_df['tags_raw'])
+        )
+
+    def _z_scores(self, col, direction):
+        return self._node(
+            ('z', col), direction,
+            lambda: core_engine.calculate_z_scores(self.base_df[col], direction=direction)
+        )
+
+    # ---
+    # 성분 S-Curve 노드 -> 합계 노드 (Score A / C-1)
+    # ---
+    def _component(self, prefix, comp_name, params):
+        """ params: 'COMPONENT_PARAM_KEYS' 순서의 파라미터 튜플 """
+        def compute():
+            min_dose, rec_dose, rec_score, saturation_factor, weight = params
+            scores = core_engine.calculate_s_curve_scores(
+                self._doses(comp_name), min_dose, rec_dose, rec_score, saturation_factor
+            )
+            return scores * weight
+
+        return params, self._node(('component', prefix, comp_name), params, compute)
+
+    def _component_sum(self, prefix, rules_dict):
+        """ (합계 Series, 가중 점수 DataFrame) - 'calculate_component_scores' + 'sum_component_scores'와 동일 """
+        index = self.base_df.index
+        key = rulebook_v2.component_params(rules_dict).signature # 'enabled'가 True인 것만
+        columns = [
+            self._component(prefix, comp_name, params)[1] for comp_name, params in key
+        ]
+
+        def compute():
+            if not columns:
+                return pd.Series(0.0, index=index), pd.DataFrame(index=index)
+            # (엔진과 같은 C-order 2차원 배열로 만들어 합계 반올림까지 동일하게)
+            component_scores_df = pd.DataFrame(
+                np.column_stack(columns),
+                index=index,
+                columns=[f'{prefix}_{comp_name}' for comp_name, _ in key]
+            )
+            total_weight = sum([params[-1] for _, params in key], 0.0)
+            return core_engine.sum_component_scores(component_scores_df, total_weight), component_scores_df
+
+        return key, self._node(('component_sum', prefix), key, compute)
+
+    # ---
+    # 태그 / 가격 / 시장 반응 노드
+    # ---
+    def _score_c2(self, rules_dict_tags):
+        # 점수가 0인 태그는 결과에 영향이 없으므로 키에서도 제외
+        tag_names, tag_scores = rulebook_v2.tag_score_vector(rules_dict_tags['rules'])
+        key = tuple(zip(tag_names, tag_scores.tolist()))
+        return key, self._node(
+            ('score_c2',), key,
+            lambda: core_engine.calculate_score_c2(
+                self.base_df, {'rules': dict(key)}, self._tag_incidence()
+            )
+        )
+
+    def _score_b(self, rules_dict):
+        key = rules_dict['k_value']
+        return key, self._node(
+            ('score_b',), key,
+            lambda: core_engine.score_from_price_z(
+                self._z_scores('price', 'lower_is_better'), rules_dict
+            )
+        )
+
+    def _market_score(self, rules_dict):
+        key = tuple(sorted(rules_dict.items()))
+        return key, self._node(
+            ('market',), key,
+            lambda: core_engine.combine_market_score(
+                self._z_scores('review_count', 'higher_is_better'),
+                self._z_scores('rating', 'higher_is_better'),
+                rules_dict
+            )
+        )
+
+    # ---
+    # 전체 실행
+    # ---
+    def run(self, rules, report=None):
+        """
+        'core_engine.AnalysisResult'를 반환 ('to_frame()'이 'run_scoring_v2_6' 결과와 동일).
+        (바뀐 룰의 하류 노드만 다시 계산, 'recomputed_nodes'로 확인 가능)
+        :param report: 'core_engine.PipelineReport'면 다시 계산한 노드마다 시간 / 메모리 기록
+        [v2.8.22] rules가 'rulebook_v2.RulebookSnapshot'이면 digest가 직전 실행과 같을 때 직전 결과 반환.
+        ※ 반환값은 캐시된 객체이므로 수정하지 말 것.
+        """
+        digest = rules.digest if isinstance(rules, rulebook_v2.RulebookSnapshot) else None
+        if digest is not None and self._last_run is not None and self._last_run[0] == digest:
+            self.recomputed_nodes = []
+            return self._last_run[1]
+        self._report = report
+        try:
+            result = self._run(rules)
+        finally:
+            self._report = None
+        self._last_run = (digest, result) if digest is not None else None
+        return result
+
+    def _run(self, rules):
+        self.recomputed_nodes = []
+
+        market_key, market_scores = self._market_score(rules['market_score_weights'])
+        a_key, (score_a, score_a_details) = self._component_sum('A', rules['score_a_main_components'])
+        b_key, score_b = self._score_b(rules['score_b_price'])
+        c1_key, (score_c1, score_c_details) = self._component_sum('C1', rules['score_c_sub_components'])
+        c2_key, score_c2 = self._score_c2(rules['score_c_tags'])
+
+        rules_sub = rules['score_c_sub_components']
+        rules_tags = rules['score_c_tags']
+        c_key = (c1_key, c2_key, rules_sub['final_weight'], rules_tags['final_weight'])
+        score_c = self._node(
+            ('score_c',), c_key,
+            lambda: core_engine.combine_score_c(score_c1, score_c2, rules_sub, rules_tags)
+        )
+
+        final_weights = rules['final_weights']
+        final_key = (
+            market_key, a_key, b_key, c_key,
+            tuple(sorted(final_weights.items()))
+        )
+
+        def compute_final():
+            final_score = core_engine.combine_final_score(score_a, score_b, score_c, final_weights)
+            return core_engine.build_analysis_result(
+                self.base_df, self.store, final_score, score_a, score_b, score_c, market_scores,
+                score_c1, score_c2, score_a_details, score_c_details, lean=self.lean
+            )
+
+        return self._node(('final',), final_key, compute_final)
@@ -0,0 +1,230 @@
+"""
+Project Swan's Eye v2.8.8 - Headless CLI (Streamlit 없이 배치 스코어링)
+- v2.8.8: 'core_engine_v2'만으로 CSV -> 최종 순위 파일.
+    - 크론(cron) 야간 스코어링 / 프로파일링용. 앱의 업로드 화면 없이 같은 엔진 결과를 얻는다.
+    - 룰북 JSON은 앱 'initialize_session_state'가 만드는 구조와 동일.
+      (없으면 CSV를 스캔하여 앱과 같은 기본 룰북으로 실행)
+- v2.8.24: '--history PATH' 결과를 점수 기록('score_history_v2')에 날짜별 스냅샷으로 추가 ('--snapshot-date').
+    (전체 순위만 기록: '--top'과 함께 쓸 수 없음, 입력 CSV는 1개 - 같은 날짜에 다른 카탈로그가 섞이지 않도록)
+- v2.8.23: '--state DIR' 증분 일일 스코어링 (어제 상태와 지문이 같은 제품은 전처리 생략, 실행 후 상태 갱신).
+- v2.8.22: 룰북 JSON을 불변 스냅샷('rulebook_v2.RulebookSnapshot')으로 읽음 (검증 / 컴파일 1회, 입력 CSV끼리 공유).
+- v2.8.21: '--lean' 메모리 절약 모드 (범주형 텍스트, float32 함량 / 점수).
+- v2.8.20: '--report' 단계별 시간 / 메모리 출력, '--profile DIR' cProfile 저장.
+- v2.8.17: '--top'을 엔진 상위 K개 모드로 (전체 정렬 / 전체 펼치기 생략).
+- v2.8.11: '--workers' 멀티코어 전처리 (스트리밍 모드가 아닐 때).
+- v2.8.9: '--chunksize' 스트리밍 모드 (수 GB CSV를 청크 단위로 읽어 전처리, 룰북 JSON 필요).
+
+사용 예)
+    python swan_cli_v2.py export.csv --rulebook rulebook.json --output ranked.csv
+    python swan_cli_v2.py a.csv b.csv --rulebook rulebook.json --output out_dir/
+    python swan_cli_v2.py export.csv --write-default-rulebook rulebook.json
+    python swan_cli_v2.py huge_dump.csv --rulebook rulebook.json --output ranked.csv --chunksize 200000
+    python swan_cli_v2.py daily_export.csv --rulebook rulebook.json --output ranked.csv --state state_dir/
+    python swan_cli_v2.py daily_export.csv --rulebook rulebook.json --output ranked.csv --history history.sqlite
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import core_engine_v2 as core_engine
+import rulebook_v2
+import score_history_v2
+
+# 룰북 JSON에 반드시 있어야 하는 최상위 키 (앱 기본 룰북 기준)
+REQUIRED_RULEBOOK_KEYS = rulebook_v2.REQUIRED_RULEBOOK_KEYS
+
+
+def load_rulebook(path):
+    """ 룰북 JSON 읽기 (+ 최상위 키 확인) -> 'rulebook_v2.RulebookSnapshot' (성분 / 태그 룰 검증 포함) """
+    with open(path, encoding='utf-8') as f:
+        rulebook = json.load(f)
+    missing = [key for key in REQUIRED_RULEBOOK_KEYS if key not in rulebook]
+    if missing:
+        raise ValueError(f"룰북 '{path}'에 필수 항목이 없습니다: {', '.join(missing)}")
+    try:
+        return rulebook_v2.RulebookSnapshot.from_dict(rulebook)
+    except ValueError as e:
+        raise ValueError(f"룰북 '{path}': {e}") from e
+
+
+def write_rulebook(rulebook, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(rulebook, f, ensure_ascii=False, indent=2)
+
+
+def write_result(final_df, path):
+    """ 확장자별 저장 (.json: 레코드 목록, 그 외: CSV - 엑셀 한글 호환 'utf-8-sig') """
+    if path.lower().endswith('.json'):
+        final_df.to_json(path, orient='records', force_ascii=False, indent=2)
+    else:
+        final_df.to_csv(path, index=False, encoding='utf-8-sig')
+
+
+def score_csv(csv_path, rulebook=None, top=None, chunksize=None, workers=None, report=None, lean=False,
+              state_dir=None):
+    """
+    CSV 하나 -> 순위표 DataFrame ('RANK' + 'run_full_analysis_v2_6' 컬럼, 룰북 digest는 'attrs["rulebook_digest"]').
+    :param rulebook: None이면 CSV 스캔 결과로 기본 룰북 생성
+    :param chunksize: 지정하면 스트리밍 전처리 (원본 전체를 메모리에 올리지 않음, 결과 동일)
+    :param workers: 2 이상이면 멀티코어 전처리 (결과 동일)
+    :param top: 상위 N개만 (전체 정렬 대신 부분 선택)
+    :param report: 'core_engine.PipelineReport'면 단계별 시간 / 메모리 기록
+    :param lean: 메모리 절약 모드 (점수는 float32 반올림만큼 다를 수 있음)
+    :param state_dir: 증분 상태 폴더 (모드별 'default' / 'lean' 하위 폴더에 어제 집계 재사용, 실행 후 갱신 - 결과 동일,
+        통계는 'final_df.attrs["incremental"]')
+    """
+    if chunksize is not None and state_dir is not None:
+        raise ValueError("--state와 --chunksize는 함께 쓸 수 없습니다.")
+    if chunksize is not None:
+        if rulebook is None:
+            raise ValueError("스트리밍 모드(--chunksize)에는 --rulebook이 필요합니다.")
+        with core_engine.report_run(report, 'streaming'):
+            with core_engine.report_stage(report, 'preprocess (streaming)') as record:
+                base_df, store = core_engine.preprocess_csv_streaming_v2_8(csv_path, rulebook, chunksize=chunksize)
+                if lean:
+                    base_df = core_engine.lean_base_frame(base_df)
+                    store = store.astype(core_engine.LEAN_FLOAT_DTYPE)
+                record['rows_out'] = len(base_df)
+                record['output_mb'] = core_engine.memory_mb(base_df, store)
+            result = core_engine.score_compact_v2_8(base_df, store, rulebook, report=report, lean=lean)
+            with core_engine.report_stage(report, 'to_frame', len(result)) as record:
+                final_df = result.to_frame(None if top is None else slice(0, top))
+                record['rows_out'] = len(final_df)
+    else:
+        raw_df = core_engine.load_csv_v2_8(csv_path, rules=rulebook, lean=lean) # 룰북이 있으면 필요한 컬럼만
+        if rulebook is None:
+            rulebook = core_engine.build_default_rulebook(core_engine.scan_csv_for_rules(raw_df))
+        if state_dir is not None:
+            # 모드별 하위 폴더 (앱 'INCREMENTAL_DIR'과 같은 구성 - 일반 / 메모리 절약 상태를 섞지 않음)
+            mode_dir = os.path.join(state_dir, 'lean' if lean else 'default')
+            final_df, state = core_engine.run_incremental_analysis_v2_8(
+                raw_df, rulebook, core_engine.IncrementalState.load(mode_dir), top_k=top, report=report, lean=lean
+            )
+            state.save(mode_dir)
+        else:
+            final_df = core_engine.run_full_analysis_v2_6(
+                raw_df, rulebook, workers=workers, top_k=top, report=report, lean=lean
+            )
+    final_df = final_df.reset_index(drop=True)
+    final_df.insert(0, 'RANK', range(1, len(final_df) + 1))
+    final_df.attrs['rulebook_digest'] = score_history_v2.rulebook_digest(rulebook)
+    return final_df
+
+
+def output_path_for(csv_path, output, multiple):
+    """ 입력이 여러 개면 output은 폴더: '<폴더>/<입력 이름>_ranked.csv' """
+    if not multiple:
+        return output
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(output, f"{stem}_ranked.csv")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Swan's Eye 배치 스코어러 (CSV -> 최종 순위)"
+    )
+    parser.add_argument('inputs', nargs='+', help="제품 CSV 경로 (여러 개 가능)")
+    parser.add_argument('--rulebook', help="룰북 JSON 경로 (생략 시 CSV 스캔 기본 룰북)")
+    parser.add_argument('--output', help="결과 경로 (.csv / .json). 입력이 여러 개면 폴더")
+    parser.add_argument('--top', type=int, default=None, help="상위 N개만 저장")
+    parser.add_argument(
+        '--chunksize', type=int, default=None,
+        help="N행씩 스트리밍 전처리 (대용량 CSV용, --rulebook 필요)"
+    )
+    parser.add_argument(
+        '--workers', type=int, default=None,
+        help="전처리 프로세스 수 (2 이상이면 멀티코어, 스트리밍 모드에서는 무시)"
+    )
+    parser.add_argument(
+        '--report', action='store_true',
+        help="단계별 시간 / 행 수 / 최대 메모리를 stderr로 출력"
+    )
+    parser.add_argument(
+        '--profile', metavar='DIR',
+        help="실행마다 cProfile 결과(.prof)를 이 폴더에 저장 (--report 포함)"
+    )
+    parser.add_argument(
+        '--state', metavar='DIR',
+        help="증분 상태 폴더 (매일 추출본: 바뀐 / 새 제품만 전처리, 실행 후 상태 갱신, --workers 무시)"
+    )
+    parser.add_argument(
+        '--history', metavar='PATH',
+        help="점수 기록 파일 (SQLite, 없으면 생성) - 결과 순위 / 점수를 스냅샷으로 추가 (입력 1개, --top 불가)"
+    )
+    parser.add_argument(
+        '--snapshot-date', metavar='YYYY-MM-DD',
+        help="기록할 스냅샷 날짜 (기본: 오늘)"
+    )
+    parser.add_argument(
+        '--lean', action='store_true',
+        help="메모리 절약 모드 (브랜드 / 태그 범주형, 함량 / 점수 float32 - 점수 소수점 끝자리가 다를 수 있음)"
+    )
+    parser.add_argument(
+        '--write-default-rulebook', metavar='PATH',
+        help="첫 번째 CSV를 스캔한 기본 룰북을 JSON으로 저장하고 종료 (편집용 템플릿)"
+    )
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    try:
+        if args.write_default_rulebook:
+            raw_df = core_engine.load_csv_v2_8(args.inputs[0])
+            rulebook = core_engine.build_default_rulebook(core_engine.scan_csv_for_rules(raw_df))
+            write_rulebook(rulebook, args.write_default_rulebook)
+            print(f"기본 룰북 저장: {args.write_default_rulebook}")
+            return 0
+
+        if not args.output:
+            parser.error("--output 경로가 필요합니다.")
+        if args.history and args.top is not None:
+            parser.error("--history는 전체 순위를 기록하므로 --top과 함께 쓸 수 없습니다.")
+        if args.history and len(args.inputs) > 1:
+            parser.error("--history에는 입력 CSV를 1개만 지정할 수 있습니다 (스냅샷 = 날짜별 카탈로그 1개).")
+
+        rulebook = load_rulebook(args.rulebook) if args.rulebook else None
+        multiple = len(args.inputs) > 1
+        if multiple:
+            os.makedirs(args.output, exist_ok=True)
+
+        for csv_path in args.inputs:
+            report = None
+            if args.report or args.profile:
+                report = core_engine.PipelineReport(profile_dir=args.profile)
+            final_df = score_csv(
+                csv_path, rulebook, top=args.top, chunksize=args.chunksize, workers=args.workers,
+                report=report, lean=args.lean, state_dir=args.state
+            )
+            out_path = output_path_for(csv_path, args.output, multiple)
+            write_result(final_df, out_path)
+            print(f"{csv_path}: {len(final_df)}개 제품 -> {out_path}")
+            stats = final_df.attrs.get('incremental')
+            if stats is not None:
+                print(
+                    f"    증분: 재사용 {stats['reused']} / 변경 {stats['changed']} / 신규 {stats['new']}"
+                    f" / 삭제 {stats['removed']} (전처리한 행 {stats['parsed_rows']})"
+                )
+            if args.history:
+                with score_history_v2.ScoreHistory(args.history) as history:
+                    snapshot_id = history.append(
+                        final_df, args.snapshot_date, final_df.attrs['rulebook_digest'],
+                        label=os.path.basename(csv_path)
+                    )
+                print(f"    기록: {args.history} (스냅샷 {snapshot_id})")
+            if report is not None:
+                print(report.to_frame().to_string(index=False), file=sys.stderr)
+                if report.profile_path:
+                    print(f"cProfile: {report.profile_path}", file=sys.stderr)
+    except (ValueError, KeyError, OSError, sqlite3.Error) as e:
+        print(f"오류: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
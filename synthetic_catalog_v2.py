@@ -0,0 +1,185 @@
+"""
+Project Swan's Eye v2.8.19 - Synthetic Catalog Generator (벤치마크용 가짜 '제품관리 엑셀추출' CSV)
+- v2.8.19: 실제 '제품관리 엑셀추출.csv'와 같은 모양의 카탈로그를 원하는 크기로 생성.
+    - 제품 하나 = 여러 행 (첫 행에만 제품명 / 브랜드 / 가격 / 리뷰, 나머지 행은 빈칸 -> 엔진이 ffill)
+    - '핵심성분명태그' / '보조성분명태그': "성분 : X, 함유량 : N" 을 ' | '로 연결
+      (인기 성분일수록 자주 등장, 'EPA' / 'EPA+DHA'처럼 접두어가 겹치는 이름, 드물게 깨진 함량 포함)
+    - '특수태그': '|'로 연결, 일부에만 '*' 표시 ('*' / ' *')
+    - 행 수 / 성분 수 / 태그 수 / 시드 조절, UTF-8 / UTF-8(BOM) / cp949 저장
+    - 같은 인자면 항상 같은 CSV (벤치마크 회귀 비교용)
+
+사용 예)
+    python synthetic_catalog_v2.py catalog_100k.csv --rows 100000
+    python synthetic_catalog_v2.py catalog_cp949.csv --rows 1000 --encoding cp949 --write-rulebook rulebook.json
+"""
+
+import argparse
+import sys
+import numpy as np
+import pandas as pd
+import core_engine_v2 as core_engine
+import swan_cli_v2
+
+# 실제 카탈로그에서 자주 보이는 이름 (부족하면 '성분N' / '태그N'으로 채움)
+MAIN_COMPONENT_NAMES = [
+    'EPA+DHA', 'EPA', 'DHA', '비타민D', '비타민C', '비타민B1', '비타민B12', '루테인',
+    '밀크씨슬(실리마린)', '코엔자임Q10', '프로바이오틱스', '홍삼(진세노사이드)', '콜라겐', '엽산',
+]
+SUB_COMPONENT_NAMES = [
+    '아연', '마그네슘', '칼슘', '철분', '셀레늄', '비오틴', '비타민E', '비타민A', '나이아신', '판토텐산',
+]
+TAG_NAMES = [
+    'rtg여부', '식물성캡슐', '무첨가', 'GMP인증', '해외직구', '임산부', '어린이', '비건', '1일1캡슐', '장용성',
+]
+
+# 저장 인코딩 (엑셀 추출본은 UTF-8(BOM) 또는 cp949)
+ENCODINGS = ('utf-8', 'utf-8-sig', 'cp949')
+
+
+def _names(base_names, prefix, n_names):
+    names = list(base_names[:n_names])
+    names += [f'{prefix}{i}' for i in range(len(names), n_names)]
+    return names
+
+
+def _popularity(n_names):
+    """ 앞쪽 이름일수록 자주 등장 (1/순위 분포) """
+    weights = 1.0 / np.arange(1, n_names + 1)
+    return weights / weights.sum()
+
+
+def _dose_text(rng, n_values, malformed_ratio):
+    """ 함량 문자열 (정수 / 소수, malformed_ratio만큼 '1.2.3', '.' 같은 깨진 값) """
+    values = rng.gamma(2.0, 250.0, size=n_values)
+    use_float = rng.random(n_values) < 0.3
+    texts = np.where(
+        use_float, np.char.mod('%.2f', values), np.char.mod('%d', values.astype(np.int64))
+    ).astype(object)
+    broken = rng.random(n_values) < malformed_ratio
+    texts[broken] = rng.choice(['1.2.3', '.'], size=int(broken.sum()))
+    return texts
+
+
+def _component_cells(rng, n_rows, names, fill_ratio, max_pairs, malformed_ratio):
+    """ 행마다 "성분 : X, 함유량 : N | ..." (fill_ratio 밖의 행은 빈칸) """
+    n_pairs = rng.integers(1, max_pairs + 1, size=n_rows)
+    n_pairs[rng.random(n_rows) >= fill_ratio] = 0
+    total = int(n_pairs.sum())
+    comp_names = np.asarray(names, dtype=object)[rng.choice(len(names), size=total, p=_popularity(len(names)))]
+    doses = _dose_text(rng, total, malformed_ratio)
+    pairs = [f'성분 : {name}, 함유량 : {dose}' for name, dose in zip(comp_names, doses)]
+    cells = np.full(n_rows, None, dtype=object)
+    start = 0
+    for row, count in enumerate(n_pairs):
+        if count:
+            cells[row] = ' | '.join(pairs[start:start + count])
+            start += count
+    return cells
+
+
+def _tag_cells(rng, n_rows, names, fill_ratio, max_tags, star_ratio):
+    """ 행마다 '태그1*|태그2|태그3 *' (fill_ratio 밖의 행은 빈칸) """
+    n_tags = rng.integers(1, max_tags + 1, size=n_rows)
+    n_tags[rng.random(n_rows) >= fill_ratio] = 0
+    total = int(n_tags.sum())
+    tag_names = np.asarray(names, dtype=object)[rng.choice(len(names), size=total, p=_popularity(len(names)))]
+    marks = np.where(
+        rng.random(total) < star_ratio, np.where(rng.random(total) < 0.5, '*', ' *'), ''
+    )
+    tokens = [f'{name}{mark}' for name, mark in zip(tag_names, marks)]
+    cells = np.full(n_rows, None, dtype=object)
+    start = 0
+    for row, count in enumerate(n_tags):
+        if count:
+            cells[row] = '|'.join(tokens[start:start + count])
+            start += count
+    return cells
+
+
+def generate_catalog(n_rows, n_main=30, n_sub=40, n_tags=60, n_brands=300, max_rows_per_product=4, seed=0):
+    """
+    'n_rows'행 카탈로그 DataFrame (CSV 원본과 같은 문자열 컬럼).
+    :param max_rows_per_product: 제품당 행 수 상한 (1 ~ 상한 균등)
+    """
+    rng = np.random.default_rng(seed)
+    if n_rows <= 0:
+        raise ValueError("n_rows는 1 이상이어야 합니다.")
+
+    # 1. 제품 경계 (제품마다 1 ~ max_rows_per_product행, 합계 n_rows)
+    rows_per_product = rng.integers(1, max_rows_per_product + 1, size=n_rows)
+    ends = np.cumsum(rows_per_product)
+    n_products = int(np.searchsorted(ends, n_rows)) + 1
+    starts = np.concatenate([[0], ends[:n_products - 1]])
+
+    # 2. 제품 단위 컬럼 (첫 행에만, 일부 누락)
+    def product_level(values, missing_ratio):
+        column = np.full(n_rows, None, dtype=object)
+        values = np.asarray(values, dtype=object)
+        values[rng.random(n_products) < missing_ratio] = None
+        column[starts] = values
+        return column
+
+    product_names = np.char.mod('제품%07d', np.arange(n_products))
+    brands = np.asarray([f'브랜드{i}' for i in range(n_brands)], dtype=object)[
+        rng.choice(n_brands, size=n_products, p=_popularity(n_brands))
+    ]
+    prices = rng.integers(100, 20000, size=n_products)
+    price_texts = np.where(
+        rng.random(n_products) < 0.5, [f'{price:,}원' for price in prices], prices.astype(str)
+    )
+    review_counts = rng.negative_binomial(1, 0.002, size=n_products).astype(str)
+    ratings = np.char.mod('%.1f', rng.uniform(1.0, 5.0, size=n_products))
+
+    catalog = pd.DataFrame({
+        '제품명': product_level(product_names, 0.0),
+        '브랜드': product_level(brands, 0.05),
+        '1일 섭취량당 가격': product_level(price_texts, 0.1),
+        '리뷰 개수': product_level(review_counts, 0.2),
+        '리뷰 별점': product_level(ratings, 0.2),
+        '핵심성분명태그': _component_cells(
+            rng, n_rows, _names(MAIN_COMPONENT_NAMES, '성분', n_main), 0.8, 3, 0.01
+        ),
+        '보조성분명태그': _component_cells(
+            rng, n_rows, _names(SUB_COMPONENT_NAMES, '보조성분', n_sub), 0.6, 3, 0.01
+        ),
+        '특수태그': _tag_cells(rng, n_rows, _names(TAG_NAMES, '태그', n_tags), 0.7, 4, 0.4),
+    })
+    return catalog
+
+
+def write_catalog(catalog, path, encoding='utf-8-sig'):
+    if encoding not in ENCODINGS:
+        raise ValueError(f"지원하지 않는 인코딩입니다: {encoding} ({', '.join(ENCODINGS)})")
+    catalog.to_csv(path, index=False, encoding=encoding)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Swan's Eye 벤치마크용 가짜 카탈로그 CSV 생성기")
+    parser.add_argument('output', help="저장할 CSV 경로")
+    parser.add_argument('--rows', type=int, default=1000, help="CSV 행 수 (제품 수는 약 행 수 / 2.5)")
+    parser.add_argument('--main', type=int, default=30, help="핵심성분 종류 수")
+    parser.add_argument('--sub', type=int, default=40, help="보조성분 종류 수")
+    parser.add_argument('--tags', type=int, default=60, help="특수태그 종류 수")
+    parser.add_argument('--brands', type=int, default=300, help="브랜드 수")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--encoding', choices=ENCODINGS, default='utf-8-sig')
+    parser.add_argument('--write-rulebook', metavar='PATH', help="생성한 카탈로그의 기본 룰북 JSON도 저장")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    catalog = generate_catalog(
+        args.rows, n_main=args.main, n_sub=args.sub, n_tags=args.tags, n_brands=args.brands, seed=args.seed
+    )
+    write_catalog(catalog, args.output, args.encoding)
+    print(f"{args.output}: {len(catalog)}행, 제품 {catalog['제품명'].notna().sum()}개 ({args.encoding})")
+    if args.write_rulebook:
+        rulebook = core_engine.build_default_rulebook(core_engine.scan_csv_for_rules(catalog))
+        swan_cli_v2.write_rulebook(rulebook, args.write_rulebook)
+        print(f"기본 룰북 저장: {args.write_rulebook}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
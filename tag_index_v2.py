@@ -0,0 +1,121 @@
+"""
+Project Swan's Eye v2.8.5 - Tag Incidence Index
+- v2.8.5: '특수태그' (제품 x 태그) 희소 불리언 행렬.
+    - 데이터셋당 한 번만 'tags_raw'를 파싱하여 '*'가 붙은 태그 토막(tail)을 모아 둔다.
+    - C-2 점수 = 행렬 @ 태그 점수 벡터, 태그 포함/배제 필터 = 컬럼 조회.
+    - 판정 규칙은 v2.6.3 정규식 'f"{re.escape(tag)}\\s*\\*"'(부분 문자열 + 뒤에 '*')과 동일.
+- v2.8.22: 태그 점수 벡터를 'rulebook_v2.tag_score_vector'로 (룰북 스냅샷이면 컴파일 결과 재사용).
+"""
+
+import re
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from rulebook_v2 import tag_score_vector
+
+# '*' 하나마다 그 앞 토막 (직전 '|' 또는 '*' 이후 ~ '*' 직전)
+STARRED_TAIL_PATTERN = re.compile(r"([^|*]*)\*")
+
+
+class TagIncidence:
+    """
+    (제품 x 태그) 포함 행렬.
+    - tags_raw 한 줄 = 제품 한 행 (위치 기준)
+    - 태그 t가 '포함'되려면: 어떤 '*' 바로 앞 토막(뒤 공백 제거)이 t로 끝나야 함
+      (= 원문 어딘가에 't' + 공백* + '*' 가 있음)
+    - '|', '*'가 들어간 태그나 공백으로 끝나는 태그는 토막 규칙이 안 맞으므로 정규식으로 직접 계산
+    """
+
+    def __init__(self, tags_raw):
+        self.index = tags_raw.index if isinstance(tags_raw, pd.Series) else pd.RangeIndex(len(tags_raw))
+        self._raw = pd.Series(np.asarray(tags_raw, dtype=object), index=pd.RangeIndex(len(self.index)))
+        self.n_rows = len(self.index)
+        self._columns = {} # 태그별 포함 여부 캐시 (bool 배열)
+
+        # 1. 제품마다 '*' 앞 토막을 한 번에 추출
+        texts = self._raw.dropna().astype(str)
+        tails = texts.str.findall(STARRED_TAIL_PATTERN).explode().dropna()
+        tails = tails.str.rstrip()
+        rows = tails.index.to_numpy(dtype=np.int64)
+
+        # 2. (제품 x 고유 토막) 희소 행렬
+        tail_codes, unique_tails = pd.factorize(tails)
+        self.tails = list(unique_tails)
+        self.product_tail_matrix = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=bool), (rows, tail_codes)),
+            shape=(self.n_rows, len(self.tails)),
+            dtype=bool
+        )
+
+        # 3. '접미사 -> 토막 번호' 사전 (태그 조회를 O(1)로)
+        self._suffix_to_tails = {}
+        for tail_no, tail in enumerate(self.tails):
+            for start in range(len(tail)):
+                self._suffix_to_tails.setdefault(tail[start:], []).append(tail_no)
+
+    @staticmethod
+    def _needs_regex(tag_name):
+        tag_name = str(tag_name)
+        return (not tag_name) or ('|' in tag_name) or ('*' in tag_name) or tag_name != tag_name.rstrip()
+
+    def _tail_mask(self, tag_name):
+        mask = np.zeros(len(self.tails), dtype=bool)
+        mask[self._suffix_to_tails.get(str(tag_name), [])] = True
+        return mask
+
+    def column(self, tag_name):
+        """ 태그 하나의 포함 여부 (제품 수 길이의 bool 배열) """
+        cached = self._columns.get(tag_name)
+        if cached is not None:
+            return cached
+        if self._needs_regex(tag_name):
+            # [v2.6.3] 정규식 그대로 (드문 경우)
+            has_tag = self._raw.str.contains(
+                f"{re.escape(str(tag_name))}\\s*\\*", na=False, regex=True
+            ).to_numpy(dtype=bool)
+        else:
+            has_tag = (self.product_tail_matrix @ self._tail_mask(tag_name)) > 0
+            has_tag = np.asarray(has_tag, dtype=bool).ravel()
+        self._columns[tag_name] = has_tag
+        return has_tag
+
+    def matrix(self, tag_names):
+        """ (제품 x tag_names) 희소 bool 행렬 (CSR) """
+        tag_names = list(tag_names)
+
+        # (고유 토막 x 태그) 매칭 -> (제품 x 토막) @ (토막 x 태그)
+        tail_rows, tag_cols = [], []
+        regex_rows, regex_cols = [], []
+        for tag_no, tag_name in enumerate(tag_names):
+            if self._needs_regex(tag_name):
+                has_tag = np.flatnonzero(self.column(tag_name))
+                regex_rows.extend(has_tag.tolist())
+                regex_cols.extend([tag_no] * len(has_tag))
+            else:
+                matched_tails = self._suffix_to_tails.get(str(tag_name), [])
+                tail_rows.extend(matched_tails)
+                tag_cols.extend([tag_no] * len(matched_tails))
+
+        tail_tag = sparse.csr_matrix(
+            (np.ones(len(tail_rows), dtype=np.int32), (tail_rows, tag_cols)),
+            shape=(len(self.tails), len(tag_names))
+        )
+        counts = self.product_tail_matrix.astype(np.int32) @ tail_tag
+        if regex_rows:
+            counts = counts + sparse.csr_matrix(
+                (np.ones(len(regex_rows), dtype=np.int32), (regex_rows, regex_cols)),
+                shape=(self.n_rows, len(tag_names))
+            )
+        return sparse.csr_matrix(counts > 0, dtype=bool)
+
+    def score(self, tag_rules):
+        """
+        C-2 점수 = 포함 행렬 @ 태그 점수 벡터.
+        (태그명이 NaN이거나 점수가 0인 태그는 v2.6처럼 건너뜀)
+        [v2.8.22] 점수 벡터는 'rulebook_v2.tag_score_vector' (룰북 스냅샷이면 1회 컴파일한 벡터 재사용)
+        """
+        tag_names, scores = tag_score_vector(tag_rules)
+        if not tag_names or self.n_rows == 0:
+            return pd.Series(0.0, index=self.index)
+        incidence = self.matrix(list(tag_names))
+        return pd.Series(incidence.astype(float) @ scores, index=self.index)